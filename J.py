@@ -2,9 +2,272 @@ import aerosandbox as asb
 from aerosandbox import AVL
 from typing import List
 from pathlib import Path
+from collections import OrderedDict
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
 import aerosandbox.numpy as np
 
 
+class AirfoilCache:
+    def __init__(self, maxsize=128):
+        """
+        LRU cache of repaneled airfoils, keyed by a hash of the airfoil coordinates and panel count.
+
+        :param maxsize: Maximum number of repaneled airfoils kept before the least recently used is evicted
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Shared by the threads of write_jvl_async: lookups, inserts and evictions hold it
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(airfoil, n_points_per_side):
+        """
+        Content hash of an airfoil and panel count. Airfoils with identical names and coordinates share a key,
+        even when they are separate objects (e.g. several asb.Airfoil(name="NACA0012") instances).
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(airfoil.name).encode())
+        h.update(np.ascontiguousarray(airfoil.coordinates, dtype=float).tobytes())
+        h.update(str(n_points_per_side).encode())
+        return h.hexdigest()
+
+    def repanel(self, airfoil, n_points_per_side=50, key=None):
+        """
+        Returns airfoil.repanel(n_points_per_side), reusing a previous result for the same airfoil content.
+        Airfoils marked with a matching `repaneled_n_points_per_side` (set by the reader on .afN sidecars it loads)
+        are returned as they are, since repaneling them again would shift the points.
+        """
+        if getattr(airfoil, "repaneled_n_points_per_side", None) == n_points_per_side:
+            return airfoil
+        if key is None:
+            key = self.key(airfoil, n_points_per_side)
+        with self._lock:
+            try:
+                repaneled = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return repaneled
+        repaneled = airfoil.repanel(n_points_per_side)  # Outside the lock, so other threads are not held up
+        with self._lock:
+            self._entries[key] = repaneled
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return repaneled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BodyCache:
+    def __init__(self, maxsize=32):
+        """
+        LRU cache of BFIL body file contents, keyed by `JVL.fuselage_key`.
+
+        :param maxsize: Maximum number of body files kept before the least recently used is evicted
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Returns the cached contents for `key`, calling build() to generate them on a miss.
+        """
+        with self._lock:
+            try:
+                contents = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return contents
+        contents = build()
+        with self._lock:
+            self._entries[key] = contents
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return contents
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _NoPhase:
+    # Stand-in for WriteStats.phase when profiling is off. The static __enter__ / __exit__ are looked up without
+    # binding a method, so entering it allocates nothing, unlike contextlib.nullcontext
+    __enter__ = staticmethod(lambda: None)
+    __exit__ = staticmethod(lambda exc_type, exc_value, traceback: None)
+
+
+_NO_PHASE = _NoPhase()
+
+
+def _phase(stats, name):
+    """`stats.phase(name)`, or a shared no-op context manager when stats is None."""
+    return _NO_PHASE if stats is None else stats.phase(name)
+
+
+class WriteStats:
+    # Record kinds, in file order. Sections are nested in their surface; the others stand alone
+    kinds = ("header", "surface", "section", "body", "sidecar")
+    parents = {"section": "surface"}
+
+    def __init__(self, callback=None):
+        """
+        Instrumentation for `JVL.write_jvl`. Attach one to a JVL object (`jvl.stats = WriteStats()`) and every
+        subsequent write accumulates into it; with `jvl.stats = None` (the default) nothing is measured.
+
+        Records per-phase timings (get_options, airfoil_key, max_thickness, repanel, write_dat, write_avl_bfile,
+        assembly of the .jvl lines, and stream_write for the time spent by the output stream) and, for each header,
+        surface, section, body and sidecar, the lines, bytes and seconds spent producing it.
+
+        :param callback: Optional callable(event, record), called with ("phase", {"phase", "seconds"}) after each
+            timed phase and with (kind, record) whenever a record is completed, e.g. to forward to job telemetry
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.writes = 0
+        self.phases = {}
+        self.records = {kind: [] for kind in self.kinds}
+        self._open = {}
+
+    def _add_phase(self, name, seconds, calls=1):
+        phase = self.phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+        phase["calls"] += calls
+        phase["seconds"] += seconds
+        if self.callback is not None:
+            self.callback("phase", {"phase": name, "seconds": seconds})
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_phase(name, time.perf_counter() - start)
+
+    def begin(self, kind, name, **fields):
+        """
+        Opens a record, closing the previous one; the lines yielded until the next record are counted towards it
+        (a section's lines also count towards its surface).
+        """
+        for open_kind in list(self._open):
+            if open_kind != self.parents.get(kind):
+                self._close(open_kind)
+        record = {"name": name, **fields, "lines": 0, "bytes": 0, "seconds": 0.0}
+        self.records[kind].append(record)
+        self._open[kind] = record
+
+    def _close(self, kind):
+        record = self._open.pop(kind)
+        if self.callback is not None:
+            self.callback(kind, record)
+
+    def sidecar(self, path, seconds, skipped=False, size=None):
+        record = {
+            "name": Path(path).name,
+            "bytes": 0 if skipped else os.path.getsize(path) if size is None else size,
+            "seconds": seconds,
+            "skipped": skipped,
+        }
+        self.records["sidecar"].append(record)
+        if self.callback is not None:
+            self.callback("sidecar", record)
+
+    def track(self, lines):
+        """
+        Passes the lines of `JVL.iter_jvl` through, attributing each line's size and generation time to the open
+        records and splitting the total into assembly (generator time not spent in a named phase) and stream_write.
+        """
+        start = time.perf_counter()
+        phase_seconds = sum(phase["seconds"] for phase in self.phases.values())
+        generator_seconds = 0.0
+        lines = iter(lines)
+        while True:
+            t = time.perf_counter()
+            try:
+                line = next(lines)
+            except StopIteration:
+                break
+            dt = time.perf_counter() - t
+            generator_seconds += dt
+            size = len(line.encode()) + 1
+            for record in self._open.values():
+                record["lines"] += 1
+                record["bytes"] += size
+                record["seconds"] += dt
+            yield line
+        for kind in list(self._open):
+            self._close(kind)
+
+        nested_seconds = sum(phase["seconds"] for phase in self.phases.values()) - phase_seconds
+        self._add_phase("assembly", generator_seconds - nested_seconds)
+        self._add_phase("stream_write", time.perf_counter() - start - generator_seconds)
+        self.writes += 1
+
+    def totals(self):
+        return {
+            kind: {
+                "count": len(records),
+                "bytes": sum(record["bytes"] for record in records),
+                "seconds": sum(record["seconds"] for record in records),
+            }
+            for kind, records in self.records.items()
+        }
+
+    def to_dict(self):
+        return {
+            "writes": self.writes,
+            "phases": self.phases,
+            "totals": self.totals(),
+            "headers": self.records["header"],
+            "surfaces": self.records["surface"],
+            "sections": self.records["section"],
+            "bodies": self.records["body"],
+            "sidecars": self.records["sidecar"],
+        }
+
+    def to_json(self, filepath=None, **kwargs):
+        """
+        The stats as a JSON string, also written to `filepath` if given.
+        """
+        text = json.dumps(self.to_dict(), **kwargs)
+        if filepath is not None:
+            with open(filepath, "w") as f:
+                f.write(text)
+        return text
+
+
 class JWing(asb.Wing):
     def __init__(self, name, xsecs, JetParam = None, symmetric=True, JetSpacing=None, **kwargs):
         super().__init__(name=name, xsecs=xsecs, symmetric=symmetric, **kwargs)
@@ -20,15 +283,32 @@ class JWing(asb.Wing):
             self.JetSpacing = JetSpacing
         
 class JVL(AVL):
+    # Shared across instances so design loops that rebuild the JVL object still hit the cache
+    airfoil_cache = AirfoilCache(maxsize=128)
+    body_cache = BodyCache(maxsize=32)
+    airfoil_n_points_per_side = 50
+    # Set to a WriteStats to profile writes
+    stats = None
+
     def __init__(self, airplane, op_point, xyz_ref = [0, 0, 0], ground_effect = False, ground_effect_height = 0.0, AVL_spacing_parameters = None, avl_command = '.\\jvl2.20'):
         super().__init__(airplane=airplane, op_point=op_point, xyz_ref=xyz_ref, ground_effect=ground_effect, ground_effect_height=ground_effect_height, avl_command=avl_command)
 
 
+    def get_options(self, geometry_object):
+        # Sections of a WingJSecArray take the WingJSec options
+        if isinstance(geometry_object, WingJSecView):
+            section = WingJSec.__new__(WingJSec)
+            section.analysis_specific_options = geometry_object.analysis_specific_options
+            geometry_object = section
+        # Called per section: spelled out rather than super(), which allocates a proxy on every call
+        return AVL.get_options(self, geometry_object)
+
     def write_jvl(
             self,
             filepath,
             CLAF = True,
             j=True,
+            incremental=False,
         ) -> None:
             """
             Writes a .avl file corresponding to this airplane to a filepath.
@@ -38,46 +318,336 @@ class JVL(AVL):
 
             Args:
                 filepath: filepath (including the filename and .avl extension) [string]
-                    If None, this function returns the .avl file as a string.
+                incremental: Only rewrite files whose content changed since the last incremental write.
+                    Content hashes are kept in a hidden `.<filename>.manifest.json` next to the file;
+                    unchanged airfoil and body sidecars are neither regenerated nor rewritten, and an
+                    unchanged .jvl is not rewritten, so their mtimes are preserved. If the `geometry_key`
+                    matches the last write and the .jvl on disk is unchanged, nothing is generated at all.
+                    Sidecars from earlier incremental writes that are no longer referenced are removed.
+                    A non-incremental write removes the manifest, so the next incremental write starts over.
 
             Returns: None
 
             """
+            filepath = Path(filepath)
+            manifest_path = filepath.parent / f".{filepath.name}.manifest.json"
+            if not incremental:
+                # The files are replaced behind the manifest's back, so its hashes no longer describe them
+                manifest_path.unlink(missing_ok=True)
+                with open(filepath, "w+") as f:
+                    self.stream_jvl(f, filepath=filepath, CLAF=CLAF, j=j)
+                return
 
-            def clean(s):
-                """
-                Removes leading and trailing whitespace from each line of a multi-line string.
-                """
-                return "\n".join([line.strip() for line in s.split("\n")])
+            previous = self._read_manifest(filepath)
+            geometry_key = self.geometry_key(filepath, CLAF=CLAF, j=j)
+            if self._manifest_current(filepath, previous, geometry_key):
+                return
 
-            airplane = self.airplane
+            # Rebuilt from the sidecars this write emits, rather than merged into the previous manifest
+            manifest = dict(previous)
+            buffer = io.StringIO()
+            self.stream_jvl(buffer, filepath=filepath, CLAF=CLAF, j=j, manifest=manifest)
+            text = buffer.getvalue()
+            digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+            if self._file_digest(filepath) != digest:
+                with open(filepath, "w+") as f:
+                    f.write(text)
+            manifest[filepath.name] = digest
+            manifest["#geometry"] = geometry_key
+
+            # Sidecars from an earlier write that the .jvl no longer references
+            for name in previous:
+                if name not in manifest and not name.startswith("#"):
+                    (filepath.parent / name).unlink(missing_ok=True)
+
+            if manifest != previous:
+                with open(manifest_path, "w") as f:
+                    json.dump(manifest, f, indent=1)
+
+    @staticmethod
+    def _read_manifest(filepath):
+        try:
+            with open(filepath.parent / f".{filepath.name}.manifest.json") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _file_digest(filepath):
+        try:
+            # Text mode, so the digest matches that of the written text on platforms that translate newlines
+            with open(filepath) as f:
+                return hashlib.blake2b(f.read().encode(), digest_size=16).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _manifest_current(filepath, manifest, geometry_key):
+        # The last incremental write had the same geometry, none of its files has been removed since, and the
+        # .jvl on disk is still the one it wrote
+        return manifest.get("#geometry") == geometry_key and all(
+            (filepath.parent / name).exists() for name in manifest if not name.startswith("#")
+        ) and manifest.get(filepath.name) == JVL._file_digest(filepath)
+
+    def geometry_key(self, filepath, CLAF=True, j=True) -> str:
+        """
+        Content hash of every input `write_jvl` reads, computed without generating the file: names, reference
+        values, analysis options, section geometry, airfoils, control hinges, JETPARAM / JETCONTROL gains and
+        bodies. Control deflections, jet levels and the operating point are run inputs (.run file / OPER
+        commands), not geometry, so changing them leaves the key unchanged.
 
-            jvl_file = ""
-
-            airplane_options = self.get_options(airplane)
-
-            jvl_file += clean(
-                f"""\
-            {airplane.name}
-            #Mach
-            0        ! AeroSandbox note: This is overwritten later to match the current OperatingPoint Mach during the AVL run.
-            #IYsym   IZsym   Zsym
-            0       {1 if self.ground_effect else 0}   {self.ground_effect_height}
-            #Sref    Cref    Bref
-            {airplane.s_ref} {airplane.c_ref} {airplane.b_ref}
-            #Xref    Yref    Zref
-            {self.xyz_ref[0]} {self.xyz_ref[1]} {self.xyz_ref[2]}
-            # CDp
-            {airplane_options["profile_drag_coefficient"]}
+        Args:
+            filepath: Path the .jvl file is written to (the AFIL / BFIL lines reference sidecars next to it).
+            CLAF: As in `write_jvl`.
+            j: As in `write_jvl`.
+
+        Returns: Hex digest.
+        """
+        h = hashlib.blake2b(digest_size=16)
+
+        def add(*items):
+            h.update(repr(items).encode())
+
+        def add_array(values):
+            h.update(np.ascontiguousarray(values, dtype=float).tobytes())
+
+        airplane = self.airplane
+        add(str(filepath), CLAF, j, self.airfoil_n_points_per_side, self.AVL_spacing_parameters)
+        add(airplane.name, airplane.s_ref, airplane.c_ref, airplane.b_ref, self.ground_effect, self.ground_effect_height)
+        add_array(self.xyz_ref)
+        add(self.get_options(airplane))
+        for wing in airplane.wings:
+            jet_param = wing.JetParam if isinstance(wing, JWing) else None
+            add(
+                "wing", wing.name, wing.symmetric, self.get_options(wing),
+                wing.JetSpacing if isinstance(wing, JWing) else None,
+                None if jet_param is None else (jet_param.hdisk, jet_param.fh, jet_param.djet0, jet_param.djet1, jet_param.djet3),
+            )
+            for i, xsec in enumerate(wing.xsecs):
+                add_array([*xsec.xyz_le, xsec.chord, xsec.twist])
+                add(self.get_options(xsec), self.airfoil_cache.key(xsec.airfoil, self.airfoil_n_points_per_side))
+                if i < len(wing.xsecs) - 1:
+                    add([(surf.name, float(surf.hinge_point), surf.trailing_edge, surf.symmetric) for surf in xsec.control_surfaces])
+                add([(param.jet_name, float(param.gain), int(param.sgn_dup)) for param in getattr(xsec, "JetControls", None) or []])
+        for fuse in airplane.fuselages:
+            add("body", self.fuselage_key(fuse), self.get_options(fuse))
+        return h.hexdigest()
+
+    def change_level(self, filepath, CLAF=True, j=True) -> str:
+        """
+        Classifies the changes since the last incremental `write_jvl` to `filepath`: "geometry" if the .jvl
+        would differ (or was never written), "run" if only run inputs (control deflections, jet levels, operating
+        point) can have changed.
+        """
+        filepath = Path(filepath)
+        key = self.geometry_key(filepath, CLAF=CLAF, j=j)
+        return "run" if self._manifest_current(filepath, self._read_manifest(filepath), key) else "geometry"
+
+    def write_case(self, filepath, run_filepath=None, CLAF=True, j=True, **kwargs) -> str:
+        """
+        Writes the inputs for one sweep point into a working directory that is reused between points: the .jvl
+        file incrementally (see `write_jvl`), so it and its sidecars are only regenerated for geometry-level
+        changes, and a fresh .run file with the run cases.
+
+        Args:
+            filepath: Path of the .jvl file.
+            run_filepath: Path of the .run file. Defaults to `filepath` with a .run suffix.
+            CLAF: As in `write_jvl`.
+            j: As in `write_jvl`.
+            **kwargs: Passed to `write_run` (names, variables, constraints, parameters).
+
+        Returns: The `change_level`, "geometry" or "run".
+        """
+        filepath = Path(filepath)
+        level = self.change_level(filepath, CLAF=CLAF, j=j)
+        if level == "geometry":
+            self.write_jvl(filepath, CLAF=CLAF, j=j, incremental=True)
+        self.write_run(filepath.with_suffix(".run") if run_filepath is None else run_filepath, j=j, **kwargs)
+        return level
+
+    async def write_jvl_async(
+            self,
+            filepath,
+            CLAF = True,
+            j=True,
+            incremental=False,
+        ) -> None:
+            """
+            `write_jvl` on a worker thread, so an asyncio event loop keeps serving other tasks while the file is
+            generated and written. Takes the same arguments.
+            """
+            await asyncio.to_thread(self.write_jvl, filepath, CLAF=CLAF, j=j, incremental=incremental)
+
+    def write_jvl_bundle(
+            self,
+            filename="airplane.jvl",
+            CLAF=True,
+            j=True,
+        ) -> dict:
+            """
+            Generates the .jvl file and its .afN / .fuseN sidecars in memory, without touching the disk.
+
+            AFIL / BFIL lines reference the sidecars by bare file name, so the bundle is valid in whatever
+            directory it is materialized (with `materialize`), as long as JVL runs in that directory.
+
+            Args:
+                filename: Name of the .jvl file within the bundle (no directory part).
+                CLAF: Emit CLAF lines for each section.
+                j: Emit JETPARAM / JETCONTROL blocks.
+
+            Returns: {file name: bytes}, the .jvl file first.
             """
+            if Path(filename).name != filename:
+                raise ValueError(f"Bundle file names cannot contain a directory, got '{filename}'.")
+            sidecars = {}
+            buffer = io.StringIO()
+            self.stream_jvl(buffer, filepath=filename, CLAF=CLAF, j=j, sidecars=sidecars)
+            return {filename: buffer.getvalue().encode(), **sidecars}
+
+    @staticmethod
+    def materialize(bundle, directory=None):
+        """
+        Writes the files of a bundle from `write_jvl_bundle` into `directory` (created if missing).
+
+        Without a directory, a new temporary one is created on the /dev/shm tmpfs where available, so the
+        files never reach a physical disk. The caller removes it when the solver is done.
+
+        Returns: Path of the directory.
+        """
+        if directory is None:
+            shm = Path("/dev/shm")
+            directory = tempfile.mkdtemp(prefix="jvl_bundle_", dir=shm if shm.is_dir() else None)
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, data in bundle.items():
+            (directory / name).write_bytes(data)
+        return directory
+
+    def stream_jvl(
+            self,
+            stream,
+            filepath,
+            CLAF=True,
+            j=True,
+            manifest=None,
+            sidecars=None,
+        ) -> None:
+            """
+            Writes the .jvl file line by line to a text stream (an open file, io.StringIO, a pipe, ...).
+
+            Args:
+                stream: Any object with a `writelines` method accepting strings.
+                filepath: Base path for the .afN / .fuseN sidecar files, which are written to disk
+                    and referenced from the AFIL / BFIL lines.
+                CLAF: Emit CLAF lines for each section.
+                j: Emit JETPARAM / JETCONTROL blocks.
+                manifest: See `iter_jvl`.
+                sidecars: See `iter_jvl`.
+
+            Returns: None
+            """
+            lines = self.iter_jvl(filepath, CLAF=CLAF, j=j, manifest=manifest, sidecars=sidecars)
+            if self.stats is not None:
+                lines = self.stats.track(lines)
+            stream.writelines(line + "\n" for line in lines)
+
+    def iter_jvl(
+            self,
+            filepath,
+            CLAF=True,
+            j=True,
+            manifest=None,
+            sidecars=None,
+        ):
+            """
+            Yields the lines of the .jvl file (without trailing newlines), writing each airfoil and
+            body sidecar next to `filepath` as the section that references it is reached.
+
+            Nothing is accumulated, so memory stays flat regardless of the number of sections.
+
+            Args:
+                filepath: Base path for the .afN / .fuseN sidecar files.
+                CLAF: Emit CLAF lines for each section.
+                j: Emit JETPARAM / JETCONTROL blocks.
+                manifest: Optional {sidecar file name: input hash} dict from the previous write. Sidecars whose
+                    hash matches and that still exist are skipped. Its contents are replaced by the sidecars
+                    emitted by this call, so ones that are no longer referenced drop out.
+                sidecars: Optional dict. If given, sidecars are not written to disk; their contents are
+                    stored in it instead, as {file name: bytes}.
+            """
+            stats = self.stats
+            previous = {}
+            if manifest is not None:
+                previous = dict(manifest)
+                manifest.clear()
+
+            def write_sidecar(path, key, write):
+                # write(path) writes the sidecar to disk, write(None) only returns its contents
+                if stats is not None:
+                    start = time.perf_counter()
+                skipped = previous.get(path.name) == key and path.exists()
+                contents = ""
+                if not skipped:
+                    contents = write(None if sidecars is not None else path)
+                    if sidecars is not None:
+                        sidecars[path.name] = contents.encode()
+                if manifest is not None and sidecars is None:
+                    manifest[path.name] = key
+                if stats is not None:
+                    stats.sidecar(path, time.perf_counter() - start, skipped=skipped, size=len(contents.encode()))
+
+            airplane = self.airplane
+            if stats is not None:
+                stats.begin("header", airplane.name.strip())
+            with _phase(stats, "get_options"):
+                airplane_options = self.get_options(airplane)
+
+            yield from (
+                airplane.name.strip(),
+                "#Mach",
+                "0        ! AeroSandbox note: This is overwritten later to match the current OperatingPoint Mach during the AVL run.",
+                "#IYsym   IZsym   Zsym",
+                f"0       {1 if self.ground_effect else 0}   {self.ground_effect_height}",
+                "#Sref    Cref    Bref",
+                f"{airplane.s_ref} {airplane.c_ref} {airplane.b_ref}",
+                "#Xref    Yref    Zref",
+                f"{self.xyz_ref[0]} {self.xyz_ref[1]} {self.xyz_ref[2]}",
+                "# CDp",
+                f"{airplane_options['profile_drag_coefficient']}",
             )
 
-            control_surface_counter = 0
-            airfoil_counter = 0
+            # One .afN sidecar per unique airfoil, shared by every AFIL line that uses it
+            airfoil_filepaths = {}
+
+            def airfoil_writer(airfoil, af_key):
+                # Kept out of airfoil_file so its closure is only built for new airfoils, not on every section
+                def write_airfoil(path):
+                    with _phase(stats, "repanel"):
+                        repaneled = self.airfoil_cache.repanel(
+                            airfoil, self.airfoil_n_points_per_side, key=af_key
+                        )
+                    with _phase(stats, "write_dat"):
+                        return repaneled.write_dat(filepath=path, include_name=True)
+
+                return write_airfoil
+
+            def airfoil_file(airfoil):
+                with _phase(stats, "airfoil_key"):
+                    af_key = self.airfoil_cache.key(airfoil, self.airfoil_n_points_per_side)
+                af_filepath = airfoil_filepaths.get(af_key)
+                if af_filepath is None:
+                    af_filepath = Path(str(filepath) + f".af{len(airfoil_filepaths)}")
+                    airfoil_filepaths[af_key] = af_filepath
+                    write_sidecar(af_filepath, af_key, airfoil_writer(airfoil, af_key))
+                return af_filepath
 
             for wing in airplane.wings:
 
-                wing_options = self.get_options(wing)
+                if stats is not None:
+                    stats.begin("surface", wing.name.strip(), sections=len(wing.xsecs))
+                with _phase(stats, "get_options"):
+                    wing_options = self.get_options(wing)
+                jet_param = wing.JetParam if isinstance(wing, JWing) else None
 
                 spacing_line = f"{wing_options['chordwise_resolution']}   {self.AVL_spacing_parameters[wing_options['chordwise_spacing']]}"
                 if wing_options["wing_level_spanwise_spacing"]:
@@ -85,72 +655,42 @@ class JVL(AVL):
                     if isinstance(wing, JWing):
                         spacing_line += f"   {wing.JetSpacing['Nujet']}   {wing.JetSpacing['Cspu']}   {wing.JetSpacing['Nwjet']}   {wing.JetSpacing['Cewsp']}"
 
-                jvl_file += clean(
-                    f"""\
-                #{"=" * 79}
-                SURFACE
-                {wing.name}
-                #Nchord  Cspace  [ Nspan Sspace  Nujet Cusp  Nwjet Cwsp ]
-                {spacing_line}
-                
-                """
+                yield from (
+                    f"#{'=' * 79}",
+                    "SURFACE",
+                    wing.name.strip(),
+                    "#Nchord  Cspace  [ Nspan Sspace  Nujet Cusp  Nwjet Cwsp ]",
+                    spacing_line,
+                    "",
                 )
 
                 if wing_options["component"] is not None:
-                    jvl_file += clean(
-                        f"""\
-                    COMPONENT
-                    {wing_options['component']}
-                        
-                    """
-                    )
+                    yield from ("COMPONENT", f"{wing_options['component']}", "")
 
                 if wing.symmetric:
-                    jvl_file += clean(
-                        """\
-                    YDUPLICATE
-                    0
-                        
-                    """
-                    )
+                    yield from ("YDUPLICATE", "0", "")
 
                 if wing_options["no_wake"]:
-                    jvl_file += clean(
-                        """\
-                    NOWAKE
-                    
-                    """
-                    )
+                    yield from ("NOWAKE", "")
 
                 if wing_options["no_alpha_beta"]:
-                    jvl_file += clean(
-                        """\
-                    NOALBE
-                    
-                    """
-                    )
+                    yield from ("NOALBE", "")
 
                 if wing_options["no_load"]:
-                    jvl_file += clean(
-                        """\
-                    NOLOAD
-                    
-                    """
+                    yield from ("NOLOAD", "")
+
+                if j and jet_param is not None:
+                    yield from (
+                        "JETPARAM",
+                        "#hdisk   fh   djet0   djet1   djet3",
+                        f"{jet_param.hdisk:.3f} {jet_param.fh:.3f} {jet_param.djet0:.3f} {jet_param.djet1:.3f} {jet_param.djet3:.6f}",
                     )
-                
-                if j:
-                    if isinstance(wing, JWing) and wing.JetParam is not None:
-                        JetParam = wing.JetParam
-                        jvl_file += clean(
-                            f"""\
-                            JETPARAM
-                            #hdisk   fh   djet0   djet1   djet3
-                            {JetParam.hdisk:.3f} {JetParam.fh:.3f} {JetParam.djet0:.3f} {JetParam.djet1:.3f} {JetParam.djet3:.6f}
-                            """
-                        )
 
+                if isinstance(wing.xsecs, WingJSecArray):
+                    yield from self._iter_section_array(wing, wing_options, jet_param, CLAF, j, airfoil_file)
+                    continue
 
-                ### Build up a buffer of the control surface strings to write to each section
+                ### Build up a buffer of the control surface lines to write to each section
                 control_surface_commands: List[List[str]] = [[] for _ in wing.xsecs]
                 for i, xsec in enumerate(wing.xsecs[:-1]):
                     for surf in xsec.control_surfaces:
@@ -159,99 +699,459 @@ class JVL(AVL):
                         )
                         sign_dup = 1 if surf.symmetric else -1
 
-                        command = clean(
-                            f"""\
-                            CONTROL
-                            #name, gain, Xhinge, XYZhvec, SgnDup
-                            {surf.name} 1 {xhinge:.8g} 0 0 0 {sign_dup}
-                            """
-                        ) + "\n"
-
-                        control_surface_commands[i].append(command)
-                        # control_surface_commands[i + 1].append(command)
+                        control_surface_commands[i] += [
+                            "CONTROL",
+                            "#name, gain, Xhinge, XYZhvec, SgnDup",
+                            f"{surf.name.strip()} 1 {xhinge:.8g} 0 0 0 {sign_dup}",
+                            "",
+                        ]
+                        # control_surface_commands[i + 1] += ...
 
                 ### Write the commands for each wing section
                 for i, xsec in enumerate(wing.xsecs):
 
-                    xsec_options = self.get_options(xsec)
+                    if stats is not None:
+                        stats.begin("section", f"{wing.name.strip()}[{i}]")
+                    with _phase(stats, "get_options"):
+                        xsec_options = self.get_options(xsec)
 
                     xsec_def_line = f"{xsec.xyz_le[0]:.8g} {xsec.xyz_le[1]:.8g} {xsec.xyz_le[2]:.8g} {xsec.chord:.8g} {xsec.twist:.8g}"
                     if not wing_options["wing_level_spanwise_spacing"]:
                         xsec_def_line += f"   {xsec_options['spanwise_resolution']}   {self.AVL_spacing_parameters[xsec_options['spanwise_spacing']]}"
 
-                    if xsec_options["cl_alpha_factor"] is None:
-                        claf_line = f"{1 + 0.77 * xsec.airfoil.max_thickness()}  # Computed using rule from avl_doc.txt"
-                    else:
-                        claf_line = f"{xsec_options['cl_alpha_factor']}"
+                    af_filepath = airfoil_file(xsec.airfoil)
 
-                    af_filepath = Path(str(filepath) + f".af{airfoil_counter}")
-                    airfoil_counter += 1
-                    xsec.airfoil.repanel(50).write_dat(
-                        filepath=af_filepath, include_name=True
-                    )
-
-                    jvl_file += clean(
-                        f"""\
-                    #{"-" * 50}
-                    SECTION
-                    #Xle    Yle    Zle     Chord   Ainc  [Nspanwise   Sspace]
-                    {xsec_def_line}
-                    
-                    AFIL
-                    {af_filepath}
-                    
-                    """
+                    yield from (
+                        f"#{'-' * 50}",
+                        "SECTION",
+                        "#Xle    Yle    Zle     Chord   Ainc  [Nspanwise   Sspace]",
+                        xsec_def_line,
+                        "",
+                        "AFIL",
+                        f"{af_filepath}",
+                        "",
                     )
+                    # Only evaluated when emitted: max_thickness() is one of the costlier per-section calls
                     if CLAF:
-                        jvl_file += clean(
-                            f"""\
-                        CLAF
-                        {claf_line}
-                        
-                        """
-                        )
-                    for control_surface_command in control_surface_commands[i]:
-                        jvl_file += control_surface_command
-                    
+                        if xsec_options["cl_alpha_factor"] is None:
+                            with _phase(stats, "max_thickness"):
+                                claf_line = f"{1 + 0.77 * xsec.airfoil.max_thickness()}  # Computed using rule from avl_doc.txt"
+                        else:
+                            claf_line = f"{xsec_options['cl_alpha_factor']}"
+                        yield from ("CLAF", claf_line, "")
+
+                    yield from control_surface_commands[i]
+
                     # **JETCONTROL and JETPARAM Handling**
-                    if isinstance(xsec, WingJSec):
-                        if j:
-                            if JetParam is None and len(xsec.JetControls) > 0:
-                                raise ValueError("JetControl defined without JetParam in JWing section.")
-                            for param in xsec.JetControls:
-                                jvl_file += clean(
-                                    f"""\
-                                    JETCONTROL
-                                    #Djet  1.0   1.0  ! name, gain, SgnDup
-                                    {param.jet_name} {param.gain:.3f} {param.sgn_dup:.3f}
-                                    """
-                                ) + "\n"
+                    if isinstance(xsec, WingJSec) and j:
+                        if jet_param is None and len(xsec.JetControls) > 0:
+                            raise ValueError("JetControl defined without JetParam in JWing section.")
+                        for param in xsec.JetControls:
+                            yield from (
+                                "JETCONTROL",
+                                "#Djet  1.0   1.0  ! name, gain, SgnDup",
+                                f"{param.jet_name.strip()} {param.gain:.3f} {param.sgn_dup:.3f}",
+                                "",
+                            )
 
-            filepath = Path(filepath)
             for i, fuse in enumerate(airplane.fuselages):
+                if stats is not None:
+                    stats.begin("body", fuse.name.strip())
                 fuse_filepath = Path(str(filepath) + f".fuse{i}")
-                self.write_avl_bfile(fuselage=fuse, filepath=fuse_filepath)
-                fuse_options = self.get_options(fuse)
-
-                jvl_file += clean(
-                    f"""\
-                #{"=" * 50}
-                BODY
-                {fuse.name}
-                {fuse_options['panel_resolution']} {self.AVL_spacing_parameters[fuse_options['panel_spacing']]}
-                
-                BFIL
-                {fuse_filepath}
-                
-                TRANSLATE
-                0 {np.mean([x.xyz_c[1] for x in fuse.xsecs]):.8g} 0
-                
-                """
+                stations = self.fuselage_stations(fuse)
+                fuse_key = self.fuselage_key(fuse, stations)
+
+                def write_body(path):
+                    with _phase(stats, "write_avl_bfile"):
+                        contents = self.body_cache.get(fuse_key, lambda: self.write_avl_bfile(fuse, stations=stations))
+                        if path is not None:
+                            with open(path, "w+") as f:
+                                f.write(contents)
+                    return contents
+
+                write_sidecar(fuse_filepath, fuse_key, write_body)
+                with _phase(stats, "get_options"):
+                    fuse_options = self.get_options(fuse)
+
+                yield from (
+                    f"#{'=' * 50}",
+                    "BODY",
+                    fuse.name.strip(),
+                    f"{fuse_options['panel_resolution']} {self.AVL_spacing_parameters[fuse_options['panel_spacing']]}",
+                    "",
+                    "BFIL",
+                    f"{fuse_filepath}",
+                    "",
+                    "TRANSLATE",
+                    f"0 {np.mean(stations[:, 1]):.8g} 0",
+                    "",
                 )
 
-            if filepath is not None:
-                with open(filepath, "w+") as f:
-                    f.write(jvl_file)
+    def _iter_section_array(self, wing, wing_options, jet_param, CLAF, j, airfoil_file):
+        """
+        The SECTION blocks of a JWing whose xsecs are a `WingJSecArray`, identical to the per-section path.
+        Options are merged once per distinct options dict, AFIL paths and CLAF values once per distinct airfoil,
+        and the CONTROL / JETCONTROL lines are built straight from the record tables.
+        """
+        sections = wing.xsecs
+        n = len(sections)
+        stats = self.stats
+        wing_name = wing.name.strip()
+
+        with _phase(stats, "get_options"):
+            merged = {}
+            section_options = []
+            for i in range(n):
+                options = sections.section_options.get(i, sections.analysis_specific_options)
+                if id(options) not in merged:
+                    merged[id(options)] = self.get_options(sections[i])
+                section_options.append(merged[id(options)])
+
+        # In order of first use, so the .afN numbering matches the per-section path
+        af_filepaths = {}
+        for airfoil in sections.airfoil_index.tolist():
+            if airfoil not in af_filepaths:
+                af_filepaths[airfoil] = airfoil_file(sections.airfoils[airfoil])
+        claf_lines = {}
+
+        def_lines = [
+            f"{x:.8g} {y:.8g} {z:.8g} {c:.8g} {t:.8g}"
+            for x, y, z, c, t in np.column_stack([sections.xyz_le, sections.chord, sections.twist]).tolist()
+        ]
+
+        controls = sections.controls
+        control_names = [name.strip() for name in controls.names]
+        xhinge = np.where(controls.columns["trailing_edge"], 1, -1) * controls.columns["hinge_point"]
+        control_lines = [
+            f"{control_names[name]} 1 {hinge:.8g} 0 0 0 {1 if symmetric else -1}"
+            for name, hinge, symmetric in zip(controls.name.tolist(), xhinge.tolist(), controls.columns["symmetric"].tolist())
+        ]
+
+        jets = sections.jets
+        if j and jet_param is None and len(jets.name) > 0:
+            raise ValueError("JetControl defined without JetParam in JWing section.")
+        jet_names = [name.strip() for name in jets.names]
+        jet_lines = [
+            f"{jet_names[name]} {gain:.3f} {sgn_dup:.3f}"
+            for name, gain, sgn_dup in zip(jets.name.tolist(), jets.columns["gain"].tolist(), jets.columns["sgn_dup"].tolist())
+        ] if j else []
+
+        for i in range(n):
+            if stats is not None:
+                stats.begin("section", f"{wing_name}[{i}]")
+            xsec_options = section_options[i]
+            xsec_def_line = def_lines[i]
+            if not wing_options["wing_level_spanwise_spacing"]:
+                xsec_def_line += f"   {xsec_options['spanwise_resolution']}   {self.AVL_spacing_parameters[xsec_options['spanwise_spacing']]}"
+            airfoil = sections.airfoil_index[i]
+
+            yield from (
+                f"#{'-' * 50}",
+                "SECTION",
+                "#Xle    Yle    Zle     Chord   Ainc  [Nspanwise   Sspace]",
+                xsec_def_line,
+                "",
+                "AFIL",
+                f"{af_filepaths[airfoil]}",
+                "",
+            )
+            if CLAF:
+                if xsec_options["cl_alpha_factor"] is None:
+                    if airfoil not in claf_lines:
+                        with _phase(stats, "max_thickness"):
+                            claf_lines[airfoil] = f"{1 + 0.77 * sections.airfoils[airfoil].max_thickness()}  # Computed using rule from avl_doc.txt"
+                    claf_line = claf_lines[airfoil]
+                else:
+                    claf_line = f"{xsec_options['cl_alpha_factor']}"
+                yield from ("CLAF", claf_line, "")
+
+            if i < n - 1:
+                for row in controls.rows(i):
+                    yield from ("CONTROL", "#name, gain, Xhinge, XYZhvec, SgnDup", control_lines[row], "")
+
+            if j:
+                for row in jets.rows(i):
+                    yield from ("JETCONTROL", "#Djet  1.0   1.0  ! name, gain, SgnDup", jet_lines[row], "")
+
+    @staticmethod
+    def fuselage_stations(fuselage):
+        """
+        The stations of a fuselage as an (N, 6) array of x, y, z, width, height, shape. Taken straight from the
+        arrays of a `FuselageXSecArray`, gathered per section otherwise.
+        """
+        xsecs = fuselage.xsecs
+        if isinstance(xsecs, FuselageXSecArray):
+            return np.column_stack([xsecs.xyz_c, xsecs.width, xsecs.height, xsecs.shape])
+        return np.array([[*xsec.xyz_c, xsec.width, xsec.height, xsec.shape] for xsec in xsecs], dtype=float).reshape(-1, 6)
+
+    @staticmethod
+    def fuselage_key(fuselage, stations=None):
+        """
+        Content hash of everything `write_avl_bfile` reads from a fuselage.
+
+        Args:
+            fuselage: The asb.Fuselage.
+            stations: Its `fuselage_stations`, if already computed.
+        """
+        if stations is None:
+            stations = JVL.fuselage_stations(fuselage)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(str(fuselage.name).encode())
+        h.update(np.ascontiguousarray(stations, dtype=float).tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def write_avl_bfile(fuselage, filepath=None, include_name=True, stations=None) -> str:
+        """
+        Same BFIL file as asb.AVL.write_avl_bfile, generated in one vectorized pass over the stations: the
+        equivalent radius of every superellipse section (area preserving, with asb's closed-form area), then the
+        upper profile from tail to nose and the lower profile from nose to tail.
+
+        Args:
+            fuselage: The asb.Fuselage.
+            filepath: Path to write the file to. If None, only the contents are returned.
+            include_name: Write the fuselage name as the first line (needed by JVL).
+            stations: Its `fuselage_stations`, if already computed.
+
+        Returns: The file contents.
+        """
+        if stations is None:
+            stations = JVL.fuselage_stations(fuselage)
+        x, z, width, height, shape = stations[:, 0], stations[:, 2], stations[:, 3], stations[:, 4], stations[:, 5]
+        radius = (width * height / (shape ** -1.8717618013591173 + 1) / np.pi + 1e-16) ** 0.5
+        profile = np.concatenate([
+            np.column_stack([x, z + radius])[::-1],
+            np.column_stack([x, z - radius])[1:],
+        ])
+
+        contents = [fuselage.name] if include_name else []
+        contents += [f"{xi:.8g} {zi:.8g}" for xi, zi in profile.tolist()]
+        string = "\n".join(contents)
+
+        if filepath is not None:
+            with open(filepath, "w+") as f:
+                f.write(string)
+
+        return string
+
+    def control_names(self):
+        """
+        Names of the CONTROL variables in the order JVL numbers them (first appearance in the .jvl file).
+        """
+        names = {}
+        for wing in self.airplane.wings:
+            for xsec in wing.xsecs[:-1]:
+                for surf in xsec.control_surfaces:
+                    names.setdefault(surf.name.strip(), None)
+        return list(names)
+
+    def jet_names(self, j=True):
+        """
+        Names of the JETCONTROL variables in the order JVL numbers them (first appearance in the .jvl file).
+        """
+        names = {}
+        if j:
+            for wing in self.airplane.wings:
+                for xsec in wing.xsecs:
+                    for param in getattr(xsec, "JetControls", []):
+                        names.setdefault(param.jet_name.strip(), None)
+        return list(names)
+
+    def run_variables(self, j=True):
+        """
+        {variable: default value} for every JVL operating variable, in JVL order: alpha, beta, pb/2V, qc/2V, rb/2V,
+        then the controls (defaulting to their ControlSurface deflection) and the jets (defaulting to 0).
+        """
+        op_point = self.op_point
+        airplane = self.airplane
+        defaults = {
+            "alpha": op_point.alpha,
+            "beta": op_point.beta,
+            "pb/2V": op_point.p * airplane.b_ref / (2 * op_point.velocity),
+            "qc/2V": op_point.q * airplane.c_ref / (2 * op_point.velocity),
+            "rb/2V": op_point.r * airplane.b_ref / (2 * op_point.velocity),
+        }
+        for wing in airplane.wings:
+            for xsec in wing.xsecs[:-1]:
+                for surf in xsec.control_surfaces:
+                    defaults.setdefault(surf.name.strip(), surf.deflection)
+        for name in self.jet_names(j=j):
+            defaults[name] = 0
+        return defaults
+
+    def write_run(self, filepath, **kwargs) -> None:
+        """
+        Writes a .run file with one run case per operating point. See `stream_run` for the arguments.
+        """
+        with open(filepath, "w+") as f:
+            self.stream_run(f, **kwargs)
+
+    def stream_run(
+            self,
+            stream,
+            names=None,
+            variables=None,
+            constraints=None,
+            parameters=None,
+            j=True,
+        ) -> None:
+        """
+        Writes run cases to a text stream in the JVL .run file format.
+
+        Every value may be a scalar or a 1D array; all of them are broadcast together and each entry becomes one
+        run case, so a whole flap-blowing sweep is written in a single call:
+
+            avl_plane.write_run(
+                "821p1.run",
+                names=["takeoff", "cruise"],
+                constraints={"alpha": ("CL", [4.0, 0.2]), "Elevator": ("Cm", 0)},
+                variables={"Flap1": [45, 0], "Flap2": [40, 0], "FlapJet1": [4.7, 0], "FlapJet2": [4.7, 0]},
+                parameters={"velocity": [4.86, 21.75], "X_cg": [0.145, 0.12]},
+            )
+
+        Args:
+            stream: Any object with a `write` method accepting strings.
+            names: Run case names, a list (or a single string, numbered per case). Defaults to "case N".
+            variables: {variable: value} for directly set variables. Variables are alpha, beta, pb/2V, qc/2V,
+                rb/2V, the control names from `control_names()` and the jet names from `jet_names()`.
+                Unset variables default to the op_point (flight state), the ControlSurface deflection
+                (controls) or 0 (jets).
+            constraints: {variable: (constraint, value)} for trimmed variables. Constraint is another variable
+                name or one of CL, CY, Cl, Cm, Cn.
+            parameters: {parameter: value} overrides for the case parameter block (velocity, density, mass,
+                X_cg, ...; see `run_parameter_units`). Defaults come from the op_point and xyz_ref.
+            j: Include jet variables.
+
+        Returns: None
+        """
+        variables = dict(variables or {})
+        constraints = dict(constraints or {})
+        parameters = dict(parameters or {})
+        op_point = self.op_point
+        defaults = self.run_variables(j=j)
+
+        for name in list(variables) + list(constraints):
+            if name not in defaults:
+                raise ValueError(f"Unknown run variable '{name}'. Valid variables are: {list(defaults)}")
+        both = set(variables) & set(constraints)
+        if both:
+            raise ValueError(f"Variables {sorted(both)} are both set and constrained.")
+
+        constraint_names = {**{name: name for name in defaults}, **self.run_constraint_names}
+
+        ### Parameter block defaults; alpha and the rates double as the initial guess for trimmed cases
+        parameter_values = {name: 0 for name in self.run_parameter_units}
+        parameter_values.update({
+            name: variables.get(name, defaults[name]) for name in ["alpha", "beta", "pb/2V", "qc/2V", "rb/2V"]
+        })
+        parameter_values.update({
+            "velocity": op_point.velocity,
+            "density": op_point.atmosphere.density(),
+            "grav.acc.": 9.81,
+            "load_fac.": 1,
+            "X_cg": self.xyz_ref[0],
+            "Y_cg": self.xyz_ref[1],
+            "Z_cg": self.xyz_ref[2],
+            "mass": 1,
+            "Ixx": 1,
+            "Iyy": 1,
+            "Izz": 1,
+        })
+        for name, value in parameters.items():
+            if name not in parameter_values:
+                raise ValueError(f"Unknown run parameter '{name}'. Valid parameters are: {list(parameter_values)}")
+            parameter_values[name] = value
+        if "Mach" not in parameters:
+            parameter_values["Mach"] = np.asarray(parameter_values["velocity"]) / op_point.atmosphere.speed_of_sound()
+
+        ### Build a single-case template once, then fill it for every case
+        lines = ["", " ---------------------------------------------", " Run case {0:2d}:  {1}", ""]
+        columns = []
+        for name in defaults:
+            if name in constraints:
+                constraint, value = constraints[name]
+                if constraint not in constraint_names:
+                    raise ValueError(f"Unknown constraint '{constraint}' for '{name}'. Valid constraints are: {list(constraint_names)}")
+                constraint = constraint_names[constraint]
+            else:
+                constraint, value = name, variables.get(name, defaults[name])
+            lines.append(f" {name:<12} ->  {constraint:<16}= {{{len(columns) + 2}:12.6g}}")
+            columns.append(value)
+        lines.append("")
+        for name, unit in self.run_parameter_units.items():
+            lines.append(f" {name:<10}= {{{len(columns) + 2}:12.6g}}     {unit}")
+            columns.append(parameter_values[name])
+        template = "\n".join(lines) + "\n"
+
+        columns = [np.asarray(column, dtype=float) for column in columns]
+        shape = np.broadcast_shapes(*[column.shape for column in columns], np.shape(names) if names is not None and not isinstance(names, str) else ())
+        if len(shape) > 1:
+            raise ValueError(f"Run case inputs must be scalars or 1D arrays, got broadcast shape {shape}.")
+        n_cases = shape[0] if shape else 1
+
+        if names is None:
+            names = [f"case {i + 1}" for i in range(n_cases)]
+        elif isinstance(names, str):
+            names = [names] if n_cases == 1 else [f"{names} {i + 1}" for i in range(n_cases)]
+        else:
+            names = list(np.broadcast_to(np.asarray(names, dtype=object), (n_cases,)))
+
+        table = np.stack([np.broadcast_to(column, (n_cases,)) for column in columns], axis=1)
+        stream.write("".join(
+            template.format(i + 1, name, *row) for i, (name, row) in enumerate(zip(names, table.tolist()))
+        ))
+
+    # Short names accepted for the force and moment constraints, and their names in the .run file
+    run_constraint_names = {
+        "CL": "CL",
+        "CY": "CY",
+        "Cl": "Cl roll mom",
+        "Cm": "Cm pitchmom",
+        "Cn": "Cn yaw  mom",
+    }
+
+    run_parameter_units = {
+        "alpha": "deg",
+        "beta": "deg",
+        "pb/2V": "",
+        "qc/2V": "",
+        "rb/2V": "",
+        "CL": "",
+        "CDo": "",
+        "bank": "deg",
+        "elevation": "deg",
+        "heading": "deg",
+        "Mach": "",
+        "velocity": "m/s",
+        "density": "kg/m^3",
+        "grav.acc.": "m/s^2",
+        "turn_rad.": "m",
+        "load_fac.": "",
+        "X_cg": "m",
+        "Y_cg": "m",
+        "Z_cg": "m",
+        "mass": "kg",
+        "Ixx": "kg-m^2",
+        "Iyy": "kg-m^2",
+        "Izz": "kg-m^2",
+        "Ixy": "kg-m^2",
+        "Iyz": "kg-m^2",
+        "Izx": "kg-m^2",
+        "hx": "kg-m^2/s",
+        "hy": "kg-m^2/s",
+        "hz": "kg-m^2/s",
+        "DVj exp.": "",
+        "add. CL_a": "",
+        "add. CL_u": "",
+        "CL_adot": "",
+        "add. CD_a": "",
+        "add. CD_u": "",
+        "CD_adot": "",
+        "add. CM_a": "",
+        "add. CM_u": "",
+        "CM_adot": "",
+    }
+
 class JetParam:
     def __init__(self, name = 'JET', hdisk=0.45, fh=1.0, djet0=-2.0, djet1=-0.2, djet3=-0.0003):
         """
@@ -290,7 +1190,7 @@ class JetControl:
 
 class WingJSec(asb.WingXSec):
     def __init__(self, xyz_le, chord, twist, airfoil, control_surfaces=None,
-                 JetControls=[]):
+                 JetControls=None):
         """
         Extended WingXSec class with Jet Control (JETCONTROL & JETPARAM)
         
@@ -302,5 +1202,458 @@ class WingJSec(asb.WingXSec):
         :param JetControls: List of JetControl objects
         """
         super().__init__(xyz_le=xyz_le, chord=chord, twist=twist, airfoil=airfoil, control_surfaces=control_surfaces)
-        self.JetControls = JetControls
-    
+        # A fresh list per section: a shared default would let appending to one section's jets change them all
+        self.JetControls = [] if JetControls is None else JetControls
+
+
+class _SectionTable:
+    def __init__(self, n_sections, fields, section=(), names=(), columns=None):
+        """
+        Variable-length per-section records (control surfaces or jet controls) stored as flat arrays, sorted by
+        section: the records of section i are rows ptr[i]:ptr[i + 1]. Names are interned in `names` and each row
+        stores an index into it.
+
+        :param n_sections: Number of sections
+        :param fields: {field: (dtype, default)} of the value columns
+        :param section: Section index of every record. Records of one section keep their given order
+        :param names: Name of every record
+        :param columns: {field: value or per-record values}; missing fields take their default
+        """
+        columns = columns or {}
+        section = np.asarray(section, dtype=int).reshape(-1)
+        order = np.argsort(section, kind="stable")
+        self.fields = fields
+        self.names = []
+        self._name_index = {}
+        self.name = np.array([self.intern(name) for name in names], dtype=int).reshape(-1)[order]
+        self.columns = {
+            field: np.broadcast_to(np.asarray(columns.get(field, default), dtype=dtype), section.shape)[order].copy()
+            for field, (dtype, default) in fields.items()
+        }
+        self.ptr = np.concatenate([[0], np.cumsum(np.bincount(section, minlength=n_sections))]).astype(int)
+
+    def intern(self, name):
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def rows(self, i):
+        return range(self.ptr[i], self.ptr[i + 1])
+
+    def replace(self, i, names, columns):
+        """Replaces the records of section i with new ones ({field: per-record values})."""
+        start, stop = self.ptr[i], self.ptr[i + 1]
+        names = list(names)
+        self.name = np.concatenate([self.name[:start], np.array([self.intern(n) for n in names], dtype=int), self.name[stop:]])
+        for field, (dtype, default) in self.fields.items():
+            values = np.broadcast_to(np.asarray(columns.get(field, default), dtype=dtype), (len(names),))
+            self.columns[field] = np.concatenate([self.columns[field][:start], values, self.columns[field][stop:]])
+        self.ptr[i + 1:] += len(names) - (stop - start)
+
+
+def _column(field):
+    def fget(self):
+        return self._table.columns[field][self._row].item()
+
+    def fset(self, value):
+        self._table.columns[field][self._row] = value
+
+    return property(fget, fset)
+
+
+def _interned_name():
+    def fget(self):
+        return self._table.names[self._table.name[self._row]]
+
+    def fset(self, value):
+        self._table.name[self._row] = self._table.intern(value)
+
+    return property(fget, fset)
+
+
+class ControlSurfaceView:
+    """
+    One control surface of a `WingJSecArray` section, with the asb.ControlSurface attributes. Reads and writes go
+    to the arrays. Only valid until records are added or removed.
+    """
+    __slots__ = ("_table", "_row")
+    analysis_specific_options = {}
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    name = _interned_name()
+    hinge_point = _column("hinge_point")
+    symmetric = _column("symmetric")
+    trailing_edge = _column("trailing_edge")
+    deflection = _column("deflection")
+
+
+class JetControlView:
+    """
+    One jet control of a `WingJSecArray` section, with the `JetControl` attributes. Reads and writes go to the
+    arrays. Only valid until records are added or removed.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    jet_name = _interned_name()
+    gain = _column("gain")
+    sgn_dup = _column("sgn_dup")
+
+
+class WingJSecView(WingJSec):
+    def __init__(self, sections, index):
+        """
+        One section of a `WingJSecArray`, presenting the `WingJSec` interface. Reads and writes go to the arrays;
+        assigning `control_surfaces` or `JetControls` replaces that section's records.
+
+        :param sections: The WingJSecArray
+        :param index: Section index
+        """
+        self._sections = sections
+        self._index = index
+
+    @property
+    def xyz_le(self):
+        return self._sections.xyz_le[self._index]
+
+    @xyz_le.setter
+    def xyz_le(self, value):
+        self._sections.xyz_le[self._index] = value
+
+    @property
+    def chord(self):
+        return self._sections.chord[self._index].item()
+
+    @chord.setter
+    def chord(self, value):
+        self._sections.chord[self._index] = value
+
+    @property
+    def twist(self):
+        return self._sections.twist[self._index].item()
+
+    @twist.setter
+    def twist(self, value):
+        self._sections.twist[self._index] = value
+
+    @property
+    def airfoil(self):
+        return self._sections.airfoils[self._sections.airfoil_index[self._index]]
+
+    @airfoil.setter
+    def airfoil(self, value):
+        self._sections.airfoil_index[self._index] = self._sections.intern_airfoil(value)
+
+    @property
+    def control_surfaces(self):
+        table = self._sections.controls
+        return [ControlSurfaceView(table, row) for row in table.rows(self._index)]
+
+    @control_surfaces.setter
+    def control_surfaces(self, value):
+        value = value or []
+        self._sections.controls.replace(self._index, [surf.name for surf in value], {
+            field: [getattr(surf, field) for surf in value] for field in self._sections.control_fields
+        })
+
+    @property
+    def JetControls(self):
+        table = self._sections.jets
+        return [JetControlView(table, row) for row in table.rows(self._index)]
+
+    @JetControls.setter
+    def JetControls(self, value):
+        value = value or []
+        self._sections.jets.replace(self._index, [param.jet_name for param in value], {
+            field: [getattr(param, field) for param in value] for field in self._sections.jet_fields
+        })
+
+    @property
+    def analysis_specific_options(self):
+        return self._sections.section_options.get(self._index, self._sections.analysis_specific_options)
+
+    @analysis_specific_options.setter
+    def analysis_specific_options(self, value):
+        self._sections.section_options[self._index] = value
+
+    def materialize(self):
+        """A standalone `WingJSec` copy of this section."""
+        xsec = WingJSec(
+            xyz_le=np.array(self.xyz_le),
+            chord=self.chord,
+            twist=self.twist,
+            airfoil=self.airfoil,
+            control_surfaces=[
+                asb.ControlSurface(name=surf.name, symmetric=surf.symmetric, deflection=surf.deflection,
+                                   hinge_point=surf.hinge_point, trailing_edge=surf.trailing_edge)
+                for surf in self.control_surfaces
+            ],
+            JetControls=[JetControl(jet_name=param.jet_name, gain=param.gain, sgn_dup=param.sgn_dup) for param in self.JetControls],
+        )
+        xsec.analysis_specific_options = self.analysis_specific_options
+        return xsec
+
+    def translate(self, xyz):
+        return self.materialize().translate(xyz)
+
+
+class WingJSecArray:
+    # {field: (dtype, default)} of the control surface and jet control records
+    control_fields = {
+        "hinge_point": (float, 0.75),
+        "symmetric": (bool, True),
+        "trailing_edge": (bool, True),
+        "deflection": (float, 0.0),
+    }
+    jet_fields = {
+        "gain": (float, 1.0),
+        "sgn_dup": (float, 1.0),
+    }
+
+    def __init__(self, xyz_le, chord, twist, airfoil, control_surfaces=None, JetControls=None, analysis_specific_options=None):
+        """
+        Array-backed list of wing sections, for JWings with many stations. Use it as `JWing(xsecs=...)`.
+
+        Section geometry is held in (N, 3) / (N,) arrays, airfoils are stored once per distinct object, and control
+        surfaces and jet controls are flat record tables with interned names (see `_SectionTable`). Indexing gives
+        `WingJSecView`s, so code written for lists of `WingJSec` keeps working, while `write_jvl` emits the SECTION
+        blocks of the whole array in one pass.
+
+        :param xyz_le: Leading edge positions, shape (N, 3)
+        :param chord: Chords, shape (N,) or a scalar
+        :param twist: Twists [deg], shape (N,) or a scalar
+        :param airfoil: An asb.Airfoil for every section, or a sequence of N airfoils
+        :param control_surfaces: Control surfaces as a list of dicts, one per control: "name", "sections" (indices,
+            a slice or a bool mask of the sections carrying it) and optionally "hinge_point", "symmetric",
+            "trailing_edge" and "deflection" (scalars, or one value per listed section). Within a section,
+            controls keep their list order. As in `write_jvl`, controls on the last section are not emitted
+        :param JetControls: Jet controls in the same form, with "name", "sections", and optionally "gain" and "sgn_dup"
+        :param analysis_specific_options: Options shared by every section; assigning a section's
+            `analysis_specific_options` overrides them for that section only
+        """
+        self.xyz_le = np.array(xyz_le, dtype=float).reshape(-1, 3)
+        n = len(self.xyz_le)
+        self.chord = np.broadcast_to(np.asarray(chord, dtype=float), (n,)).copy()
+        self.twist = np.broadcast_to(np.asarray(twist, dtype=float), (n,)).copy()
+        self.airfoils = []
+        airfoils = [airfoil] * n if isinstance(airfoil, asb.Airfoil) else list(airfoil)
+        self.airfoil_index = np.array([self.intern_airfoil(af) for af in airfoils], dtype=int)
+        self.controls = self._table(control_surfaces, self.control_fields)
+        self.jets = self._table(JetControls, self.jet_fields)
+        self.analysis_specific_options = {} if analysis_specific_options is None else analysis_specific_options
+        self.section_options = {}
+
+    def _table(self, spans, fields):
+        n = len(self)
+        sections, names, columns = [], [], {field: [] for field in fields}
+        for span in spans or []:
+            index = np.arange(n)[span["sections"]]
+            sections.append(index)
+            names += [span["name"]] * len(index)
+            for field, (dtype, default) in fields.items():
+                columns[field].append(np.broadcast_to(np.asarray(span.get(field, default), dtype=dtype), index.shape))
+        return _SectionTable(
+            n, fields,
+            section=np.concatenate(sections) if sections else [],
+            names=names,
+            columns={field: np.concatenate(values) for field, values in columns.items() if values},
+        )
+
+    @classmethod
+    def from_xsecs(cls, xsecs):
+        """
+        Converts a list of `WingJSec` (or asb.WingXSec) into a WingJSecArray with the same sections.
+        """
+        xsecs = list(xsecs)
+        sections = cls(
+            xyz_le=[xsec.xyz_le for xsec in xsecs],
+            chord=[xsec.chord for xsec in xsecs],
+            twist=[xsec.twist for xsec in xsecs],
+            airfoil=[xsec.airfoil for xsec in xsecs],
+        )
+        for tables, attribute, name, fields in (
+                ("controls", "control_surfaces", "name", cls.control_fields),
+                ("jets", "JetControls", "jet_name", cls.jet_fields),
+        ):
+            records = [(i, record) for i, xsec in enumerate(xsecs) for record in getattr(xsec, attribute, [])]
+            setattr(sections, tables, _SectionTable(
+                len(xsecs), fields,
+                section=[i for i, _ in records],
+                names=[getattr(record, name) for _, record in records],
+                columns={field: [getattr(record, field) for _, record in records] for field in fields} if records else {},
+            ))
+        # Identical option dicts (e.g. the same default {}) collapse into the shared one
+        options = [xsec.analysis_specific_options for xsec in xsecs]
+        if options and all(o == options[0] for o in options):
+            sections.analysis_specific_options = options[0]
+        else:
+            sections.section_options = dict(enumerate(options))
+        return sections
+
+    def intern_airfoil(self, airfoil):
+        # By identity; the table holds the few distinct airfoil objects of the wing
+        for index, known in enumerate(self.airfoils):
+            if known is airfoil:
+                return index
+        self.airfoils.append(airfoil)
+        return len(self.airfoils) - 1
+
+    def __len__(self):
+        return len(self.chord)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [WingJSecView(self, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("section index out of range")
+        return WingJSecView(self, index)
+
+    def __iter__(self):
+        return (WingJSecView(self, i) for i in range(len(self)))
+
+    def to_xsecs(self):
+        """The sections as a list of standalone `WingJSec`s."""
+        return [view.materialize() for view in self]
+
+
+class FuselageXSecView(asb.FuselageXSec):
+    def __init__(self, stations, index):
+        """
+        One station of a `FuselageXSecArray`, presenting the asb.FuselageXSec interface. Reads and writes go to the
+        arrays.
+
+        :param stations: The FuselageXSecArray
+        :param index: Station index
+        """
+        self._stations = stations
+        self._index = index
+
+    @property
+    def xyz_c(self):
+        return self._stations.xyz_c[self._index]
+
+    @xyz_c.setter
+    def xyz_c(self, value):
+        self._stations.xyz_c[self._index] = value
+
+    @property
+    def xyz_normal(self):
+        return self._stations.xyz_normal[self._index]
+
+    @xyz_normal.setter
+    def xyz_normal(self, value):
+        self._stations.xyz_normal[self._index] = value
+
+    @property
+    def width(self):
+        return self._stations.width[self._index].item()
+
+    @width.setter
+    def width(self, value):
+        self._stations.width[self._index] = value
+
+    @property
+    def height(self):
+        return self._stations.height[self._index].item()
+
+    @height.setter
+    def height(self, value):
+        self._stations.height[self._index] = value
+
+    @property
+    def shape(self):
+        return self._stations.shape[self._index].item()
+
+    @shape.setter
+    def shape(self, value):
+        self._stations.shape[self._index] = value
+
+    @property
+    def analysis_specific_options(self):
+        return self._stations.analysis_specific_options
+
+    @analysis_specific_options.setter
+    def analysis_specific_options(self, value):
+        self._stations.analysis_specific_options = value
+
+    def materialize(self):
+        """A standalone asb.FuselageXSec copy of this station."""
+        return asb.FuselageXSec(
+            xyz_c=np.array(self.xyz_c),
+            xyz_normal=np.array(self.xyz_normal),
+            width=self.width,
+            height=self.height,
+            shape=self.shape,
+            analysis_specific_options=self.analysis_specific_options,
+        )
+
+    def translate(self, xyz):
+        return self.materialize().translate(xyz)
+
+
+class FuselageXSecArray:
+    def __init__(self, xyz_c, width, height, shape=2.0, xyz_normal=(1, 0, 0), analysis_specific_options=None):
+        """
+        Array-backed list of fuselage stations, for bodies with many stations. Use it as `asb.Fuselage(xsecs=...)`.
+
+        Stations are held in (N, 3) / (N,) arrays. Indexing gives `FuselageXSecView`s, so code written for lists of
+        asb.FuselageXSec keeps working, while `JVL.write_avl_bfile` and `JVL.fuselage_key` read the arrays directly.
+
+        :param xyz_c: Section centers, shape (N, 3)
+        :param width: Widths, shape (N,) or a scalar
+        :param height: Heights, shape (N,) or a scalar
+        :param shape: Superellipse exponents, shape (N,) or a scalar (2 is a circle, large values a square)
+        :param xyz_normal: Section normals, shape (N, 3) or a single vector
+        :param analysis_specific_options: Options shared by every station
+        """
+        self.xyz_c = np.array(xyz_c, dtype=float).reshape(-1, 3)
+        n = len(self.xyz_c)
+        self.width = np.broadcast_to(np.asarray(width, dtype=float), (n,)).copy()
+        self.height = np.broadcast_to(np.asarray(height, dtype=float), (n,)).copy()
+        self.shape = np.broadcast_to(np.asarray(shape, dtype=float), (n,)).copy()
+        self.xyz_normal = np.broadcast_to(np.asarray(xyz_normal, dtype=float), (n, 3)).copy()
+        self.analysis_specific_options = {} if analysis_specific_options is None else analysis_specific_options
+
+    @classmethod
+    def from_xsecs(cls, xsecs):
+        """
+        Converts a list of asb.FuselageXSec into a FuselageXSecArray with the same stations.
+        """
+        xsecs = list(xsecs)
+        return cls(
+            xyz_c=[xsec.xyz_c for xsec in xsecs],
+            width=[xsec.width for xsec in xsecs],
+            height=[xsec.height for xsec in xsecs],
+            shape=[xsec.shape for xsec in xsecs],
+            xyz_normal=np.array([xsec.xyz_normal for xsec in xsecs], dtype=float).reshape(-1, 3),
+            analysis_specific_options=xsecs[0].analysis_specific_options if xsecs else None,
+        )
+
+    def __len__(self):
+        return len(self.width)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [FuselageXSecView(self, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("station index out of range")
+        return FuselageXSecView(self, index)
+
+    def __iter__(self):
+        return (FuselageXSecView(self, i) for i in range(len(self)))
+
+    def to_xsecs(self):
+        """The stations as a list of standalone asb.FuselageXSecs."""
+        return [view.materialize() for view in self]
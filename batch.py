@@ -0,0 +1,227 @@
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def parameter_rows(params):
+    """
+    Converts a parameter table into a list of {name: value} dicts, one per variant.
+
+    Args:
+        params: Either a dict of equal-length 1D arrays (or lists), or a structured NumPy array.
+
+    Returns: list of dicts of plain Python scalars.
+    """
+    if isinstance(params, np.ndarray) and params.dtype.names is not None:
+        columns = {name: params[name] for name in params.dtype.names}
+    else:
+        columns = {name: np.asarray(values) for name, values in params.items()}
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"All parameter columns must have the same length, got lengths {sorted(lengths)}.")
+
+    names = list(columns)
+    values = zip(*[columns[name].tolist() for name in names])
+    return [dict(zip(names, row)) for row in values]
+
+
+def _write_variant(task):
+    index, row, factory, directory, filename, CLAF, j = task
+    directory.mkdir(parents=True, exist_ok=True)
+    jvl_path = directory / filename
+
+    avl_plane = factory(**row)
+    # From a bundle, so the AFIL / BFIL lines are bare file names and the variant directory is self-contained
+    bundle = avl_plane.write_jvl_bundle(filename=filename, CLAF=CLAF, j=j)
+    avl_plane.materialize(bundle, directory)
+
+    return {
+        "index": index,
+        "params": row,
+        "directory": str(directory),
+        "jvl": str(jvl_path),
+        "sidecars": sorted(str(directory / name) for name in bundle if name != filename),
+    }
+
+
+def write_jvl_batch(
+        factory,
+        params,
+        output_dir,
+        filename="airplane.jvl",
+        max_workers=None,
+        CLAF=True,
+        j=True,
+    ):
+    """
+    Writes one .jvl file (plus its .afN/.fuseN sidecars) per row of a parameter table, across a process pool.
+
+    Each variant gets its own directory `output_dir/NNNNN`, so sidecars never collide, and its AFIL / BFIL lines
+    reference the sidecars by bare file name, so the directory can be moved and run in place. Worker processes
+    are reused across variants, so the aerosandbox import is paid once per worker rather than once per variant.
+
+    Args:
+        factory: Callable taking the parameters of one row as keyword arguments and returning a `JVL`.
+            Must be picklable (a module-level function) when max_workers != 1.
+        params: Parameter table, a dict of equal-length arrays or a structured NumPy array.
+        output_dir: Directory under which the per-variant directories are created.
+        filename: Name of the .jvl file inside each variant directory.
+        max_workers: Process pool size. Defaults to os.cpu_count(). Set to 1 to run in this process.
+        CLAF: Passed to `JVL.write_jvl_bundle`.
+        j: Passed to `JVL.write_jvl_bundle`.
+
+    Returns: The manifest, a list with one dict per row (index, params, directory, jvl, sidecars),
+        in row order. It is also written to `output_dir/manifest.json`.
+    """
+    output_dir = Path(output_dir)
+    rows = parameter_rows(params)
+    tasks = [
+        (i, row, factory, output_dir / f"{i:05d}", filename, CLAF, j)
+        for i, row in enumerate(rows)
+    ]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers == 1 or len(tasks) <= 1:
+        manifest = [_write_variant(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            manifest = list(pool.map(_write_variant, tasks, chunksize=chunksize))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+# Run-file parameters filled from the mass properties, so the .run and .mass files describe the same airplane:
+# {parameter: (asb.MassProperties attribute, sign)}. Products of inertia flip sign, as in export_AVL_mass_file.
+MASS_PARAMETERS = {
+    "mass": ("mass", 1),
+    "X_cg": ("x_cg", 1),
+    "Y_cg": ("y_cg", 1),
+    "Z_cg": ("z_cg", 1),
+    "Ixx": ("Ixx", 1),
+    "Iyy": ("Iyy", 1),
+    "Izz": ("Izz", 1),
+    "Ixy": ("Ixy", -1),
+    "Iyz": ("Iyz", -1),
+    "Izx": ("Ixz", -1),
+}
+
+
+def write_job(
+        jvl,
+        directory,
+        mass=None,
+        run=None,
+        name="airplane",
+        CLAF=True,
+        j=True,
+        overwrite=False,
+    ):
+    """
+    Writes a complete JVL job directory from one `JVL` object and one mass model: `<name>.jvl` with its .afN /
+    .fuseN sidecars, `<name>.mass`, `<name>.run` and `job.json`.
+
+    All files come from the same objects, so the control and jet names of the .run file are those of the .jvl
+    file, and the run cases take their mass, CG and inertia from the .mass file (unless `run` overrides them).
+    The three files are generated concurrently into a hidden staging directory next to `directory`, which is
+    then renamed into place, so a scheduler watching the parent never sees a partial job; if any file fails
+    (e.g. the run cases name an unknown control), nothing is published. The .jvl references
+    its sidecars by bare file name (see `JVL.write_jvl_bundle`), so run JVL from inside the job directory.
+
+        plane = geom.build_airplane()
+        write_job(geom.build_avl_plane(plane), "jobs/821p1", mass=mass.build_mass_model(plane))
+
+    Args:
+        jvl: The `JVL` object.
+        directory: The job directory to create.
+        mass: A `massmodel.MassModel` (unbatched), an asb.MassProperties, the path to an existing .mass file
+            (copied as is), or None for no .mass file.
+        run: `JVL.write_run` keyword arguments. Defaults to a single case at the op_point.
+        name: Base name of the .jvl, .mass and .run files.
+        CLAF: Passed to `JVL.write_jvl_bundle`.
+        j: Passed to `JVL.write_jvl_bundle` and `JVL.write_run`.
+        overwrite: Replace an existing job directory: it is moved aside, then the new one is renamed in, so
+            the path briefly does not exist but never holds a mix of both. Otherwise an existing directory
+            raises FileExistsError.
+
+    Returns: The job description also written to `job.json`: dict with "directory", "jvl", "mass" and "run"
+        (file names within the directory, "mass" None without a mass file), "sidecars", "controls" and "jets".
+    """
+    directory = Path(directory)
+    if directory.exists() and not overwrite:
+        raise FileExistsError(f"Job directory '{directory}' already exists.")
+
+    run = dict(run or {})
+    mass_properties = mass.mass_properties() if hasattr(mass, "mass_properties") else mass
+    if mass_properties is not None and not isinstance(mass_properties, (str, Path)):
+        run["parameters"] = {
+            **{parameter: sign * getattr(mass_properties, attribute) for parameter, (attribute, sign) in MASS_PARAMETERS.items()},
+            **(run.get("parameters") or {}),
+        }
+
+    jvl_file, mass_file, run_file = f"{name}.jvl", f"{name}.mass" if mass is not None else None, f"{name}.run"
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+    # mkdtemp creates the directory private (0700); publish it with the permissions mkdir would have given
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(staging, 0o777 & ~umask)
+    try:
+        def write_geometry():
+            bundle = jvl.write_jvl_bundle(filename=jvl_file, CLAF=CLAF, j=j)
+            jvl.materialize(bundle, staging)
+            return [file for file in bundle if file != jvl_file]
+
+        def write_mass():
+            if isinstance(mass_properties, (str, Path)):
+                shutil.copyfile(mass_properties, staging / mass_file)
+            elif mass_properties is not None:
+                mass_properties.export_AVL_mass_file(str(staging / mass_file))
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            geometry = pool.submit(write_geometry)
+            masses = pool.submit(write_mass)
+            runs = pool.submit(jvl.write_run, staging / run_file, j=j, **run)
+            sidecars = geometry.result()
+            masses.result()
+            runs.result()
+
+        job = {
+            "directory": str(directory),
+            "jvl": jvl_file,
+            "mass": mass_file,
+            "run": run_file,
+            "sidecars": sidecars,
+            "controls": jvl.control_names(),
+            "jets": jvl.jet_names(j=j),
+        }
+        with open(staging / "job.json", "w") as f:
+            json.dump(job, f, indent=2)
+
+        if directory.exists():
+            # Two renames: a directory cannot be renamed over a non-empty one
+            retired = Path(tempfile.mkdtemp(prefix=f".{directory.name}.old.", dir=directory.parent))
+            os.replace(directory, retired / directory.name)
+            os.replace(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            try:
+                os.rename(staging, directory)
+            except OSError as e:
+                raise FileExistsError(f"Job directory '{directory}' was created by another writer.") from e
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return job
@@ -0,0 +1,268 @@
+"""
+Benchmarks for the hot paths: JVL.write_jvl, the mass buildup and JWing/WingJSec construction.
+
+    python bench.py                  # run and compare against bench_baseline.json (exit code 1 on regression)
+    python bench.py --save           # run and store the results as the new baseline
+    python bench.py -k write_jvl     # only benchmarks whose name contains "write_jvl"
+
+Reports wall time (best of --repeat runs), peak traced memory, and allocation counts. Allocations are counted
+as generation-0 garbage collections with the collection threshold lowered to 1, i.e. one per container object
+(list, dict, instance, ...) allocated.
+
+Times are compared relative to a fixed calibration workload measured in the same session (next to each benchmark),
+so a baseline saved on one machine still gates runs on a faster or slower one. A baseline without a calibration entry only gates memory
+and allocations.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+import aerosandbox as asb
+from J import JVL, JWing, WingJSec, JetParam, JetControl
+from massmodel import airplane_mass_model
+
+BASELINE = Path(__file__).parent / "bench_baseline.json"
+
+ANALYSIS_OPTIONS = {
+    asb.Airplane: dict(profile_drag_coefficient=0),
+    JWing: dict(
+        wing_level_spanwise_spacing=True,
+        spanwise_resolution=25,
+        spanwise_spacing="cosine",
+        chordwise_resolution=25,
+        chordwise_spacing="cosine",
+        component=None,
+        no_wake=False,
+        no_alpha_beta=False,
+        no_load=False,
+        drag_polar=None,
+    ),
+    WingJSec: dict(
+        spanwise_resolution=12,
+        spanwise_spacing="cosine",
+        cl_alpha_factor=None,
+        drag_polar=None,
+    ),
+    asb.Fuselage: dict(panel_resolution=24, panel_spacing="cosine"),
+}
+
+
+def naca(i):
+    """A distinct 4-digit NACA airfoil for each i < 512."""
+    return asb.Airfoil(f"naca{1 + i % 8}{1 + (i // 8) % 8}{8 + i // 64:02d}")
+
+
+def make_wing(n_sections, n_controls=1, n_jets=1, unique_airfoils=False, airfoils=None):
+    if airfoils is None:
+        airfoils = [naca(i) for i in range(n_sections)] if unique_airfoils else [asb.Airfoil("naca0012")] * n_sections
+    return JWing(
+        name="Main Wing",
+        symmetric=True,
+        JetParam=JetParam(hdisk=0.188, fh=0.0, djet0=0.0, djet1=0.0, djet3=0.0) if n_jets else None,
+        xsecs=[
+            WingJSec(
+                xyz_le=[0.01 * i, 1.5 * i / max(n_sections - 1, 1), 0],
+                chord=0.38 - 0.1 * i / n_sections,
+                twist=2 - 4 * i / n_sections,
+                airfoil=airfoils[i],
+                control_surfaces=[asb.ControlSurface(name=f"Flap{k + 1}", hinge_point=0.66) for k in range(n_controls)],
+                JetControls=[JetControl(jet_name=f"FlapJet{k + 1}", gain=1, sgn_dup=1) for k in range(n_jets)],
+            )
+            for i in range(n_sections)
+        ],
+    )
+
+
+def make_fuselage(n_stations=10):
+    x = np.linspace(-1.1, 1.5, n_stations)
+    return asb.Fuselage(name="Fuselage", xsecs=[
+        asb.FuselageXSec(xyz_c=[xi, 0, -0.2], width=0.25, height=0.35, shape=2 + 10 * k / n_stations)
+        for k, xi in enumerate(x)
+    ])
+
+
+def make_jvl(n_sections=4, n_controls=1, n_jets=1, unique_airfoils=False, n_fuselages=0, n_stations=10):
+    airplane = asb.Airplane(
+        name="Benchmark",
+        wings=[make_wing(n_sections, n_controls, n_jets, unique_airfoils)],
+        fuselages=[make_fuselage(n_stations) for _ in range(n_fuselages)],
+    )
+    jvl = JVL(airplane=airplane, op_point=asb.OperatingPoint(velocity=20, alpha=5))
+    jvl.default_analysis_specific_options = ANALYSIS_OPTIONS
+    return jvl
+
+
+@contextlib.contextmanager
+def write_jvl_benchmark(cold_cache=True, **kwargs):
+    jvl = make_jvl(**kwargs)
+    with tempfile.TemporaryDirectory(prefix="jvl_bench_") as directory:
+
+        def run():
+            if cold_cache:
+                JVL.airfoil_cache.clear()
+                JVL.body_cache.clear()
+            jvl.write_jvl(Path(directory) / "bench.jvl")
+
+        yield run
+
+
+@contextlib.contextmanager
+def mass_benchmark(num_motors):
+    plane = asb.Airplane(
+        name="Benchmark",
+        wings=[make_wing(4, n_jets=0), make_wing(2, n_jets=0), make_wing(2, n_jets=0)],
+    )
+    plane.s_ref, plane.c_ref, plane.b_ref = 1.1, 0.36, 3.0
+    airplane_mass_model(plane)  # Warm up geometry caches (areas, volumes)
+
+    def run():
+        airplane_mass_model(plane, num_motors=num_motors).totals()
+
+    yield run
+
+
+@contextlib.contextmanager
+def geometry_benchmark(n_sections):
+    airfoils = [asb.Airfoil("naca0012")] * n_sections
+
+    def run():
+        make_wing(n_sections, n_controls=2, n_jets=2, airfoils=airfoils)
+
+    yield run
+
+
+@contextlib.contextmanager
+def calibration_benchmark():
+    # A fixed mix of interpreter, object allocation and small-array work, independent of this repository's code.
+    # Its time is the unit in which the other benchmarks are compared against the baseline.
+    def run():
+        labels = {}
+        for i in range(10000):
+            labels[i % 97] = (f"{i * 0.5:.3f}", [i])
+        x = np.linspace(0, 1, 64)
+        for _ in range(1000):
+            x = np.sin(x) + 0.5
+
+    yield run
+
+
+def machine_speed(baseline, repeat):
+    """Calibration time now relative to the baseline's: > 1 if this machine currently runs slower."""
+    with calibration_benchmark() as run:
+        return measure(run, repeat)["time"] / baseline[CALIBRATION]["time"]
+
+
+CALIBRATION = "calibration"
+
+BENCHMARKS = {
+    **{f"write_jvl[sections={n}]": (write_jvl_benchmark, dict(n_sections=n)) for n in (4, 32, 256)},
+    **{f"write_jvl[controls={c},jets={c}]": (write_jvl_benchmark, dict(n_sections=32, n_controls=c, n_jets=c)) for c in (0, 4)},
+    "write_jvl[unique_airfoils=32]": (write_jvl_benchmark, dict(n_sections=32, unique_airfoils=True)),
+    "write_jvl[unique_airfoils=32,warm_cache]": (write_jvl_benchmark, dict(n_sections=32, unique_airfoils=True, cold_cache=False)),
+    **{f"write_jvl[fuselages={n}]": (write_jvl_benchmark, dict(n_sections=4, n_fuselages=n)) for n in (1, 4)},
+    "write_jvl[fuselage_stations=300]": (write_jvl_benchmark, dict(n_sections=4, n_fuselages=1, n_stations=300)),
+    **{f"mass[motors={n}]": (mass_benchmark, dict(num_motors=n)) for n in (12, 120, 1200)},
+    "mass[sweep=1000]": (mass_benchmark, dict(num_motors=np.tile(np.arange(2, 42, 2), 50))),
+    **{f"geometry[sections={n}]": (geometry_benchmark, dict(n_sections=n)) for n in (4, 256)},
+}
+
+
+def measure(run, repeat):
+    run()  # Warm up
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    threshold = gc.get_threshold()
+    collections = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    gc.set_threshold(1)
+    try:
+        run()
+    finally:
+        gc.set_threshold(*threshold)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocations = gc.get_stats()[0]["collections"] - collections
+
+    return {"time": min(times), "peak_bytes": peak, "allocations": allocations}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", default="", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--time-tolerance", type=float, default=1.5, help="Allowed slowdown factor")
+    parser.add_argument("--memory-tolerance", type=float, default=1.25, help="Allowed growth factor of peak memory and allocation count")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    with calibration_benchmark() as run:
+        calibration = measure(run, args.repeat)
+    results = {CALIBRATION: calibration}
+    calibrated = CALIBRATION in baseline
+    regressions = []
+    print(f"{'benchmark':<44} {'time [ms]':>10} {'peak [kB]':>10} {'allocs':>8}  vs baseline")
+    print(f"{CALIBRATION:<44} {1e3 * calibration['time']:>10.3f}")
+    if baseline and not calibrated:
+        print("(The baseline has no calibration entry, so times are not compared)")
+    for name, (factory, kwargs) in BENCHMARKS.items():
+        if args.k not in name:
+            continue
+        with factory(**kwargs) as run:
+            result = measure(run, args.repeat)
+        results[name] = result
+
+        comparison = ""
+        if name in baseline:
+            base = baseline[name]
+            time_ratio = 1.0
+            if calibrated:
+                # Calibrated right next to the benchmark, so drift in machine load cancels out
+                time_ratio = result["time"] / base["time"] / machine_speed(baseline, args.repeat)
+                if time_ratio > args.time_tolerance:
+                    # Confirm once, so a burst of machine noise is not reported as a regression
+                    with factory(**kwargs) as run:
+                        retry = measure(run, args.repeat)["time"]
+                    time_ratio = min(time_ratio, retry / base["time"] / machine_speed(baseline, args.repeat))
+            memory_ratio = result["peak_bytes"] / max(base["peak_bytes"], 1)
+            allocation_ratio = result["allocations"] / max(base["allocations"], 1)
+            comparison = f"x{time_ratio:.2f} time, " if calibrated else ""
+            comparison += f"x{memory_ratio:.2f} memory, x{allocation_ratio:.2f} allocs"
+            if (time_ratio > args.time_tolerance or memory_ratio > args.memory_tolerance
+                    or allocation_ratio > args.memory_tolerance):
+                regressions.append(name)
+                comparison += "  <-- REGRESSION"
+        print(f"{name:<44} {1e3 * result['time']:>10.3f} {result['peak_bytes'] / 1e3:>10.1f} {result['allocations']:>8}  {comparison}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions and not args.save:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond tolerance:", *regressions, sep="\n  ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+import numpy as np
+
+from J import JWing
+
+# Cost model for a JVL solve. The aerodynamic influence (AIC) matrix is dense in the number of lattice unknowns N
+# (bound vortices plus jet-sheet elements): JVL keeps a few N x N double matrices (AIC, its LU factors and the
+# velocity influences), LU-factorizes once (2/3 N^3 flops) and back-substitutes once per right-hand side
+# (2 N^2 flops each; one per flight variable, control and jet). Bodies are source/doublet lines, not unknowns.
+COST_MODEL = {
+    "matrices": 3,
+    "bytes_per_entry": 8,
+    "flops_per_second": 1e9,
+    "overhead_seconds": 0.05,
+}
+
+N_FLIGHT_VARIABLES = 6  # alpha, beta, p, q, r and the freestream
+
+SURFACE_FIELDS = [
+    ("name", "U64"),
+    ("n_chord", int),
+    ("n_strips", int),
+    ("n_vortices", int),
+    ("n_jet", int),
+    ("n_body", int),
+]
+
+
+def _jet_chordwise(n_chord, nujet, nwjet):
+    """
+    Jet-sheet elements per blown strip: Nujet chordwise elements under the jet (a fraction of Nchord when < 1) plus
+    Nwjet elements in the jet wake.
+    """
+    nujet = np.where(nujet < 1, np.rint(nujet * n_chord), nujet)
+    return (nujet + nwjet).astype(int)
+
+
+def lattice_size(jvl, j=True):
+    """
+    Predicts the lattice JVL builds from the options `write_jvl` would emit, without writing or running anything.
+
+    Intervals between sections are gathered into flat arrays across all surfaces and reduced per surface, so the
+    pass stays cheap for airplanes with many sections.
+
+    Strips per surface are the surface-level Nspan when wing_level_spanwise_spacing is set, else the sum of the
+    section Nspan over its intervals; YDUPLICATE doubles everything. An interval is blown (carries jet elements) if
+    its inboard section has JetControls and the surface has a JetParam.
+
+    Args:
+        jvl: The `JVL` object.
+        j: Count jet elements (as `write_jvl(j=...)`).
+
+    Returns: Structured array with one row per surface and body; fields name, n_chord, n_strips, n_vortices,
+        n_jet and n_body (axial body nodes).
+    """
+    wings = jvl.airplane.wings
+    n_wings = len(wings)
+
+    n_chord = np.zeros(n_wings, dtype=int)
+    wing_level = np.zeros(n_wings, dtype=bool)
+    wing_nspan = np.zeros(n_wings, dtype=int)
+    duplicate = np.ones(n_wings, dtype=int)
+    nujet = np.zeros(n_wings)
+    nwjet = np.zeros(n_wings)
+    interval_wing, interval_nspan, interval_blown = [], [], []
+
+    for w, wing in enumerate(wings):
+        options = jvl.get_options(wing)
+        n_chord[w] = options["chordwise_resolution"]
+        wing_level[w] = options["wing_level_spanwise_spacing"]
+        wing_nspan[w] = options["spanwise_resolution"]
+        duplicate[w] = 2 if wing.symmetric else 1
+        blown = j and isinstance(wing, JWing) and wing.JetParam is not None
+        if blown:
+            nujet[w] = wing.JetSpacing["Nujet"]
+            nwjet[w] = wing.JetSpacing["Nwjet"]
+        for xsec in wing.xsecs[:-1]:
+            interval_wing.append(w)
+            interval_nspan.append(jvl.get_options(xsec)["spanwise_resolution"])
+            interval_blown.append(blown and len(getattr(xsec, "JetControls", [])) > 0)
+
+    interval_wing = np.asarray(interval_wing, dtype=int)
+    interval_nspan = np.asarray(interval_nspan, dtype=int)
+    interval_blown = np.asarray(interval_blown, dtype=bool)
+    n_intervals = np.bincount(interval_wing, minlength=n_wings)
+
+    # Wing-level spacing spreads Nspan over the intervals; count each interval's share to locate the blown strips
+    share = np.where(n_intervals > 0, wing_nspan / np.maximum(n_intervals, 1), 0)
+    strips_per_interval = np.where(wing_level[interval_wing], share[interval_wing], interval_nspan)
+    strips = np.rint(np.bincount(interval_wing, weights=strips_per_interval, minlength=n_wings)).astype(int)
+    blown_strips = np.bincount(interval_wing, weights=strips_per_interval * interval_blown, minlength=n_wings)
+
+    n_strips = strips * duplicate
+    n_jet = np.rint(blown_strips).astype(int) * _jet_chordwise(n_chord, nujet, nwjet) * duplicate
+
+    fuselages = jvl.airplane.fuselages
+    size = np.zeros(n_wings + len(fuselages), dtype=SURFACE_FIELDS)
+    size["name"][:n_wings] = [wing.name.strip() for wing in wings]
+    size["n_chord"][:n_wings] = n_chord
+    size["n_strips"][:n_wings] = n_strips
+    size["n_vortices"][:n_wings] = n_strips * n_chord
+    size["n_jet"][:n_wings] = n_jet
+    size["name"][n_wings:] = [fuse.name.strip() for fuse in fuselages]
+    size["n_body"][n_wings:] = [jvl.get_options(fuse)["panel_resolution"] for fuse in fuselages]
+    return size
+
+
+def estimate_cost(n_elements, n_rhs=N_FLIGHT_VARIABLES, cost_model=None):
+    """
+    Memory and time estimate of a JVL solve with `n_elements` lattice unknowns (vortices plus jet elements).
+
+    Works elementwise on arrays, e.g. to tabulate a resolution sweep.
+
+    Args:
+        n_elements: Number of unknowns.
+        n_rhs: Right-hand sides (flight variables plus controls and jets).
+        cost_model: Overrides for COST_MODEL entries, e.g. from `calibrate`.
+
+    Returns: dict with "elements", "memory_bytes" and "seconds".
+    """
+    model = {**COST_MODEL, **(cost_model or {})}
+    n = np.asarray(n_elements, dtype=float)
+    flops = 2 / 3 * n ** 3 + 2 * n ** 2 * n_rhs
+    return {
+        "elements": n_elements,
+        "memory_bytes": model["matrices"] * model["bytes_per_entry"] * n ** 2,
+        "seconds": model["overhead_seconds"] + flops / model["flops_per_second"],
+    }
+
+
+def calibrate(n_elements, seconds, n_rhs=N_FLIGHT_VARIABLES):
+    """
+    Fits flops_per_second and overhead_seconds to measured solve times (e.g. `JVLResult.elapsed` of runs of known
+    size). Returns a cost_model dict for `estimate_cost` and `fit_budget`.
+    """
+    n = np.asarray(n_elements, dtype=float)
+    flops = 2 / 3 * n ** 3 + 2 * n ** 2 * n_rhs
+    A = np.stack([flops, np.ones_like(flops)], axis=-1)
+    (seconds_per_flop, overhead), *_ = np.linalg.lstsq(A, np.asarray(seconds, dtype=float), rcond=None)
+    return {"flops_per_second": 1 / max(float(seconds_per_flop), 1e-300), "overhead_seconds": max(float(overhead), 0.0)}
+
+
+def budget(jvl, j=True, cost_model=None):
+    """
+    Lattice size and cost estimate for a `JVL` object.
+
+    Returns: dict with "surfaces" (see `lattice_size`), the totals "n_vortices", "n_jet", "n_strips" and
+        "elements", and the "memory_bytes" and "seconds" estimates.
+    """
+    size = lattice_size(jvl, j=j)
+    elements = int(size["n_vortices"].sum() + size["n_jet"].sum())
+    n_rhs = N_FLIGHT_VARIABLES + len(jvl.control_names()) + len(jvl.jet_names(j=j))
+    cost = estimate_cost(elements, n_rhs=n_rhs, cost_model=cost_model)
+    return {
+        "surfaces": size,
+        "n_vortices": int(size["n_vortices"].sum()),
+        "n_jet": int(size["n_jet"].sum()),
+        "n_strips": int(size["n_strips"].sum()),
+        "elements": elements,
+        "memory_bytes": float(cost["memory_bytes"]),
+        "seconds": float(cost["seconds"]),
+    }
+
+
+def _scaled(value, factor, minimum):
+    return max(minimum, int(round(value * factor)))
+
+
+def set_options(jvl, obj, **changes):
+    """
+    Overrides some of the JVL options of one wing, section or body. The full option dict is stored, so it is
+    complete whether or not the analysis has defaults for the object's type.
+    """
+    options = {**jvl.get_options(obj), **changes}
+    obj.analysis_specific_options = {**obj.analysis_specific_options, type(jvl): options}
+
+
+def resolutions(jvl):
+    """
+    {wing name: {option: value}} of the resolution settings `write_jvl` would emit for each wing.
+    """
+    return {
+        wing.name.strip(): {
+            "chordwise_resolution": jvl.get_options(wing)["chordwise_resolution"],
+            "spanwise_resolution": jvl.get_options(wing)["spanwise_resolution"],
+            "section_spanwise_resolution": [jvl.get_options(xsec)["spanwise_resolution"] for xsec in wing.xsecs],
+            **({"Nujet": wing.JetSpacing["Nujet"], "Nwjet": wing.JetSpacing["Nwjet"]} if isinstance(wing, JWing) else {}),
+        }
+        for wing in jvl.airplane.wings
+    }
+
+
+def fit_budget(
+        jvl,
+        max_elements=None,
+        max_memory=None,
+        max_seconds=None,
+        j=True,
+        min_chordwise=4,
+        min_spanwise=2,
+        cost_model=None,
+        apply=False,
+    ):
+    """
+    Scales the chordwise, spanwise and jet-wake resolutions down by a common factor until the predicted lattice
+    fits every given limit. Resolutions that already fit are left alone.
+
+    The factor is found by bisection on the predicted cost, so the result is the finest resolution within budget
+    (down to the given minimum counts per surface / section).
+
+    Args:
+        jvl: The `JVL` object.
+        max_elements: Limit on the number of lattice unknowns.
+        max_memory: Limit on the estimated solve memory [bytes].
+        max_seconds: Limit on the estimated solve time [s].
+        min_chordwise: Smallest chordwise resolution to scale down to.
+        min_spanwise: Smallest spanwise resolution (per surface, or per section) to scale down to.
+        cost_model: Overrides for COST_MODEL entries, e.g. from `calibrate`.
+        apply: Store the scaled resolutions on the wings and sections (as JVL analysis-specific options and
+            JWing.JetSpacing) so the next `write_jvl` uses them.
+
+    Returns: dict with the "factor" applied to the resolutions (1 if nothing changed), "fits" (False if even the
+        minimum resolutions exceed the budget), the "before" and "after" `budget`s, and "resolutions":
+        {wing name: {option: value}} of the scaled settings.
+    """
+    wings = jvl.airplane.wings
+    original = [
+        (jvl.get_options(wing), [jvl.get_options(xsec) for xsec in wing.xsecs], getattr(wing, "JetSpacing", None))
+        for wing in wings
+    ]
+    saved = [
+        (wing.analysis_specific_options, [xsec.analysis_specific_options for xsec in wing.xsecs], getattr(wing, "JetSpacing", None))
+        for wing in wings
+    ]
+
+    def scale(factor):
+        for wing, (options, xsec_options, jet_spacing) in zip(wings, original):
+            set_options(
+                jvl, wing,
+                chordwise_resolution=_scaled(options["chordwise_resolution"], factor, min_chordwise),
+                spanwise_resolution=_scaled(options["spanwise_resolution"], factor, min_spanwise),
+            )
+            for xsec, options in zip(wing.xsecs, xsec_options):
+                set_options(jvl, xsec, spanwise_resolution=_scaled(options["spanwise_resolution"], factor, min_spanwise))
+            if jet_spacing is not None:
+                wing.JetSpacing = {**jet_spacing, "Nwjet": _scaled(jet_spacing["Nwjet"], factor, 1)}
+
+    def restore():
+        for wing, (options, xsec_options, jet_spacing) in zip(wings, saved):
+            wing.analysis_specific_options = options
+            for xsec, options in zip(wing.xsecs, xsec_options):
+                xsec.analysis_specific_options = options
+            if jet_spacing is not None:
+                wing.JetSpacing = jet_spacing
+
+    def fits(result):
+        return (
+            (max_elements is None or result["elements"] <= max_elements)
+            and (max_memory is None or result["memory_bytes"] <= max_memory)
+            and (max_seconds is None or result["seconds"] <= max_seconds)
+        )
+
+    before = budget(jvl, j=j, cost_model=cost_model)
+    factor = 1.0
+    if not fits(before):
+        low, high = 0.0, 1.0
+        for _ in range(30):
+            mid = (low + high) / 2
+            scale(mid)
+            if fits(budget(jvl, j=j, cost_model=cost_model)):
+                low = mid
+            else:
+                high = mid
+        factor = low
+        scale(factor)
+    after = budget(jvl, j=j, cost_model=cost_model)
+
+    scaled = resolutions(jvl)
+    if not apply or factor == 1.0:
+        restore()
+    return {"factor": factor, "fits": fits(after), "before": before, "after": after, "resolutions": scaled}
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class ResultCache:
+    def __init__(self, directory, max_bytes=1 << 30, enabled=True):
+        """
+        Persistent cache of parsed JVL results, one .npz file per input hash.
+
+        :param directory: Cache directory (created if missing). Safe to share between processes.
+        :param max_bytes: Size limit; the least recently used entries are evicted once it is exceeded
+        :param enabled: Set to False (or set the JVL_RESULT_CACHE=0 environment variable) to bypass the cache
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.enabled = enabled and os.environ.get("JVL_RESULT_CACHE", "1") != "0"
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self.directory.glob("*.npz"))
+
+    @staticmethod
+    def key(directory, extra=()):
+        """
+        Canonical hash of every input file in a prepared job directory (.jvl, .afN/.fuseN sidecars, mass and run
+        files) plus `extra` strings (cases, requested outputs, solver command).
+
+        The directory path itself is removed from file contents first, so AFIL/BFIL lines that point into a
+        scratch directory hash the same wherever the job was prepared.
+        """
+        directory = Path(directory)
+        prefix = str(directory).encode()
+        h = hashlib.blake2b(digest_size=20)
+        for path in sorted(directory.iterdir()):
+            if not path.is_file():
+                continue
+            h.update(path.name.encode() + b"\0")
+            h.update(path.read_bytes().replace(prefix, b"") + b"\0")
+        for item in extra:
+            h.update(str(item).encode() + b"\0")
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.npz"
+
+    def get(self, key):
+        """
+        Returns (outputs, stdout) for a cached key, where outputs is {kind: structured array}, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                outputs = {name: data[name] for name in data.files if name != "stdout"}
+                stdout = str(data["stdout"])
+            os.utime(path)  # Refresh for LRU eviction
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return outputs, stdout
+
+    def put(self, key, outputs, stdout=""):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, stdout=np.array(stdout), **outputs)
+        size = os.path.getsize(tmp)
+        with self._lock:
+            # A re-put replaces the existing entry, whose size is already counted
+            try:
+                size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)  # Atomic, so concurrent readers never see a partial entry
+            self.stores += 1
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for p in self.directory.glob("*.npz"):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        target = 0.9 * self.max_bytes
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            for p in self.directory.glob("*.npz"):
+                p.unlink(missing_ok=True)
+            self._size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(list(self.directory.glob("*.npz"))),
+            "bytes": self._size,
+        }
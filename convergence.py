@@ -0,0 +1,149 @@
+import copy
+
+import numpy as np
+
+from J import JWing
+from budget import budget, resolutions, set_options, _scaled
+from runner import JVLJob
+
+# Refinement factors applied to the current resolutions, coarse to fine. The finest level is the reference, so by
+# default the study looks for the coarsest resolution that reproduces the current (conservative) settings.
+DEFAULT_FACTORS = (0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+
+# Relative tolerances on the total coefficients, against the finest level
+DEFAULT_TOLERANCES = {"CLtot": 0.005, "CDtot": 0.01, "Cmtot": 0.01}
+
+LEVEL_KEYS = ("chordwise_resolution", "spanwise_resolution", "Nujet", "Nwjet")
+
+
+def refine(jvl, level, min_chordwise=2, min_spanwise=1):
+    """
+    A copy of `jvl` with its lattice resolution set to one level of a convergence ladder.
+
+    Args:
+        jvl: The `JVL` object. It is not modified.
+        level: A factor applied to the current resolution of every wing and section (chordwise, spanwise and
+            jet-wake Nwjet; Nujet too when it is a count rather than a fraction of the chord), or a dict with any of
+            "chordwise_resolution", "spanwise_resolution", "Nujet" and "Nwjet" to set on every wing and section.
+        min_chordwise: Smallest chordwise resolution a factor scales down to.
+        min_spanwise: Smallest spanwise resolution a factor scales down to.
+
+    Returns: The refined copy.
+    """
+    if isinstance(level, dict) and set(level) - set(LEVEL_KEYS):
+        raise ValueError(f"Unknown level settings {sorted(set(level) - set(LEVEL_KEYS))}. Valid settings are: {list(LEVEL_KEYS)}")
+    jvl = copy.deepcopy(jvl)
+    for wing in jvl.airplane.wings:
+        options = jvl.get_options(wing)
+        if isinstance(level, dict):
+            wing_changes = {key: level[key] for key in ("chordwise_resolution", "spanwise_resolution") if key in level}
+            jet_changes = {key: level[key] for key in ("Nujet", "Nwjet") if key in level}
+        else:
+            wing_changes = {
+                "chordwise_resolution": _scaled(options["chordwise_resolution"], level, min_chordwise),
+                "spanwise_resolution": _scaled(options["spanwise_resolution"], level, min_spanwise),
+            }
+            jet_changes = {}
+            if isinstance(wing, JWing):
+                jet_changes["Nwjet"] = _scaled(wing.JetSpacing["Nwjet"], level, 1)
+                if wing.JetSpacing["Nujet"] >= 1:
+                    jet_changes["Nujet"] = _scaled(wing.JetSpacing["Nujet"], level, 1)
+
+        set_options(jvl, wing, **wing_changes)
+        for xsec in wing.xsecs:
+            if isinstance(level, dict):
+                if "spanwise_resolution" in level:
+                    set_options(jvl, xsec, spanwise_resolution=level["spanwise_resolution"])
+            else:
+                spanwise = jvl.get_options(xsec)["spanwise_resolution"]
+                set_options(jvl, xsec, spanwise_resolution=_scaled(spanwise, level, min_spanwise))
+        if isinstance(wing, JWing) and jet_changes:
+            wing.JetSpacing = {**wing.JetSpacing, **jet_changes}
+    return jvl
+
+
+def convergence_study(
+        jvl,
+        runner,
+        levels=DEFAULT_FACTORS,
+        run=None,
+        mass_file=None,
+        tolerances=None,
+        atol=1e-4,
+        j=True,
+):
+    """
+    Mesh-convergence study over chordwise, spanwise and jet-sheet resolution.
+
+    Every level of the ladder is written with `write_jvl` and run as one `JVLJob` (all levels run concurrently on
+    `runner`), with the same run cases, so jet-blown cases such as takeoff are checked alongside cruise:
+
+        study = convergence_study(
+            avl_plane, JVLRunner(".\\jvl2.20.exe"),
+            run=dict(names=["takeoff", "cruise"], variables={"FlapJet1": [4.7, 0]}, parameters={"velocity": [4.86, 21.75]}),
+        )
+        avl_plane = study["jvl"]
+
+    Args:
+        jvl: The `JVL` object. It is not modified.
+        runner: A `runner.JVLRunner`.
+        levels: Refinement levels, coarse to fine; see `refine`. The finest (last) level is the reference.
+        run: `JVL.write_run` keyword arguments for the run cases. Defaults to a single case at the op_point.
+        mass_file: Optional .mass file path or asb.MassProperties, for trimmed cases.
+        tolerances: {total-force field: relative tolerance}. Defaults to DEFAULT_TOLERANCES (CLtot, CDtot, Cmtot).
+        atol: Absolute tolerance floor, so coefficients near zero (e.g. a trimmed Cm) do not demand exact agreement.
+        j: Count jet-sheet elements in the reported lattice sizes.
+
+    Returns: dict with
+        "index": index of the coarsest level from which every finer level is within tolerance of the finest,
+        "level": that level, "jvl": the refined copy at that level, "resolutions": its per-wing settings,
+        "converged": False if only the finest level itself qualifies,
+        "elements": lattice unknowns per level, "values": (n_levels, n_cases, n_fields) coefficients (NaN where
+        a run failed), "errors": the same shape, relative to the finest level, "within": per-level bool,
+        "fields", "cases" (run case names) and "results" (the `JVLResult` per level).
+    """
+    levels = list(levels)
+    tolerances = DEFAULT_TOLERANCES if tolerances is None else tolerances
+    fields = list(tolerances)
+
+    ladder = [refine(jvl, level) for level in levels]
+    jobs = [
+        JVLJob(refined, run_file={} if run is None else run, mass_file=mass_file, outputs=("ft",), name=f"level{i}")
+        for i, refined in enumerate(ladder)
+    ]
+    results = runner.run(jobs)
+
+    reference = results[-1]
+    if not reference.ok:
+        raise RuntimeError(f"The finest level failed, so there is nothing to converge to: {reference.error}")
+    cases = [str(case) for case in reference.totals["case"]]
+
+    values = np.full((len(levels), len(cases), len(fields)), np.nan)
+    for i, result in enumerate(results):
+        if result.ok and result.converged and len(result.totals) == len(cases):
+            values[i] = np.stack([result.totals[field] for field in fields], axis=-1)
+
+    finest = values[-1]
+    rtol = np.array([tolerances[field] for field in fields])
+    difference = np.abs(values - finest)
+    errors = difference / np.maximum(np.abs(finest), atol)
+    within = np.all(difference <= rtol * np.abs(finest) + atol, axis=(1, 2))  # NaN (failed runs) compares False
+
+    index = len(levels) - 1
+    while index > 0 and within[index - 1]:
+        index -= 1
+
+    return {
+        "index": index,
+        "level": levels[index],
+        "jvl": ladder[index],
+        "resolutions": resolutions(ladder[index]),
+        "converged": index < len(levels) - 1,
+        "elements": [budget(refined, j=j)["elements"] for refined in ladder],
+        "values": values,
+        "errors": errors,
+        "within": within,
+        "fields": fields,
+        "cases": cases,
+        "results": results,
+    }
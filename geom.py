@@ -1,152 +1,180 @@
-import aerosandbox as asb
-import aerosandbox.numpy as np
-from aerosandbox.tools import units
+from pathlib import Path
 from typing import List
-from J import JetParam, JetControl, WingJSec, JVL, JWing
-
-
-jw01 = asb.Airfoil(coordinates='.\\jw01.dat')
-wing = JWing(
-    name="Main Wing",
-    symmetric=True,
-    JetParam=JetParam(hdisk=0.188, fh=0.0, djet0=0.0, djet1=0.0, djet3=0.0),
-    xsecs=[
-        # WingJSec(
-        #     xyz_le=[0, 0, 0],
-        #     chord=15*units.inch,
-        #     twist=0,
-        #     airfoil=jw01
-        # ),
-        WingJSec(
-            xyz_le=[0, 0, 0],
-            chord=15*units.inch,
-            twist=0,
-            airfoil=jw01,
-            control_surfaces = [asb.ControlSurface(name="Flap1", hinge_point=0.66, deflection=0)],
-            JetControls= [JetControl(jet_name="FlapJet1", gain=1, sgn_dup=1)],
-        ),
-        WingJSec(
-            xyz_le=[0, 23*units.inch, 0],
-            chord=15*units.inch,
-            twist=0,
-            airfoil=jw01,
-            control_surfaces = [asb.ControlSurface(name="Flap1", hinge_point=0.66, deflection=0), asb.ControlSurface(name="Flap2", hinge_point=0.66, deflection=0)],
-            JetControls= [JetControl(jet_name="FlapJet1", gain=1, sgn_dup=1), JetControl(jet_name="FlapJet2", gain=1, sgn_dup=1)],
-        ),
-        WingJSec(
-            xyz_le=[0, 41*units.inch, 0],
-            chord=15*units.inch,
-            twist=0,
-            airfoil=jw01,
-            control_surfaces = [asb.ControlSurface(name="Flap2", hinge_point=0.66, deflection=0), asb.ControlSurface(name="Aileron", symmetric=False, hinge_point=0.66, deflection=0)],
-            JetControls= [JetControl(jet_name="FlapJet2", gain=1, sgn_dup=1), JetControl(jet_name="AilJet", gain=1, sgn_dup=-1)],
-        ),
-        WingJSec(
-            xyz_le=[6*units.inch, 60*units.inch, 0],
-            chord=10*units.inch,
-            twist=0,
-            airfoil=jw01,
-            control_surfaces = [asb.ControlSurface(name="Aileron", symmetric=False, hinge_point=0.66, deflection=0)],
-            JetControls= [JetControl(jet_name="AilJet", gain=1, sgn_dup=-1)],
-        )
-    ]
-)
-vertical_tail = JWing(
-    name="Vertical Tail",
-    symmetric=False,
-    xsecs=[
-        WingJSec(
-            xyz_le=[0, 0, 0],
-            chord=15*units.inch,
-            twist=0,
-            airfoil=asb.Airfoil(name="NACA0012"),
-            control_surfaces = [asb.ControlSurface(name="Rudder", hinge_point=0.66, deflection=0)]
-        ),
-        WingJSec(
-            xyz_le=[10.5*units.inch, 0, 15*units.inch],
-            chord=11*units.inch,
-            twist=0,
-            airfoil=asb.Airfoil(name="NACA0012"),
-            control_surfaces = [asb.ControlSurface(name="Rudder", hinge_point=0.66, deflection=0)]
-        )
-    ]
-).translate([52.5*units.inch, 0, 0])
-    
-horizinatal_tail = JWing(
-    name="Horizontal Tail",
-    symmetric=True,
-    xsecs=[
-        WingJSec(
-            xyz_le=[0, 0, 0],
-            chord=12*units.inch,
-            twist=0,
-            airfoil=asb.Airfoil(name="NACA0012"),
-            control_surfaces = [asb.ControlSurface(name="Elevator", hinge_point=0.5, deflection=0)]
-        ),
-        WingJSec(
-            xyz_le=[3*units.inch, 25*units.inch, 0],
-            chord=7*units.inch,
-            twist=0,
-            airfoil=asb.Airfoil(name="NACA0012"),
-            control_surfaces = [asb.ControlSurface(name="Elevator", hinge_point=0.5, deflection=0)]
-        )
-    ]
-).translate([65*units.inch, 0, 15*units.inch])
 
-def generate_fuselage_xsecs(N: int) -> List[asb.FuselageXSec]:
+import numpy as np
+
+inch = 0.0254  # Same value as aerosandbox.tools.units.inch, without importing aerosandbox
+
+# aerosandbox (and J, which imports it) is only imported inside the functions below: importing this module is cheap
+# and has no side effects, so worker processes only pay for what they build.
+
+JW01 = Path(__file__).parent / "jw01.dat"
+
+
+def build_wing(airfoil=None):
+    """
+    Blown main wing with the flap and aileron jets. Uses the jw01 airfoil unless `airfoil` is given.
+    """
+    import aerosandbox as asb
+    from J import JetParam, JetControl, WingJSec, JWing
+
+    if airfoil is None:
+        airfoil = asb.Airfoil(coordinates=str(JW01))
+    return JWing(
+        name="Main Wing",
+        symmetric=True,
+        JetParam=JetParam(hdisk=0.188, fh=0.0, djet0=0.0, djet1=0.0, djet3=0.0),
+        xsecs=[
+            # WingJSec(
+            #     xyz_le=[0, 0, 0],
+            #     chord=15*inch,
+            #     twist=0,
+            #     airfoil=airfoil
+            # ),
+            WingJSec(
+                xyz_le=[0, 0, 0],
+                chord=15*inch,
+                twist=0,
+                airfoil=airfoil,
+                control_surfaces = [asb.ControlSurface(name="Flap1", hinge_point=0.66, deflection=0)],
+                JetControls= [JetControl(jet_name="FlapJet1", gain=1, sgn_dup=1)],
+            ),
+            WingJSec(
+                xyz_le=[0, 23*inch, 0],
+                chord=15*inch,
+                twist=0,
+                airfoil=airfoil,
+                control_surfaces = [asb.ControlSurface(name="Flap1", hinge_point=0.66, deflection=0), asb.ControlSurface(name="Flap2", hinge_point=0.66, deflection=0)],
+                JetControls= [JetControl(jet_name="FlapJet1", gain=1, sgn_dup=1), JetControl(jet_name="FlapJet2", gain=1, sgn_dup=1)],
+            ),
+            WingJSec(
+                xyz_le=[0, 41*inch, 0],
+                chord=15*inch,
+                twist=0,
+                airfoil=airfoil,
+                control_surfaces = [asb.ControlSurface(name="Flap2", hinge_point=0.66, deflection=0), asb.ControlSurface(name="Aileron", symmetric=False, hinge_point=0.66, deflection=0)],
+                JetControls= [JetControl(jet_name="FlapJet2", gain=1, sgn_dup=1), JetControl(jet_name="AilJet", gain=1, sgn_dup=-1)],
+            ),
+            WingJSec(
+                xyz_le=[6*inch, 60*inch, 0],
+                chord=10*inch,
+                twist=0,
+                airfoil=airfoil,
+                control_surfaces = [asb.ControlSurface(name="Aileron", symmetric=False, hinge_point=0.66, deflection=0)],
+                JetControls= [JetControl(jet_name="AilJet", gain=1, sgn_dup=-1)],
+            )
+        ]
+    )
+
+
+def build_vertical_tail():
+    import aerosandbox as asb
+    from J import WingJSec, JWing
+
+    return JWing(
+        name="Vertical Tail",
+        symmetric=False,
+        xsecs=[
+            WingJSec(
+                xyz_le=[0, 0, 0],
+                chord=15*inch,
+                twist=0,
+                airfoil=asb.Airfoil(name="NACA0012"),
+                control_surfaces = [asb.ControlSurface(name="Rudder", hinge_point=0.66, deflection=0)]
+            ),
+            WingJSec(
+                xyz_le=[10.5*inch, 0, 15*inch],
+                chord=11*inch,
+                twist=0,
+                airfoil=asb.Airfoil(name="NACA0012"),
+                control_surfaces = [asb.ControlSurface(name="Rudder", hinge_point=0.66, deflection=0)]
+            )
+        ]
+    ).translate([52.5*inch, 0, 0])
+
+
+def build_horizontal_tail():
+    import aerosandbox as asb
+    from J import WingJSec, JWing
+
+    return JWing(
+        name="Horizontal Tail",
+        symmetric=True,
+        xsecs=[
+            WingJSec(
+                xyz_le=[0, 0, 0],
+                chord=12*inch,
+                twist=0,
+                airfoil=asb.Airfoil(name="NACA0012"),
+                control_surfaces = [asb.ControlSurface(name="Elevator", hinge_point=0.5, deflection=0)]
+            ),
+            WingJSec(
+                xyz_le=[3*inch, 25*inch, 0],
+                chord=7*inch,
+                twist=0,
+                airfoil=asb.Airfoil(name="NACA0012"),
+                control_surfaces = [asb.ControlSurface(name="Elevator", hinge_point=0.5, deflection=0)]
+            )
+        ]
+    ).translate([65*inch, 0, 15*inch])
+
+
+def generate_fuselage_xsecs(N: int) -> "FuselageXSecArray":
     """
     Generates a fuselage with N sections, transitioning from a small circular nose,
     to a large square-like midsection, and tapering into a smaller square tail.
 
+    The stations are kept as arrays (see `J.FuselageXSecArray`), so N can be in the hundreds without
+    slowing down construction or `write_jvl`.
+
     Args:
         N (int): Number of sections defining the fuselage.
 
     Returns:
-        List[FuselageXSec]: List of fuselage cross-sections.
+        FuselageXSecArray: The fuselage cross-sections.
     """
+    from J import FuselageXSecArray
+
     x_positions = np.linspace(-43, 60, N)  # Generate N sections along the fuselage
     zs = np.interp(x_positions, [-43, -20, 25, 52], [-12, -12, -5, -5])  # Interpolate height
     widths = np.interp(x_positions, [-43, -20, 25, 52, 60], [3.0, 10.0, 10.0, 3.0, 1.0])  # Width transition
     heights = np.interp(x_positions, [-43, -20, 25, 52, 60], [5.0, 15, 15.0, 5.0, 2.0])  # Height transition
     shapes = np.interp(x_positions, [-43, -20, 25, 52], [2, 50, 50, 50])  # Shape transition
 
-    xsecs = []
-    for x, z, width, height, shape in zip(x_positions, zs, widths, heights, shapes):
-        xsecs.append(asb.FuselageXSec(
-            xyz_c=[x*units.inch, 0, z*units.inch],
-            xyz_normal=[1, 0, 0],  # Assume fuselage is aligned along x-axis
-            width=width*units.inch,
-            height=height*units.inch,  # Rectangular cross-section
-            shape=shape
-        ))
-
-    return xsecs
-
-fuselage_xsecs = generate_fuselage_xsecs(10)  # Generates 10 sections
-fuselage = asb.Fuselage(
-    name='Fuselage',
-    xsecs=fuselage_xsecs
-)
-
-plane = asb.Airplane(
-    name="Initial Aircraft",
-    xyz_ref=[0, 0, 0],
-    wings=[wing, vertical_tail, horizinatal_tail],
-    # fuselages=[fuselage]
-)
-
-avl_plane = JVL(
-    airplane=plane,
-    op_point=asb.OperatingPoint(
-        velocity=100,
-        alpha=5,
-        beta=0,
-        p=0,
-        q=0,
-        r=0,
-    ),
-    avl_command='.\\jvl2.20.exe')
-avl_plane.default_analysis_specific_options = {
+    return FuselageXSecArray(
+        xyz_c=np.column_stack([x_positions*inch, np.zeros(N), zs*inch]),
+        xyz_normal=[1, 0, 0],  # Assume fuselage is aligned along x-axis
+        width=widths*inch,
+        height=heights*inch,  # Rectangular cross-section
+        shape=shapes,
+    )
+
+
+def build_fuselage(N=10):
+    import aerosandbox as asb
+
+    return asb.Fuselage(
+        name='Fuselage',
+        xsecs=generate_fuselage_xsecs(N)  # Generates N sections
+    )
+
+
+def build_airplane(airfoil=None, include_fuselage=False):
+    import aerosandbox as asb
+
+    return asb.Airplane(
+        name="Initial Aircraft",
+        xyz_ref=[0, 0, 0],
+        wings=[build_wing(airfoil), build_vertical_tail(), build_horizontal_tail()],
+        fuselages=[build_fuselage()] if include_fuselage else [],
+    )
+
+
+def analysis_options():
+    import aerosandbox as asb
+    from J import WingJSec, JWing
+
+    return {
         asb.Airplane: dict(profile_drag_coefficient=0),
         JWing: dict(
             wing_level_spanwise_spacing=True,
@@ -181,7 +209,83 @@ avl_plane.default_analysis_specific_options = {
         asb.Fuselage: dict(panel_resolution=24, panel_spacing="cosine"),
     }
 
-avl_plane.write_jvl('821p1', CLAF=False, j=True)
+
+def build_avl_plane(plane=None, velocity=100, alpha=5, beta=0, p=0, q=0, r=0, avl_command='.\\jvl2.20.exe'):
+    """
+    The JVL analysis of `plane` (default: `build_airplane()`) with this project's analysis options.
+    """
+    import aerosandbox as asb
+    from J import JVL
+
+    if plane is None:
+        plane = build_airplane()
+    avl_plane = JVL(
+        airplane=plane,
+        op_point=asb.OperatingPoint(
+            velocity=velocity,
+            alpha=alpha,
+            beta=beta,
+            p=p,
+            q=q,
+            r=r,
+        ),
+        avl_command=avl_command)
+    avl_plane.default_analysis_specific_options = analysis_options()
+    return avl_plane
+
+
+def __getattr__(name):
+    # Lazily built module attributes, for scripts that still do `from geom import plane`
+    if name == "plane":
+        return build_airplane()
+    if name == "avl_plane":
+        return build_avl_plane()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
+    """
+    Writes the .jvl geometry and, on request, the .mass and .run files:
+
+        python geom.py                                   # 821p1, as before
+        python geom.py --jvl 821p1 --mass jvl_test.mass --run 821p1.run
+        python geom.py --job jobs/821p1                  # .jvl, .mass and .run together, published atomically
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the JVL input files for this airplane.")
+    parser.add_argument("--jvl", default="821p1", help="Output .jvl file (default: %(default)s)")
+    parser.add_argument("--mass", help="Also write the .mass file from mass.py's buildup")
+    parser.add_argument("--run", help="Also write a .run file for the default operating point")
+    parser.add_argument("--claf", action="store_true", help="Emit CLAF lines")
+    parser.add_argument("--no-jets", action="store_true", help="Omit JETPARAM / JETCONTROL blocks")
+    parser.add_argument("--fuselage", action="store_true", help="Include the fuselage body")
+    parser.add_argument("--job", help="Write a complete job directory (see batch.write_job) instead of single files")
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing --job directory")
+    args = parser.parse_args(argv)
+
+    plane = build_airplane(include_fuselage=args.fuselage)
+    avl_plane = build_avl_plane(plane)
+    if args.job:
+        from batch import write_job
+        from mass import build_mass_model
+
+        write_job(
+            avl_plane, args.job, mass=build_mass_model(plane),
+            CLAF=args.claf, j=not args.no_jets, overwrite=args.overwrite,
+        )
+        return
+    avl_plane.write_jvl(args.jvl, CLAF=args.claf, j=not args.no_jets)
+    if args.run:
+        avl_plane.write_run(args.run, j=not args.no_jets)
+    if args.mass:
+        from mass import build_mass_model
+
+        build_mass_model(plane).mass_properties().export_AVL_mass_file(args.mass)
+
+
+if __name__ == "__main__":
+    main()
 
 # """ Defining Plane Based on Sections"""
 
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the JVL executable, for exercising runner.py / session.py without JVL installed.
+
+Speaks the same keystroke protocol on stdin (LOAD, MASS, MSET, CASE, OPER, run case selection, X, FT/ST/FS/FE,
+variable/constraint commands like `a c 4` and `d5 pm 0`, and the M parameter menu), prints prompts ending in '^'
+like JVL, and writes output files in JVL's layout. The aerodynamics are a smooth analytic model of the loaded
+geometry, with a small resolution-dependent error so that refinement studies converge.
+
+    python jvl_stub.py airplane.jvl < keystrokes.txt
+"""
+import math
+import sys
+
+import numpy as np
+
+FLIGHT_VARIABLES = ["alpha", "beta", "pb/2V", "qc/2V", "rb/2V"]
+CONSTRAINT_KEYS = {
+    "a": "alpha", "b": "beta", "r": "pb/2V", "p": "qc/2V", "y": "rb/2V",
+    "c": "CL", "s": "CY", "rm": "Cl roll mom", "pm": "Cm pitchmom", "ym": "Cn yaw  mom",
+}
+PARAMETER_KEYS = {
+    "v": "velocity", "d": "density", "mn": "Mach", "g": "grav.acc.", "m": "mass", "x": "X_cg", "y": "Y_cg",
+    "z": "Z_cg", "b": "bank", "ix": "Ixx", "iy": "Iyy", "iz": "Izz",
+}
+
+
+class Geometry:
+    def __init__(self, filepath):
+        with open(filepath) as f:
+            lines = [line.split("!")[0].strip() for line in f]
+        lines = [line for line in lines if line and not line.startswith("#")]
+        self.name = lines[0]
+        self.s_ref, self.c_ref, self.b_ref = [float(v) for v in lines[3].split()[:3]]
+        self.controls, self.jets, self.surfaces = [], [], []
+        for i, line in enumerate(lines):
+            keyword = line[:4].upper()
+            if keyword == "SURF":
+                spacing = lines[i + 2].split()
+                n_chord = int(float(spacing[0]))
+                n_span = int(float(spacing[2])) if len(spacing) > 2 else 12
+                self.surfaces.append(dict(name=lines[i + 1], n_chord=n_chord, n_span=n_span, ydup=False))
+            elif keyword == "YDUP":
+                self.surfaces[-1]["ydup"] = True
+            elif keyword == "CONT" and lines[i + 1].split()[0] not in self.controls:
+                self.controls.append(lines[i + 1].split()[0])
+            elif keyword == "JETC" and lines[i + 1].split()[0] not in self.jets:
+                self.jets.append(lines[i + 1].split()[0])
+        self.n_vortices = sum(s["n_chord"] * s["n_span"] * (2 if s["ydup"] else 1) for s in self.surfaces)
+        self.n_strips = sum(s["n_span"] * (2 if s["ydup"] else 1) for s in self.surfaces)
+
+    def variables(self):
+        return FLIGHT_VARIABLES + self.controls + self.jets
+
+
+class Case:
+    def __init__(self, geometry, name="-unnamed-"):
+        self.name = name
+        self.constraints = {v: (v, 0.0) for v in geometry.variables()}
+        self.parameters = {"velocity": 1.0, "density": 1.225, "Mach": 0.0, "grav.acc.": 9.81, "mass": 1.0,
+                           "X_cg": 0.0, "Y_cg": 0.0, "Z_cg": 0.0, "alpha": 0.0}
+        self.values = {v: 0.0 for v in geometry.variables()}
+
+
+def read_run_file(filepath, geometry):
+    cases = []
+    with open(filepath) as f:
+        for line in f:
+            if line.strip().startswith("Run case"):
+                cases.append(Case(geometry, line.partition(":")[2].strip()))
+            elif cases and "->" in line and "=" in line:
+                variable, _, rest = line.partition("->")
+                constraint, _, value = rest.partition("=")
+                if variable.strip() in cases[-1].constraints:
+                    cases[-1].constraints[variable.strip()] = (constraint.strip(), float(value))
+            elif cases and "=" in line:
+                name, _, value = line.partition("=")
+                try:
+                    cases[-1].parameters[name.strip()] = float(value.split()[0])
+                except (ValueError, IndexError):
+                    pass
+    for case in cases:
+        case.values["alpha"] = case.parameters.get("alpha", 0.0)
+    return cases
+
+
+def coefficients(geometry, values):
+    """Smooth analytic stand-in for the VLM solution."""
+    aspect_ratio = geometry.b_ref ** 2 / geometry.s_ref
+    discretization = 1 - 1.5 / math.sqrt(max(geometry.n_vortices, 1))
+    alpha = math.radians(values["alpha"])
+    beta = math.radians(values["beta"])
+    CLa = 2 * math.pi * aspect_ratio / (aspect_ratio + 2) * discretization
+    CL = CLa * math.sin(alpha)
+    Cm = -0.6 * alpha - 0.8 * values["qc/2V"]
+    Cl = -0.1 * beta - 0.5 * values["pb/2V"]
+    Cn = 0.08 * beta - 0.1 * values["rb/2V"]
+    CY = -0.3 * beta
+    for name in geometry.controls:
+        d = values[name]
+        if name.lower().startswith("elev"):
+            CL += 0.006 * d
+            Cm += -0.025 * d
+        elif name.lower().startswith(("ail", "rud")):
+            Cl += 0.002 * d
+        else:
+            CL += 0.02 * d * discretization
+            Cm += -0.004 * d
+    for name in geometry.jets:
+        CL += 0.25 * values[name] * discretization
+        Cm += -0.03 * values[name]
+    CD = CL ** 2 / (math.pi * aspect_ratio * 0.85) + 0.002 * sum(abs(values[n]) for n in geometry.jets)
+    return {"CL": CL, "CD": CD, "CY": CY, "Cl roll mom": Cl, "Cm pitchmom": Cm, "Cn yaw  mom": Cn}
+
+
+def execute(geometry, case, out):
+    """Newton iteration on the constrained variables, like JVL's X command."""
+    values = case.values
+    for variable, (constraint, value) in case.constraints.items():
+        if constraint == variable:
+            values[variable] = value
+    unknowns = [v for v, (c, _) in case.constraints.items() if c != v]
+
+    def residual(x):
+        for variable, xi in zip(unknowns, x):
+            values[variable] = xi
+        outputs = coefficients(geometry, values)
+        outputs.update(values)
+        return np.array([outputs[case.constraints[v][0]] - case.constraints[v][1] for v in unknowns])
+
+    x = np.array([values[v] for v in unknowns], dtype=float)
+    converged = True
+    for iteration in range(1, 21):
+        r = residual(x)
+        if len(x) == 0 or np.max(np.abs(r)) < 1e-8:
+            break
+        jacobian = np.empty((len(x), len(x)))
+        for k in range(len(x)):
+            dx = np.zeros(len(x))
+            dx[k] = 1e-6
+            jacobian[:, k] = (residual(x + dx) - r) / 1e-6
+        try:
+            step = np.linalg.solve(jacobian, -r)
+        except np.linalg.LinAlgError:
+            converged = False
+            break
+        x = x + step
+        out.write(f"  {iteration:3d}  {' '.join(f'{s:12.4e}' for s in step)}\n")
+    else:
+        converged = False
+    residual(x)
+    if not converged:
+        out.write(" ** Trim convergence failed\n")
+    return coefficients(geometry, values)
+
+
+def total_forces(geometry, case, results):
+    v = case.values
+    lines = [
+        " ---------------------------------------------------------------",
+        " Vortex Lattice Output -- Total Forces",
+        "",
+        f" Configuration: {geometry.name}",
+        f"     # Surfaces = {len(geometry.surfaces):3d}",
+        f"     # Strips   = {geometry.n_strips:3d}",
+        f"     # Vortices ={geometry.n_vortices:4d}",
+        "",
+        f"  Sref = {geometry.s_ref:9.5f}       Cref = {geometry.c_ref:9.5f}       Bref = {geometry.b_ref:9.5f}",
+        "",
+        " Standard axis orientation,  X fwd, Z down",
+        "",
+        f" Run case: {case.name}",
+        "",
+        f"  Alpha = {v['alpha']:9.5f}     pb/2V = {v['pb/2V']:9.5f}",
+        f"  Beta  = {v['beta']:9.5f}     qc/2V = {v['qc/2V']:9.5f}",
+        f"  Mach  = {case.parameters['Mach']:9.3f}     rb/2V = {v['rb/2V']:9.5f}",
+        "",
+        f"  CYtot = {results['CY']:9.5f}     Cmtot = {results['Cm pitchmom']:9.5f}",
+        f"  Cltot = {results['Cl roll mom']:9.5f}     Cntot = {results['Cn yaw  mom']:9.5f}",
+        "",
+        f"  CLtot = {results['CL']:9.5f}",
+        f"  CDtot = {results['CD']:9.5f}",
+        f"  CDvis =   0.00000     CDind = {results['CD']:9.5f}",
+        "",
+    ]
+    lines += [f"   {name:<16}= {v[name]:9.5f}" for name in geometry.controls + geometry.jets]
+    lines += [" ---------------------------------------------------------------", ""]
+    return "\n".join(lines)
+
+
+def stability_derivatives(geometry, case, results):
+    lines = [total_forces(geometry, case, results), " Stability-axis derivatives...", ""]
+    base = dict(case.values)
+
+    def derivative(variable, step):
+        values = dict(base)
+        values[variable] += step
+        return coefficients(geometry, values)
+
+    da = derivative("alpha", 1e-3)
+    lines.append(f" z' force CL |    CLa = {(da['CL'] - results['CL']) / math.radians(1e-3):11.6f}")
+    lines.append(f" y  mom.  Cm |    Cma = {(da['Cm pitchmom'] - results['Cm pitchmom']) / math.radians(1e-3):11.6f}")
+    for k, name in enumerate(geometry.controls + geometry.jets, start=1):
+        dd = derivative(name, 1e-3)
+        lines.append(f"  CLd{k:02d} = {(dd['CL'] - results['CL']) / 1e-3:11.6f}   Cmd{k:02d} = {(dd['Cm pitchmom'] - results['Cm pitchmom']) / 1e-3:11.6f}")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def strip_forces(geometry, case, results):
+    lines = [" ---------------------------------------------------------------", " Surface and Strip Forces by surface",
+             "", f" Run case: {case.name}", ""]
+    j = 1
+    for k, surface in enumerate(geometry.surfaces, start=1):
+        for side in ([1, -1] if surface["ydup"] else [1]):
+            lines += [f"  Surface # {k}     {surface['name']}", " Strip Forces referred to Strip Area, Chord",
+                      "    j     Xle      Yle      Zle      Chord    Area     c cl     ai      cl_norm  cl       cd       cdv    cm_c/4   cm_LE  C.P.x/c"]
+            n = surface["n_span"]
+            for i in range(n):
+                eta = (i + 0.5) / n
+                cl = results["CL"] * 4 / math.pi * math.sqrt(max(1 - eta ** 2, 0))
+                lines.append(f" {j:4d} {0.0:8.4f} {side * eta * geometry.b_ref / 2:8.4f} {0.0:8.4f} {geometry.c_ref:8.4f}"
+                             f" {geometry.c_ref * geometry.b_ref / (2 * n):8.4f} {cl * geometry.c_ref:8.4f} {0.0:8.4f}"
+                             f" {cl:8.4f} {cl:8.4f} {0.01:8.4f} {0.0:8.4f} {-0.1:8.4f} {-0.1 - cl / 4:8.4f} {0.25:8.4f}")
+                j += 1
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def element_forces(geometry, case, results):
+    lines = [" ---------------------------------------------------------------", " Vortex Strengths (by surface, by strip)",
+             "", f" Run case: {case.name}", ""]
+    strip = 1
+    for k, surface in enumerate(geometry.surfaces, start=1):
+        lines.append(f"  Surface # {k}     {surface['name']}")
+        for i in range(surface["n_span"]):
+            lines += [f" Strip # {strip}     # Chordwise = {surface['n_chord']}",
+                      "    I        X           Y           Z           DX        Slope        dCp"]
+            for e in range(surface["n_chord"]):
+                lines.append(f" {e + 1:4d} {e / surface['n_chord']:11.5f} {i:11.5f} {0.0:11.5f} {1 / surface['n_chord']:11.5f} {0.0:11.5f} {results['CL']:11.5f}")
+            lines.append("")
+            strip += 1
+    return "\n".join(lines) + "\n"
+
+
+WRITERS = {"ft": total_forces, "st": stability_derivatives, "fs": strip_forces, "fe": element_forces}
+
+
+def main():
+    out = sys.stdout
+    out.write(" ===================================================\n  Jet Vortex Lattice Program      JVL (stub)\n ===================================================\n")
+    geometry = Geometry(sys.argv[1]) if len(sys.argv) > 1 else None
+    cases = [Case(geometry)] if geometry else []
+    current = 0
+    menu = "top"
+    lines = iter(sys.stdin.readline, "")
+
+    def prompt():
+        if menu == "oper":
+            out.write(f"\n .OPER (case {current + 1}/{len(cases)})^ ")
+        elif menu == "param":
+            out.write("\n .PARM^ ")
+        else:
+            out.write("\n JVL^ ")
+        out.flush()
+
+    def argument(words, index):
+        if len(words) > index:
+            return words[index]
+        prompt_line = next(lines, "").strip()
+        return prompt_line
+
+    prompt()
+    for raw in lines:
+        words = raw.split()
+        command = words[0].lower() if words else ""
+        if menu == "top":
+            if command in ("quit", "q"):
+                break
+            elif command == "load":
+                geometry = Geometry(argument(words, 1))
+                cases, current = [Case(geometry)], 0
+            elif command == "mass":
+                argument(words, 1)
+            elif command == "mset":
+                argument(words, 1)
+            elif command == "case":
+                cases, current = read_run_file(argument(words, 1), geometry), 0
+            elif command == "oper":
+                menu = "oper"
+            elif command == "plop":
+                while next(lines, "").strip():
+                    pass
+            elif command:
+                out.write(f" * Command not recognized: {command}\n")
+        elif menu == "oper":
+            case = cases[current]
+            if not command:
+                menu = "top"
+            elif command.isdigit():
+                current = min(max(int(command) - 1, 0), len(cases) - 1)
+            elif command == "x":
+                case.results = execute(geometry, case, out)
+            elif command in WRITERS:
+                filename = argument(words, 1)
+                if not hasattr(case, "results"):
+                    case.results = execute(geometry, case, out)
+                with open(filename, "w") as f:
+                    f.write(WRITERS[command](geometry, case, case.results))
+            elif command == "m":
+                menu = "param"
+            elif len(words) >= 3:
+                variable = resolve_variable(geometry, command)
+                constraint = resolve_variable(geometry, words[1].lower()) or CONSTRAINT_KEYS.get(words[1].lower())
+                if variable is None or constraint is None:
+                    out.write(f" * Unrecognized variable/constraint: {raw.strip()}\n")
+                else:
+                    case.constraints[variable] = (constraint, float(words[2]))
+            else:
+                out.write(f" * Command not recognized: {command}\n")
+        elif menu == "param":
+            if not command:
+                menu = "oper"
+            elif command in PARAMETER_KEYS and len(words) > 1:
+                cases[current].parameters[PARAMETER_KEYS[command]] = float(words[1])
+        prompt()
+
+
+def resolve_variable(geometry, key):
+    if key in ("a", "b", "r", "p", "y"):
+        return CONSTRAINT_KEYS[key]
+    if key[:1] in ("d", "j") and key[1:].isdigit():
+        names = geometry.controls if key[0] == "d" else geometry.jets
+        index = int(key[1:]) - 1
+        return names[index] if 0 <= index < len(names) else None
+    return None
+
+
+if __name__ == "__main__":
+    main()
@@ -1,124 +1,47 @@
-import aerosandbox as asb
-from aerosandbox.tools import units
-from geom import plane
-
-total_mass_properties = asb.MassProperties(mass=0)
-num_motors = 12
-spacing_between_motors = 5*units.inch
-motor_mass_props = asb.MassProperties(mass=0)
-fan_mass_properties = asb.MassProperties(mass=0)
-motor_mass = 0.02 #from propulsion
-wing = plane.wings[0]
-ht = plane.wings[2]
-vt = plane.wings[1]
-S = plane.s_ref
-b = plane.b_ref
-
-for i in range(int(num_motors/2)):
-
-    motor_mass_props = motor_mass_props + asb.MassProperties(
-        mass=motor_mass,
-        x_cg = 0, y_cg=10*units.inch+spacing_between_motors*i, z_cg=0
-    ) + asb.MassProperties(mass=motor_mass,
-        x_cg = 0, y_cg=-10*units.inch+spacing_between_motors*i, z_cg=0
+from geom import build_airplane
+from massmodel import MATERIALS, airplane_mass_model, inch, spar_masses
+
+
+def build_mass_model(
+        plane=None,
+        num_motors=12,
+        spacing_between_motors=5*inch,
+        motor_mass=0.02, #from propulsion
+        layup_thickness=0.00004, # 0.04mm
+    ):
+    """
+    Mass buildup of `plane` (default: `geom.build_airplane()`) as a `massmodel.MassModel`.
+
+    Any of num_motors, spacing_between_motors, layup_thickness and motor_mass may be arrays to evaluate a sweep in one go
+    """
+    if plane is None:
+        plane = build_airplane()
+    return airplane_mass_model(
+        plane,
+        num_motors=num_motors,
+        spacing_between_motors=spacing_between_motors,
+        layup_thickness=layup_thickness,
+        motor_mass=motor_mass,
     )
 
 
-    fan_mass_properties = fan_mass_properties + asb.MassProperties(
-        mass = 0.36/num_motors,
-        x_cg = 0, y_cg=10*units.inch+spacing_between_motors*i, z_cg=0
-    ) + asb.MassProperties(mass = 0.36/num_motors, 
-        x_cg = 0, y_cg=-10*units.inch+spacing_between_motors*i, z_cg=0
-    )
-total_mass_properties = total_mass_properties + motor_mass_props + fan_mass_properties
-
-fuselage_mass_props = asb.MassProperties(
-    mass = 0.2,
-    x_cg = wing.xsecs[0].chord*0.5
-
-)
-
-servo_mass_props = asb.MassProperties(
-    mass=0.3,
-    x_cg = 0.25
-)
-
-motor_wiring_props = asb.MassProperties(
-    mass = 0.18,
-    x_cg=0.1
-)
-
-avionics_mass_props = asb.MassProperties(
-    mass = 0.18,
-    x_cg=0.25)
-
-lipos_mass_props = asb.MassProperties(
-    mass = 1.1,
-    x_cg=0.25)
-
-boom_mass_props = asb.MassProperties(
-    mass = 0.7,
-    x_cg = (ht.xsecs[0].xyz_le[0]-wing.xsecs[0].xyz_le[0])
-)
-
-total_mass_properties = total_mass_properties + fuselage_mass_props + servo_mass_props + motor_wiring_props + avionics_mass_props + lipos_mass_props + boom_mass_props
-
-foam_density = 48/10 #kg/m^3
-fiberglass_density = 2.6*1000 #kg/m^3
-fiberglass_youngs_modulus = 70e9 #Pa
-fiberglass_shear_modulus = 30e9 #Pa
-fiberglass_layup_epoxy_factor = 2.2
-
-carbon_fiber_density = 1.75*1000 #kg/m^3
-carbon_fiber_yield_strength = 600e6 #Pa
-carbon_fiber_youngs_modulus = 230e9 #Pa
-carbon_fiber_shear_modulus = 50e9 #Pa
-carbon_fiber_layup_epoxy_factor = 2.2
-
-plywood_density = 550 #kg/m^3
-
-# main wing mass (foam estimate)
-ht_surface_area = plane.wings[2].area(type='wetted')
-vt_surface_area = plane.wings[1].area(type='wetted')
-layup_thickness = 0.00004 # 0.04mm
-
-balsa_density = 160 #kg/m^3
-balsa_youngs_modulus = 4e9 #Pa
-balsa_shear_modulus = 1.5e9 #Pa
-balsa_layup_epoxy_factor = 1.2
-
-# spar dimensions (estimate)
-spar_width = 0.005
-cap_height = 0.001
-spar_height = wing.xsecs[0].airfoil.max_thickness()*wing.xsecs[0].chord
-spar_core_volume = spar_height*spar_width*b
-spar_surface_area = 2*(spar_height+spar_width)*b
-core_mass = spar_core_volume*balsa_density*balsa_layup_epoxy_factor
-print(f'core mass: {core_mass}')
-spar_fiberglass_mass = spar_surface_area*fiberglass_density*layup_thickness*fiberglass_layup_epoxy_factor
-print(f'spar fiberglass mass: {spar_fiberglass_mass}')
-spar_cap_mass = 2*(spar_width*cap_height)*b*carbon_fiber_density*carbon_fiber_layup_epoxy_factor
-print(f'spar cap mass: {spar_cap_mass}')
-spar_mass = core_mass + spar_fiberglass_mass + spar_cap_mass
-
-S_fiberglass_mass = S*fiberglass_density*layup_thickness*fiberglass_layup_epoxy_factor/10
-S_foam_mass = wing.volume()*foam_density
-foam_wing_mass = S_fiberglass_mass + S_foam_mass
-
-ht_fiberglass_mass = ht_surface_area*fiberglass_density*layup_thickness*fiberglass_layup_epoxy_factor
-ht_foam_mass = ht.volume()*foam_density
-
-vt_fiberglass_mass = vt_surface_area*fiberglass_density*layup_thickness*fiberglass_layup_epoxy_factor
-vt_foam_mass = vt.volume()*foam_density
-
-foam_wing_mass_props = asb.MassProperties(mass=foam_wing_mass, x_cg=wing.xsecs[0].chord*0.5)
-ht_mass_props = asb.MassProperties(mass=ht_fiberglass_mass + ht_foam_mass, x_cg=ht.xsecs[0].chord*0.5+ht.xsecs[0].xyz_le[0])
-vt_mass_props = asb.MassProperties(mass=vt_fiberglass_mass + vt_foam_mass, x_cg=vt.xsecs[0].chord*0.5+vt.xsecs[0].xyz_le[0])
-
-total_mass_properties = (total_mass_properties  + 
-     servo_mass_props + motor_wiring_props + avionics_mass_props + lipos_mass_props + ht_mass_props + vt_mass_props + foam_wing_mass_props)
-
-total_mass_properties.export_AVL_mass_file('jvl_test.mass')
+def main(mass_file='jvl_test.mass', layup_thickness=0.00004):
+    plane = build_airplane()
+    mass_model = build_mass_model(plane, layup_thickness=layup_thickness)
+
+    # spar dimensions (estimate)
+    spar = spar_masses(plane, layup_thickness=layup_thickness, materials=MATERIALS)
+    print(f'core mass: {spar["core"]}')
+    print(f'spar fiberglass mass: {spar["fiberglass"]}')
+    print(f'spar cap mass: {spar["cap"]}')
+
+    total_mass_properties = mass_model.mass_properties()
+
+    total_mass_properties.export_AVL_mass_file(mass_file)
+
+
+if __name__ == "__main__":
+    main()
 
 # airframe_mass_props = airframe_mass_props - foam_wing_mass_props - ht_mass_props - vt_mass_props
 
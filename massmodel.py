@@ -0,0 +1,218 @@
+import numpy as np
+
+inch = 0.0254
+
+# Material table: density [kg/m^3], layup (epoxy) factor, and moduli [Pa] where known
+MATERIALS = {
+    "foam": dict(density=48 / 10),
+    "fiberglass": dict(density=2.6 * 1000, layup_epoxy_factor=2.2, youngs_modulus=70e9, shear_modulus=30e9),
+    "carbon_fiber": dict(density=1.75 * 1000, layup_epoxy_factor=2.2, youngs_modulus=230e9, shear_modulus=50e9,
+                         yield_strength=600e6),
+    "balsa": dict(density=160, layup_epoxy_factor=1.2, youngs_modulus=4e9, shear_modulus=1.5e9),
+    "plywood": dict(density=550),
+}
+
+INERTIA_COMPONENTS = ("Ixx", "Iyy", "Izz", "Ixy", "Iyz", "Ixz")
+
+
+class MassModel:
+    def __init__(self):
+        """
+        Array-backed mass buildup.
+
+        Components are added in blocks of arrays instead of one asb.MassProperties at a time. Every input may
+        carry leading batch dimensions (e.g. one entry per design in a sweep); the last axis of `mass` indexes
+        components within a block. Totals are computed with a single vectorized reduction over all blocks.
+        """
+        self.names = []
+        self._mass = []
+        self._cg = []
+        self._inertia = []
+
+    def add(self, name, mass, x_cg=0, y_cg=0, z_cg=0, inertia=None):
+        """
+        Adds a block of components.
+
+        :param name: Label for the block
+        :param mass: Component masses [kg]; a scalar, or an array whose last axis indexes components and whose
+            leading axes are batch dimensions. Zero-mass entries can be used to pad blocks of varying size.
+        :param x_cg: Component CG x-locations [m], broadcast against mass (same for y_cg, z_cg)
+        :param inertia: Optional inertias about each component's own CG, shape (..., 6) as
+            (Ixx, Iyy, Izz, Ixy, Iyz, Ixz) in the asb.MassProperties convention. Defaults to point masses.
+        :return: self, so calls can be chained
+        """
+        mass, x_cg, y_cg, z_cg = np.broadcast_arrays(
+            *[np.asarray(v, dtype=float) for v in (mass, x_cg, y_cg, z_cg)]
+        )
+        if mass.ndim == 0:
+            mass, x_cg, y_cg, z_cg = mass[None], x_cg[None], y_cg[None], z_cg[None]
+        if inertia is None:
+            inertia = np.zeros(mass.shape + (6,))
+        else:
+            inertia = np.broadcast_to(np.asarray(inertia, dtype=float), mass.shape + (6,))
+
+        self.names.append(name)
+        self._mass.append(mass)
+        self._cg.append(np.stack([x_cg, y_cg, z_cg], axis=-1))
+        self._inertia.append(inertia)
+        return self
+
+    def arrays(self):
+        """
+        All components broadcast to the common batch shape and concatenated.
+
+        :return: (mass (..., N), cg (..., N, 3), inertia (..., N, 6))
+        """
+        batch_shape = np.broadcast_shapes(*[m.shape[:-1] for m in self._mass])
+        mass = np.concatenate([np.broadcast_to(m, batch_shape + m.shape[-1:]) for m in self._mass], axis=-1)
+        cg = np.concatenate([np.broadcast_to(c, batch_shape + c.shape[-2:]) for c in self._cg], axis=-2)
+        inertia = np.concatenate([np.broadcast_to(i, batch_shape + i.shape[-2:]) for i in self._inertia], axis=-2)
+        return mass, cg, inertia
+
+    def totals(self):
+        """
+        Total mass, CG and inertia about the total CG (parallel axis theorem), reduced over all components.
+
+        :return: dict with "mass" (...), "cg" (..., 3) and "inertia" (..., 6), batch axes leading
+        """
+        mass, cg, inertia = self.arrays()
+        total_mass = mass.sum(axis=-1)
+        total_cg = np.einsum("...n,...nk->...k", mass, cg) / total_mass[..., None]
+
+        r = total_cg[..., None, :] - cg
+        rr = (r * r).sum(axis=-1)
+        m = mass
+        total_inertia = inertia.sum(axis=-2) + np.stack([
+            (m * (rr - r[..., 0] ** 2)).sum(axis=-1),
+            (m * (rr - r[..., 1] ** 2)).sum(axis=-1),
+            (m * (rr - r[..., 2] ** 2)).sum(axis=-1),
+            -(m * r[..., 0] * r[..., 1]).sum(axis=-1),
+            -(m * r[..., 1] * r[..., 2]).sum(axis=-1),
+            -(m * r[..., 2] * r[..., 0]).sum(axis=-1),
+        ], axis=-1)
+        return {"mass": total_mass, "cg": total_cg, "inertia": total_inertia}
+
+    def mass_properties(self, index=()):
+        """
+        Totals for one batch entry as an asb.MassProperties (e.g. for `export_AVL_mass_file`).
+        """
+        import aerosandbox as asb
+
+        totals = self.totals()
+        x_cg, y_cg, z_cg = totals["cg"][index]
+        return asb.MassProperties(
+            mass=float(totals["mass"][index]),
+            x_cg=float(x_cg),
+            y_cg=float(y_cg),
+            z_cg=float(z_cg),
+            **{name: float(value) for name, value in zip(INERTIA_COMPONENTS, totals["inertia"][index])},
+        )
+
+
+def motor_positions(num_motors, spacing_between_motors, y_start=10 * inch):
+    """
+    Motor/fan pairs along the span for (possibly batched) motor counts and spacings.
+
+    Pair i sits at y = y_start + spacing * i and y = -y_start + spacing * i, for i < int(num_motors / 2).
+    Batches with fewer motors are padded with a zero-weight mask.
+
+    :return: (y positions (..., 2 * max pairs), mask (..., 2 * max pairs))
+    """
+    num_motors = np.asarray(num_motors)
+    spacing = np.asarray(spacing_between_motors, dtype=float)
+    pairs = (num_motors // 2).astype(int)
+    i = np.arange(int(pairs.max()))
+    offsets = spacing[..., None] * i
+    y = np.concatenate([y_start + offsets, -y_start + offsets], axis=-1)
+    mask = np.concatenate([i < pairs[..., None]] * 2, axis=-1)
+    y, mask = np.broadcast_arrays(y, mask)
+    return y, mask
+
+
+def airplane_mass_model(
+        plane,
+        num_motors=12,
+        spacing_between_motors=5 * inch,
+        layup_thickness=0.00004,
+        motor_mass=0.02,
+        fan_mass=0.36,
+        materials=MATERIALS,
+):
+    """
+    Mass buildup of the blown-wing airplane from geom.py.
+
+    num_motors, spacing_between_motors, layup_thickness, motor_mass and fan_mass may be arrays; they are
+    broadcast together and every resulting entry is one configuration, so a whole sweep is one MassModel.
+
+    :param plane: asb.Airplane with wings [main wing, vertical tail, horizontal tail]
+    :param num_motors: Total motor count (split evenly between the two sides)
+    :param spacing_between_motors: Spanwise motor spacing [m]
+    :param layup_thickness: Fiberglass layup thickness [m]
+    :param motor_mass: Mass of each motor [kg]
+    :param fan_mass: Total fan mass, shared evenly among the motors [kg]
+    :param materials: Material table, see MATERIALS
+    :return: MassModel
+    """
+    wing = plane.wings[0]
+    vt = plane.wings[1]
+    ht = plane.wings[2]
+    S = plane.s_ref
+
+    foam = materials["foam"]["density"]
+    fiberglass = materials["fiberglass"]["density"] * materials["fiberglass"]["layup_epoxy_factor"]
+
+    num_motors, spacing, layup_thickness, motor_mass, fan_mass = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (num_motors, spacing_between_motors, layup_thickness, motor_mass, fan_mass)]
+    )
+    y, mask = motor_positions(num_motors, spacing)
+
+    model = MassModel()
+    model.add("motors", mask * motor_mass[..., None], y_cg=y)
+    # Configurations without motors have no fans, rather than a 0 / 0 fan mass
+    per_fan = np.divide(fan_mass, num_motors, out=np.zeros_like(fan_mass), where=num_motors > 0)
+    model.add("fans", mask * per_fan[..., None], y_cg=y)
+    model.add("fuselage", 0.2, x_cg=wing.xsecs[0].chord * 0.5)
+    # Servos, wiring, avionics and LiPos enter the buildup twice, which the exported .mass file has always reflected
+    model.add("servos", [0.3, 0.3], x_cg=0.25)
+    model.add("motor wiring", [0.18, 0.18], x_cg=0.1)
+    model.add("avionics", [0.18, 0.18], x_cg=0.25)
+    model.add("lipos", [1.1, 1.1], x_cg=0.25)
+    model.add("boom", 0.7, x_cg=ht.xsecs[0].xyz_le[0] - wing.xsecs[0].xyz_le[0])
+
+    # One component per configuration: trailing component axis of length 1
+    layup_thickness = layup_thickness[..., None]
+    model.add(
+        "horizontal tail",
+        ht.area(type="wetted") * fiberglass * layup_thickness + ht.volume() * foam,
+        x_cg=ht.xsecs[0].chord * 0.5 + ht.xsecs[0].xyz_le[0],
+    )
+    model.add(
+        "vertical tail",
+        vt.area(type="wetted") * fiberglass * layup_thickness + vt.volume() * foam,
+        x_cg=vt.xsecs[0].chord * 0.5 + vt.xsecs[0].xyz_le[0],
+    )
+    model.add(
+        "foam wing",
+        S * fiberglass * layup_thickness / 10 + wing.volume() * foam,
+        x_cg=wing.xsecs[0].chord * 0.5,
+    )
+    return model
+
+
+def spar_masses(plane, layup_thickness=0.00004, spar_width=0.005, cap_height=0.001, materials=MATERIALS):
+    """
+    Main wing spar estimate (balsa core, fiberglass wrap, carbon caps), vectorized over the inputs.
+
+    :return: dict with "core", "fiberglass", "cap" and "total" masses [kg]
+    """
+    wing = plane.wings[0]
+    b = plane.b_ref
+    balsa = materials["balsa"]
+    fiberglass = materials["fiberglass"]
+    carbon = materials["carbon_fiber"]
+
+    spar_height = wing.xsecs[0].airfoil.max_thickness() * wing.xsecs[0].chord
+    core = spar_height * spar_width * b * balsa["density"] * balsa["layup_epoxy_factor"]
+    wrap = 2 * (spar_height + spar_width) * b * fiberglass["density"] * layup_thickness * fiberglass["layup_epoxy_factor"]
+    cap = 2 * (spar_width * cap_height) * b * carbon["density"] * carbon["layup_epoxy_factor"]
+    return {"core": core, "fiberglass": wrap, "cap": cap, "total": core + wrap + cap}
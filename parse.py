@@ -0,0 +1,232 @@
+import numpy as np
+
+# Lines that start a new output block (and therefore a new run case) in JVL's FT/ST/FS/FE dumps
+_BLOCK_HEADERS = (
+    "Vortex Lattice Output",
+    "Surface and Strip Forces",
+    "Vortex Strengths",
+)
+
+_MULTIWORD_KEYS = (
+    "Clb Cnr / Clr Cnb",
+)
+
+
+def _key_values(line, into):
+    """
+    Adds the `key = value` pairs of one line to `into`, keeping the first value seen for a key.
+
+    Splits on '=' once per line: the key is the last word left of each '=', the value the first word right of it.
+    """
+    segments = line.split("=")
+    for left, right in zip(segments[:-1], segments[1:]):
+        left = left.rstrip()
+        key = next((k for k in _MULTIWORD_KEYS if left.endswith(k)), None)
+        if key is None:
+            words = left.split()
+            if not words:
+                continue
+            key = words[-1]
+        words = right.split(None, 1)
+        if not words or key in into:
+            continue
+        try:
+            into[key] = float(words[0])
+        except ValueError:
+            pass
+
+
+def _split_cases(lines):
+    """
+    Yields (case name, lines) for each output block. A file without block headers is a single case.
+    """
+    name = ""
+    block = []
+    has_data = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith(_BLOCK_HEADERS) and has_data:
+            yield name, block
+            name, block, has_data = "", [], False
+        elif stripped.startswith("Run case"):
+            name = stripped.partition(":")[2].strip()
+        has_data = has_data or "=" in line
+        block.append(line)
+    if has_data:
+        yield name, block
+
+
+def _records_to_array(names, records):
+    """
+    Packs a list of {key: float} dicts into a structured array with a 'case' name field and one float field per key.
+    Keys missing from a case are NaN.
+    """
+    fields = {}
+    for record in records:
+        fields.update(dict.fromkeys(record))
+    width = max([len(name) for name in names] + [1])
+    dtype = [("case", f"U{width}")] + [(key, "f8") for key in fields if key != "case"]
+
+    array = np.empty(len(records), dtype=dtype)
+    array["case"] = names
+    nan = np.nan
+    for key in fields:
+        if key != "case":
+            array[key] = [record.get(key, nan) for record in records]
+    return array
+
+
+def parse_totals(text):
+    """
+    Parses JVL total-force output (the FT command, or the screen dump after X) into a structured array.
+
+    Args:
+        text: Contents of one or more concatenated total-force dumps.
+
+    Returns: Structured array with one row per run case; field 'case' holds the run case name and every
+        `key = value` item (Alpha, CLtot, CDtot, Cmtot, control deflections, ...) is a float field.
+    """
+    names, records = [], []
+    for name, block in _split_cases(text.splitlines()):
+        record = {}
+        for line in block:
+            if "=" in line:
+                _key_values(line, record)
+        names.append(name)
+        records.append(record)
+    return _records_to_array(names, records)
+
+
+def parse_stability(text):
+    """
+    Parses JVL stability-derivative output (the ST command) into a structured array.
+
+    The dump starts with the total forces, so the result has the same fields as `parse_totals` plus the
+    derivatives (CLa, Cma, CLd01, ...), the neutral point Xnp and the spiral stability ratio.
+    """
+    return parse_totals(text)
+
+
+def _parse_tables(lines, first_column, context_keys):
+    """
+    Single-pass scan for the numeric tables whose header row starts with `first_column`.
+
+    Args:
+        lines: Iterable of text lines.
+        first_column: First word of the table header (e.g. 'j' for strips, 'I' for elements).
+        context_keys: {line prefix: field} for integer context fields (surface, strip) to tag each row with.
+            The context value is the first integer after the prefix.
+
+    Returns: (header, rows, context) where rows is a list of the raw numeric lines and context a list of
+        (case, *context values) tuples, one per row.
+    """
+    header = None
+    rows = []
+    context = []
+    case = -1
+    current = {field: -1 for field in context_keys.values()}
+    in_table = False
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            in_table = False
+            continue
+        if stripped.startswith("Run case"):
+            case += 1
+            continue
+        if in_table:
+            first = stripped[0]
+            if first.isdigit() or (first in "-." and stripped[1:2].isdigit()):
+                rows.append(stripped)
+                context.append((max(case, 0), *current.values()))
+                continue
+            in_table = False
+        for prefix, field in context_keys.items():
+            if stripped.startswith(prefix):
+                words = stripped[len(prefix):].split()
+                if words and words[0].isdigit():
+                    current[field] = int(words[0])
+                break
+        else:
+            words = stripped.split(None, 1)
+            if words[0] == first_column and len(words) > 1:
+                in_table = True
+                if header is None:
+                    # AVL labels the normalized-lift column "c cl"; keep it a single field
+                    header = stripped.replace(" c cl ", " c_cl ").split()
+
+    return header, rows, context
+
+
+def _table_to_array(header, rows, context, context_fields):
+    if not rows:
+        return np.empty(0, dtype=[(field, "i8") for field in context_fields])
+
+    n_columns = len(rows[0].split())
+    if header is None or len(header) != n_columns:
+        header = [f"col{i}" for i in range(n_columns)]
+
+    try:
+        values = np.array(" ".join(rows).split(), dtype=float).reshape(len(rows), n_columns)
+    except ValueError:
+        # Ragged rows (run-together or overflowed '*****' Fortran fields); fall back to per-row conversion
+        values = np.full((len(rows), n_columns), np.nan)
+        for i, row in enumerate(rows):
+            for k, word in enumerate(row.split()[:n_columns]):
+                try:
+                    values[i, k] = float(word)
+                except ValueError:
+                    pass
+
+    dtype = [(field, "i8") for field in context_fields] + [(name, "f8") for name in header]
+    array = np.empty(len(rows), dtype=dtype)
+    context = np.array(context, dtype=np.int64)
+    for k, field in enumerate(context_fields):
+        array[field] = context[:, k]
+    for k, name in enumerate(header):
+        array[name] = values[:, k]
+    return array
+
+
+def parse_strips(text):
+    """
+    Parses JVL strip-force output (the FS command) into a structured array.
+
+    Args:
+        text: Contents of one or more concatenated strip-force dumps.
+
+    Returns: Structured array with one row per strip per run case. Fields are 'case' (0-based run case index),
+        'surface' (JVL surface number) and one float field per table column (j, Xle, Yle, Zle, Chord, Area,
+        c_cl, ai, cl_norm, cl, cd, cdv, cm_c/4, cm_LE, C.P.x/c, plus any jet columns).
+    """
+    context_keys = {"Surface #": "surface"}
+    header, rows, context = _parse_tables(text.splitlines(), "j", context_keys)
+    return _table_to_array(header, rows, context, ["case", "surface"])
+
+
+def parse_elements(text):
+    """
+    Parses JVL element-force output (the FE command) into a structured array.
+
+    Returns: Structured array with one row per vortex element per run case. Fields are 'case', 'surface',
+        'strip' and one float field per table column (I, X, Y, Z, DX, Slope, dCp, ...).
+    """
+    context_keys = {"Surface #": "surface", "Strip #": "strip"}
+    header, rows, context = _parse_tables(text.splitlines(), "I", context_keys)
+    return _table_to_array(header, rows, context, ["case", "surface", "strip"])
+
+
+def _reader(parser):
+    def read(filepath):
+        with open(filepath, "r") as f:
+            return parser(f.read())
+    read.__name__ = parser.__name__.replace("parse_", "read_")
+    read.__doc__ = f"Reads a file and returns `{parser.__name__}` of its contents."
+    return read
+
+
+read_totals = _reader(parse_totals)
+read_stability = _reader(parse_stability)
+read_strips = _reader(parse_strips)
+read_elements = _reader(parse_elements)
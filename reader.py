@@ -0,0 +1,447 @@
+from pathlib import Path
+
+import numpy as np
+
+import aerosandbox as asb
+from J import JVL, JWing, WingJSec, JetParam, JetControl
+
+# Number of data lines following each keyword (matched on its first four letters, as JVL does).
+# AIRFOIL is followed by coordinate lines up to the next non-numeric line.
+_KEYWORD_LINES = {
+    "SURF": 2,
+    "COMP": 1,
+    "INDE": 1,
+    "YDUP": 1,
+    "SCAL": 1,
+    "TRAN": 1,
+    "ANGL": 1,
+    "NOWA": 0,
+    "NOAL": 0,
+    "NOLO": 0,
+    "CDCL": 1,
+    "SECT": 1,
+    "NACA": 1,
+    "AIRF": None,
+    "AFIL": 1,
+    "CLAF": 1,
+    "CONT": 1,
+    "DESI": 1,
+    "JETP": 1,
+    "JETC": 1,
+    "BODY": 2,
+    "BFIL": 1,
+}
+
+
+def _data_lines(lines):
+    """
+    Yields the non-blank, non-comment lines of a .jvl file with trailing '!' / '#' comments removed.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#!":
+            continue
+        for marker in "!#":
+            i = line.find(marker)
+            if i >= 0:
+                line = line[:i].rstrip()
+        yield line
+
+
+def _keyword(line):
+    key = line[:4].upper()
+    return key if key in _KEYWORD_LINES else None
+
+
+def _is_numeric(line):
+    try:
+        float(line.split(None, 1)[0])
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+def _number(token):
+    """An int if the token is written as one, else a float, so values are written back exactly as read."""
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def _floats(line, n=None):
+    values = [float(token) for token in line.split()]
+    return values if n is None else values[:n]
+
+
+def _spacing_name(value):
+    """The AVL_spacing_parameters name closest to a JVL spacing parameter (JVL accepts any value in [-3, 3])."""
+    names = {}
+    for name, parameter in JVL.AVL_spacing_parameters.items():
+        names.setdefault(parameter, name)
+    return names[min(names, key=lambda parameter: abs(parameter - value))]
+
+
+def _blocks(lines):
+    """
+    Splits the data lines after the header into (keyword, [data lines]) pairs.
+    """
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        keyword = _keyword(line)
+        if keyword is None:  # Stray data line (e.g. a keyword this reader does not know); skip it
+            line = next(lines, None)
+            continue
+        count = _KEYWORD_LINES[keyword]
+        data = []
+        line = next(lines, None)
+        if count is None:
+            while line is not None and _is_numeric(line):
+                data.append(line)
+                line = next(lines, None)
+        else:
+            while line is not None and len(data) < count:
+                data.append(line)
+                line = next(lines, None)
+        yield keyword, data
+
+
+def _read_header(lines):
+    """
+    Parses the title and the four (or five, with CDp) numeric header lines. Returns (header dict, first line after).
+    """
+    title = next(lines).strip()
+    mach = _floats(next(lines))[0]
+    iysym, izsym, zsym = [_number(token) for token in next(lines).split()[:3]]
+    s_ref, c_ref, b_ref = _floats(next(lines), 3)
+    xyz_ref = [_number(token) for token in next(lines).split()[:3]]
+    cdp = 0
+    line = next(lines, None)
+    if line is not None and _keyword(line) is None and _is_numeric(line):
+        cdp = _number(line.split()[0])
+        line = next(lines, None)
+    header = {
+        "name": title,
+        "mach": mach,
+        "iysym": int(iysym),
+        "izsym": int(izsym),
+        "zsym": zsym,
+        "s_ref": s_ref,
+        "c_ref": c_ref,
+        "b_ref": b_ref,
+        "xyz_ref": xyz_ref,
+        "profile_drag_coefficient": cdp,
+    }
+    return header, line
+
+
+def read_jvl_header(filepath, surfaces=True):
+    """
+    Reads only the header of a .jvl file, without loading sidecars or building geometry objects; cheap enough to
+    index large archives.
+
+    Args:
+        filepath: Path to the .jvl file.
+        surfaces: Also scan the rest of the file for SURFACE and BODY names. If False, reading stops after the header.
+
+    Returns: dict with 'name', 'mach', 'iysym', 'izsym', 'zsym', 's_ref', 'c_ref', 'b_ref', 'xyz_ref' and
+        'profile_drag_coefficient', plus 'surfaces' and 'bodies' (lists of names) if `surfaces` is set.
+    """
+    with open(filepath, "r") as f:
+        lines = _data_lines(f)
+        header, line = _read_header(lines)
+        if not surfaces:
+            return header
+        header["surfaces"] = []
+        header["bodies"] = []
+        while line is not None:
+            keyword = _keyword(line)
+            if keyword in ("SURF", "BODY"):
+                name = next(lines, None)
+                if name is not None:
+                    header["surfaces" if keyword == "SURF" else "bodies"].append(name)
+            line = next(lines, None)
+    return header
+
+
+def _resolve(filepath, directory):
+    """
+    Finds a sidecar referenced from a .jvl file: as written, relative to the .jvl directory, or by name alone in it.
+    """
+    path = Path(filepath)
+    for candidate in (path, directory / path, directory / path.name):
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(f"Sidecar file '{filepath}' not found (looked next to the .jvl file in '{directory}').")
+
+
+def _is_airfoil_sidecar(path):
+    """Whether a file has the name write_jvl gives airfoil sidecars (`<jvl name>.afN`)."""
+    return path.suffix.startswith(".af") and path.suffix[3:].isdigit()
+
+
+def _read_coordinates(text):
+    """
+    Parses a .dat-style file (optional name line, then x z pairs). Returns (name or None, (N, 2) array).
+    """
+    name = None
+    first, _, rest = text.partition("\n")
+    if not _is_numeric(first):
+        name = first.strip()
+        text = rest
+    return name, np.array(text.split(), dtype=float).reshape(-1, 2)
+
+
+def _airfoil(block, directory, airfoils):
+    keyword, data = block
+    if keyword == "NACA":
+        return asb.Airfoil(f"naca{data[0].split()[0]}")
+    if keyword == "AIRF":
+        return asb.Airfoil(coordinates=np.array(" ".join(data).split(), dtype=float).reshape(-1, 2))
+    path = _resolve(data[0].split()[0], directory)
+    if path not in airfoils:
+        with open(path, "r") as f:
+            name, coordinates = _read_coordinates(f.read())
+        airfoil = asb.Airfoil(name=name or path.stem, coordinates=coordinates)
+        # A .afN sidecar from write_jvl is already repaneled; marked so that writing it again keeps the points as read
+        if _is_airfoil_sidecar(path) and len(coordinates) == 2 * JVL.airfoil_n_points_per_side - 1:
+            airfoil.repaneled_n_points_per_side = JVL.airfoil_n_points_per_side
+        airfoils[path] = airfoil
+    return airfoils[path]
+
+
+def _read_body(path, name, translate, scale):
+    """
+    Rebuilds an asb.Fuselage from a BFIL written by `write_avl_bfile` (upper contour tail to nose, then lower contour
+    nose to tail), with circular cross-sections of the equivalent radius. The first station is taken to be a point.
+    """
+    with open(path, "r") as f:
+        _, points = _read_coordinates(f.read())
+    n = (len(points) + 1) // 2
+    upper = points[:n][::-1]
+    lower = np.concatenate([upper[:1], points[n:]])
+    x = upper[:, 0] * scale[0] + translate[0]
+    z_upper = upper[:, 1] * scale[2] + translate[2]
+    z_lower = lower[:, 1] * scale[2] + translate[2]
+    # write_avl_bfile writes z_c + equivalent_radius, which is 1e-8 (not 0) for a point section
+    z_upper[0] -= 1e-8
+    z_lower[0] = z_upper[0]
+    return asb.Fuselage(name=name, xsecs=[
+        asb.FuselageXSec(xyz_c=[xi, translate[1], (zu + zl) / 2], radius=(zu - zl) / 2)
+        for xi, zu, zl in zip(x, z_upper, z_lower)
+    ])
+
+
+def _drag_polar(line):
+    values = _floats(line, 6) + [0.0] * 6
+    return dict(zip(("CL1", "CD1", "CL2", "CD2", "CL3", "CD3"), values))
+
+
+def _close_surface(surface):
+    """
+    Builds the JWing (or asb.Wing for plain AVL surfaces) from the collected SURFACE state, applying SCALE,
+    TRANSLATE and ANGLE to the sections since the writer emits them pre-applied.
+    """
+    scale, translate, angle = surface["scale"], surface["translate"], surface["angle"]
+    xsecs = []
+    for section in surface["sections"]:
+        xyz_le = [section["xyz_le"][k] * scale[k] + translate[k] for k in range(3)]
+        xsec = WingJSec(
+            xyz_le=xyz_le,
+            chord=section["chord"] * scale[0],
+            twist=section["twist"] + angle,
+            airfoil=section["airfoil"] or asb.Airfoil("naca0012"),
+            control_surfaces=section["controls"],
+            JetControls=section["jets"],
+        )
+        xsec.analysis_specific_options = {JVL: section["options"]}
+        xsecs.append(xsec)
+
+    if surface["jet_spacing"] is not None or surface["jet_param"] is not None:
+        wing = JWing(
+            name=surface["name"],
+            xsecs=xsecs,
+            JetParam=surface["jet_param"],
+            symmetric=surface["symmetric"],
+            JetSpacing=surface["jet_spacing"],
+        )
+    else:
+        wing = asb.Wing(name=surface["name"], xsecs=xsecs, symmetric=surface["symmetric"])
+    wing.analysis_specific_options = {JVL: surface["options"]}
+    return wing
+
+
+def read_jvl(filepath, op_point=None, **kwargs):
+    """
+    Reads a .jvl file and its AFIL / BFIL sidecars back into a `JVL` object.
+
+    Surfaces become `JWing`s (plain asb.Wings if they have neither jet spacing nor JETPARAM) of `WingJSec`s with
+    their `JetParam` and `JetControl`s. The spacing, resolution, COMPONENT, NOWAKE/NOALBE/NOLOAD, CLAF and CDCL
+    settings are stored as each object's analysis-specific options for JVL, so `write_jvl` reproduces the file.
+    Sidecars are resolved as written, then relative to the .jvl file's directory; each one is read only once.
+
+    Not representable in the geometry objects, and therefore dropped: CONTROL gains and hinge vectors (written
+    back as 1 and 0 0 0), DESIGN variables and YDUPLICATE planes other than y = 0. A computed CLAF is read back as
+    a fixed value. Bodies are rebuilt with circular cross-sections of the BFIL's equivalent radius.
+
+    Args:
+        filepath: Path to the .jvl file.
+        op_point: Operating point for the returned JVL object. Defaults to asb.OperatingPoint().
+        **kwargs: Passed on to `JVL` (avl_command, ...).
+
+    Returns: JVL
+    """
+    filepath = Path(filepath)
+    directory = filepath.parent
+    airfoils = {}
+
+    with open(filepath, "r") as f:
+        lines = _data_lines(f)
+        header, line = _read_header(lines)
+        rest = [] if line is None else [line]
+        rest.extend(lines)
+
+    wing_defaults = JVL.default_analysis_specific_options[asb.Wing]
+    xsec_defaults = JVL.default_analysis_specific_options[asb.WingXSec]
+    fuselage_defaults = JVL.default_analysis_specific_options[asb.Fuselage]
+
+    wings = []
+    fuselages = []
+    surface = None
+    section = None
+    body = None
+
+    def close():
+        nonlocal surface, section, body
+        if surface is not None:
+            wings.append(_close_surface(surface))
+        if body is not None:
+            fuselage = _read_body(body["path"], body["name"], body["translate"], body["scale"])
+            fuselage.analysis_specific_options = {JVL: body["options"]}
+            fuselages.append(fuselage)
+        surface = section = body = None
+
+    for keyword, data in _blocks(rest):
+        if keyword == "SURF":
+            close()
+            tokens = data[1].split()
+            options = dict(wing_defaults)
+            options["drag_polar"] = dict(wing_defaults["drag_polar"])
+            options["chordwise_resolution"] = int(float(tokens[0]))
+            options["chordwise_spacing"] = _spacing_name(float(tokens[1]))
+            options["wing_level_spanwise_spacing"] = len(tokens) >= 4
+            if len(tokens) >= 4:
+                options["spanwise_resolution"] = int(float(tokens[2]))
+                options["spanwise_spacing"] = _spacing_name(float(tokens[3]))
+            jet_spacing = None
+            if len(tokens) >= 8:
+                jet_spacing = dict(zip(("Nujet", "Cspu", "Nwjet", "Cewsp"), map(_number, tokens[4:8])))
+            surface = {
+                "name": data[0],
+                "options": options,
+                "jet_spacing": jet_spacing,
+                "jet_param": None,
+                "symmetric": False,
+                "scale": [1.0, 1.0, 1.0],
+                "translate": [0.0, 0.0, 0.0],
+                "angle": 0.0,
+                "sections": [],
+            }
+        elif keyword == "BODY":
+            close()
+            tokens = data[1].split()
+            options = dict(fuselage_defaults)
+            options["panel_resolution"] = int(float(tokens[0]))
+            if len(tokens) > 1:
+                options["panel_spacing"] = _spacing_name(float(tokens[1]))
+            body = {
+                "name": data[0],
+                "options": options,
+                "path": None,
+                "scale": [1.0, 1.0, 1.0],
+                "translate": [0.0, 0.0, 0.0],
+            }
+        elif body is not None:
+            if keyword == "BFIL":
+                body["path"] = _resolve(data[0].split()[0], directory)
+            elif keyword == "TRAN":
+                body["translate"] = _floats(data[0], 3)
+            elif keyword == "SCAL":
+                body["scale"] = _floats(data[0], 3)
+        elif surface is None:
+            continue
+        elif keyword == "SECT":
+            values = _floats(data[0])
+            options = dict(xsec_defaults)
+            options["drag_polar"] = dict(xsec_defaults["drag_polar"])
+            if len(values) >= 7:
+                options["spanwise_resolution"] = int(values[5])
+                options["spanwise_spacing"] = _spacing_name(values[6])
+            section = {
+                "xyz_le": values[:3],
+                "chord": values[3],
+                "twist": values[4],
+                "airfoil": None,
+                "controls": [],
+                "jets": [],
+                "options": options,
+            }
+            surface["sections"].append(section)
+        elif section is not None and keyword in ("NACA", "AIRF", "AFIL"):
+            section["airfoil"] = _airfoil((keyword, data), directory, airfoils)
+        elif section is not None and keyword == "CLAF":
+            section["options"]["cl_alpha_factor"] = _floats(data[0])[0]
+        elif section is not None and keyword == "CONT":
+            tokens = data[0].split()
+            xhinge = float(tokens[2])
+            section["controls"].append(asb.ControlSurface(
+                name=tokens[0],
+                symmetric=float(tokens[-1]) > 0,
+                hinge_point=abs(xhinge),
+                trailing_edge=xhinge >= 0,
+            ))
+        elif section is not None and keyword == "JETC":
+            tokens = data[0].split()
+            section["jets"].append(JetControl(jet_name=tokens[0], gain=float(tokens[1]), sgn_dup=float(tokens[2])))
+        elif keyword == "CDCL":
+            (section or surface)["options"]["drag_polar"] = _drag_polar(data[0])
+        elif keyword == "JETP":
+            hdisk, fh, djet0, djet1, djet3 = _floats(data[0], 5)
+            surface["jet_param"] = JetParam(hdisk=hdisk, fh=fh, djet0=djet0, djet1=djet1, djet3=djet3)
+        elif keyword == "YDUP":
+            surface["symmetric"] = True
+        elif keyword in ("COMP", "INDE"):
+            surface["options"]["component"] = int(float(data[0]))
+        elif keyword == "NOWA":
+            surface["options"]["no_wake"] = True
+        elif keyword == "NOAL":
+            surface["options"]["no_alpha_beta"] = True
+        elif keyword == "NOLO":
+            surface["options"]["no_load"] = True
+        elif keyword == "SCAL":
+            surface["scale"] = _floats(data[0], 3)
+        elif keyword == "TRAN":
+            surface["translate"] = _floats(data[0], 3)
+        elif keyword == "ANGL":
+            surface["angle"] = _floats(data[0])[0]
+    close()
+
+    airplane = asb.Airplane(
+        name=header["name"],
+        wings=wings,
+        fuselages=fuselages,
+        s_ref=header["s_ref"],
+        c_ref=header["c_ref"],
+        b_ref=header["b_ref"],
+    )
+    airplane.analysis_specific_options = {JVL: {"profile_drag_coefficient": header["profile_drag_coefficient"]}}
+
+    return JVL(
+        airplane=airplane,
+        op_point=asb.OperatingPoint() if op_point is None else op_point,
+        xyz_ref=header["xyz_ref"],
+        ground_effect=bool(header["izsym"]),
+        ground_effect_height=header["zsym"],
+        **kwargs,
+    )
@@ -0,0 +1,477 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import parse
+
+OUTPUT_PARSERS = {
+    "ft": parse.parse_totals,
+    "st": parse.parse_stability,
+    "fs": parse.parse_strips,
+    "fe": parse.parse_elements,
+}
+
+
+def copy_jvl(source, directory):
+    """
+    Copies a .jvl file into `directory` together with the files its AFIL / BFIL lines reference, rewriting those
+    references to bare file names so they resolve from `directory` (as in `JVL.write_jvl_bundle`). References are
+    looked up as written, then relative to the .jvl file's directory, then by name alone in it; ones that cannot be
+    found are left unchanged.
+
+    Returns: The .jvl file name.
+    """
+    source = Path(source)
+    directory = Path(directory)
+    with open(source) as f:
+        lines = f.read().split("\n")
+
+    expect_file = False
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#!":
+            continue
+        if expect_file:
+            expect_file = False
+            reference = Path(stripped.split()[0])
+            for candidate in (reference, source.parent / reference, source.parent / reference.name):
+                if candidate.is_file():
+                    shutil.copy2(candidate, directory / candidate.name)
+                    lines[i] = line.replace(str(stripped.split()[0]), candidate.name, 1)
+                    break
+        elif stripped[:4].upper() in ("AFIL", "BFIL"):
+            expect_file = True
+
+    with open(directory / source.name, "w") as f:
+        f.write("\n".join(lines))
+    return source.name
+
+
+class JVLJob:
+    def __init__(self, geometry, run_file=None, mass_file=None, cases=None, outputs=("ft",), name=None, use_cache=True):
+        """
+        One JVL invocation: a geometry, optional mass and run files, and the run cases to execute.
+
+        :param geometry: A `JVL` object (written into the scratch directory from `write_jvl_bundle`, so AFIL / BFIL
+            lines are bare file names), the path to an
+            existing .jvl file (copied along with the sidecars it references, see `copy_jvl`), or an in-memory bundle from
+            `JVL.write_jvl_bundle` ({file name: bytes}, .jvl first)
+        :param run_file: Path to a .run file, or a dict of `JVL.write_run` keyword arguments (requires a `JVL` geometry)
+        :param mass_file: Path to a .mass file, or an asb.MassProperties to export with `export_AVL_mass_file`
+        :param cases: Run case numbers (1-based) to execute. Defaults to every case in the run file, or case 1
+        :param outputs: Dumps to collect for each case, any of "ft" (total forces), "st" (stability derivatives),
+            "fs" (strip forces) and "fe" (element forces)
+        :param name: Label for the job, used in error messages and scratch directory names
+        :param use_cache: Look up and store this job in the runner's result cache, if it has one
+        """
+        unknown = set(outputs) - set(OUTPUT_PARSERS)
+        if unknown:
+            raise ValueError(f"Unknown outputs {sorted(unknown)}. Valid outputs are: {list(OUTPUT_PARSERS)}")
+        if isinstance(run_file, dict) and isinstance(geometry, (str, Path, dict)):
+            raise ValueError("Generating a run file requires a JVL geometry object, not a .jvl path or bundle.")
+        self.geometry = geometry
+        self.run_file = run_file
+        self.mass_file = mass_file
+        self.cases = cases
+        self.outputs = tuple(outputs)
+        self.name = name
+        self.use_cache = use_cache
+
+    def prepare(self, directory):
+        """
+        Writes or copies every input file into `directory`. Returns (geometry, mass, run) file names relative to it.
+        """
+        directory = Path(directory)
+
+        if isinstance(self.geometry, (str, Path)):
+            geometry_file = copy_jvl(self.geometry, directory)
+        elif isinstance(self.geometry, dict):
+            geometry_file = next(iter(self.geometry))
+            for name, data in self.geometry.items():
+                (directory / name).write_bytes(data)
+        else:
+            geometry_file = "airplane.jvl"
+            # Bare sidecar names: JVL runs with cwd=directory, which may be a relative path
+            self.geometry.materialize(self.geometry.write_jvl_bundle(filename=geometry_file), directory)
+
+        mass_file = None
+        if isinstance(self.mass_file, (str, Path)):
+            mass_file = Path(self.mass_file).name
+            shutil.copy2(self.mass_file, directory / mass_file)
+        elif self.mass_file is not None:
+            mass_file = "airplane.mass"
+            self.mass_file.export_AVL_mass_file(str(directory / mass_file))
+
+        run_file = None
+        if isinstance(self.run_file, (str, Path)):
+            run_file = Path(self.run_file).name
+            shutil.copy2(self.run_file, directory / run_file)
+        elif self.run_file is not None:
+            run_file = "airplane.run"
+            self.geometry.write_run(directory / run_file, **self.run_file)
+
+        return geometry_file, mass_file, run_file
+
+    def case_numbers(self, directory, run_file):
+        if self.cases is not None:
+            return list(self.cases)
+        if run_file is None:
+            return [1]
+        with open(Path(directory) / run_file) as f:
+            n_cases = sum(1 for line in f if line.lstrip().startswith("Run case"))
+        return list(range(1, max(n_cases, 1) + 1))
+
+    def keystrokes(self, mass_file, run_file, cases):
+        """
+        The stdin script for one batch run: load inputs, then execute every case and dump the requested outputs.
+        """
+        lines = self.setup_keystrokes(mass_file, run_file)
+        for case in cases:
+            lines += self.case_keystrokes(case)
+        lines += ["", "quit", ""]
+        return "\n".join(lines)
+
+    def setup_keystrokes(self, mass_file, run_file):
+        """Lines that load the inputs and enter OPER."""
+        lines = ["plop", "g", ""]
+        if mass_file is not None:
+            lines += [f"mass {mass_file}", "mset", "0"]
+        if run_file is not None:
+            lines += [f"case {run_file}"]
+        return lines + ["oper"]
+
+    def case_keystrokes(self, case):
+        """Lines that execute one run case and dump its outputs to `<kind>_<case>.txt`."""
+        return [f"{case}", "x"] + [f"{kind} {kind}_{case}.txt" for kind in self.outputs]
+
+
+class JVLResult:
+    def __init__(self, job, directory, cases):
+        """
+        Outcome of a `JVLJob`. Parsed outputs are structured arrays from the parse module, keyed by output kind.
+        Results served from a `ResultCache` have `cached` set and no `raw` text.
+        """
+        self.job = job
+        self.directory = directory
+        self.cases = cases
+        self.returncode = None
+        self.stdout = ""
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.error = None
+        self.raw = {}
+        self.outputs = {}
+        self.cached = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def converged(self):
+        """False if JVL reported a failed trim iteration for any case."""
+        return "convergence failed" not in self.stdout.lower()
+
+    @property
+    def totals(self):
+        return self.outputs.get("ft")
+
+    @property
+    def stability(self):
+        return self.outputs.get("st")
+
+    @property
+    def strips(self):
+        return self.outputs.get("fs")
+
+    @property
+    def elements(self):
+        return self.outputs.get("fe")
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        name = self.job.name if self.job is not None else None
+        return f"JVLResult(name={name!r}, cases={self.cases}, attempts={self.attempts}, {status})"
+
+
+class JVLRunner:
+    def __init__(self, avl_command, max_workers=None, timeout=60, retries=1, scratch_root=None, keep_scratch=False, cache=None):
+        """
+        Runs many JVL jobs at once, each in its own scratch directory.
+
+        :param avl_command: JVL executable, as a path or an argument list (e.g. [sys.executable, "jvl_stub.py"])
+        :param max_workers: Number of concurrent JVL processes. Defaults to os.cpu_count()
+        :param timeout: Seconds before a JVL process is killed. None disables the timeout
+        :param retries: Extra attempts for jobs that time out, crash, or do not produce every output file
+        :param scratch_root: Directory in which the scratch directories are created. Defaults to the system temp dir
+        :param keep_scratch: Keep scratch directories after the run (for debugging); otherwise they are deleted
+        :param cache: Optional `cache.ResultCache`. Jobs whose inputs hash the same as a cached run return its
+            results without launching JVL
+        """
+        self.avl_command = [str(avl_command)] if isinstance(avl_command, (str, Path)) else [str(c) for c in avl_command]
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        self.scratch_root = scratch_root
+        self.keep_scratch = keep_scratch
+        self.cache = cache
+
+    def run(self, jobs):
+        """
+        Executes jobs concurrently. Returns one `JVLResult` per job, in job order. Failures are reported on the
+        result (`result.error`) rather than raised, so one bad case does not abort a sweep.
+        """
+        jobs = list(jobs)
+        if self.max_workers == 1 or len(jobs) <= 1:
+            return [self.run_one(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(self.run_one, jobs))
+
+    def run_one(self, job):
+        result = None
+        for attempt in range(1, self.retries + 2):
+            directory = Path(tempfile.mkdtemp(prefix=f"jvl_{job.name or 'job'}_", dir=self.scratch_root))
+            try:
+                result = self._attempt(job, directory)
+            except Exception as e:
+                result = JVLResult(job, directory, job.cases)
+                result.error = f"{type(e).__name__}: {e}"
+            result.attempts = attempt
+            if not self.keep_scratch:
+                shutil.rmtree(directory, ignore_errors=True)
+                result.directory = None
+            if result.ok:
+                break
+        return result
+
+    def _attempt(self, job, directory):
+        start = time.perf_counter()
+        geometry_file, mass_file, run_file = job.prepare(directory)
+        cases = job.case_numbers(directory, run_file)
+        result = JVLResult(job, directory, cases)
+
+        key = None
+        if self.cache is not None and job.use_cache:
+            key = self.cache.key(directory, extra=[cases, job.outputs, self.avl_command])
+            hit = self.cache.get(key)
+            if hit is not None:
+                result.outputs, result.stdout = hit
+                result.cached = True
+                result.elapsed = time.perf_counter() - start
+                return result
+
+        proc = subprocess.Popen(
+            self.avl_command + [geometry_file],
+            cwd=directory,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        try:
+            result.stdout, _ = proc.communicate(input=job.keystrokes(mass_file, run_file, cases), timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            result.stdout, _ = proc.communicate()
+            result.error = f"JVL timed out after {self.timeout} s"
+        result.returncode = proc.returncode
+        result.elapsed = time.perf_counter() - start
+        if result.error is not None:
+            return result
+
+        for kind in job.outputs:
+            texts = []
+            for case in cases:
+                path = directory / f"{kind}_{case}.txt"
+                if not path.exists():
+                    result.error = f"JVL did not write {path.name} (exit code {proc.returncode})"
+                    return result
+                texts.append(path.read_text())
+            result.raw[kind] = "".join(texts)
+            result.outputs[kind] = OUTPUT_PARSERS[kind](result.raw[kind])
+
+        if key is not None:
+            self.cache.put(key, result.outputs, result.stdout)
+        return result
+
+
+class AsyncJVLRunner:
+    def __init__(self, avl_command, max_concurrency=64, case_timeout=60, retries=1, scratch_root=None, keep_scratch=False, cache=None, on_case=None):
+        """
+        asyncio counterpart of `JVLRunner`: JVL processes are driven with `asyncio.create_subprocess_exec` from the
+        event loop, so hundreds of jobs can be in flight without a thread each.
+
+        Cases are fed to JVL one at a time and each case's dumps are parsed as soon as JVL has written them, so a
+        hung case is detected (and the process killed) after `case_timeout` rather than at the end of the job.
+        Cancelling a task that awaits `run`/`run_one` kills its JVL process and removes its scratch directory.
+
+        :param avl_command: JVL executable, as a path or an argument list (e.g. [sys.executable, "jvl_stub.py"])
+        :param max_concurrency: Maximum number of JVL processes running at once
+        :param case_timeout: Seconds allowed per run case (including loading the inputs for the first). None disables it
+        :param retries: Extra attempts for jobs that time out, crash, or do not produce every output file
+        :param scratch_root: Directory in which the scratch directories are created. Defaults to the system temp dir
+        :param keep_scratch: Keep scratch directories after the run (for debugging); otherwise they are deleted
+        :param cache: Optional `cache.ResultCache`, used as in `JVLRunner`
+        :param on_case: Optional callback on_case(job, case, {kind: structured array}), called with each case's
+            parsed dumps as soon as JVL has written them
+        """
+        self.avl_command = [str(avl_command)] if isinstance(avl_command, (str, Path)) else [str(c) for c in avl_command]
+        self.max_concurrency = max_concurrency
+        self.case_timeout = case_timeout
+        self.retries = retries
+        self.scratch_root = scratch_root
+        self.keep_scratch = keep_scratch
+        self.cache = cache
+        self.on_case = on_case
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Created lazily, inside the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, jobs):
+        """
+        Executes jobs concurrently. Returns one `JVLResult` per job, in job order; failures are reported on the
+        result, as in `JVLRunner.run`.
+        """
+        return await asyncio.gather(*[self.run_one(job) for job in jobs])
+
+    async def as_completed(self, jobs):
+        """
+        Async iterator over the `JVLResult`s of `jobs`, in completion order.
+        """
+        for future in asyncio.as_completed([self.run_one(job) for job in jobs]):
+            yield await future
+
+    async def run_one(self, job):
+        async with self.semaphore:
+            result = None
+            for attempt in range(1, self.retries + 2):
+                directory = Path(tempfile.mkdtemp(prefix=f"jvl_{job.name or 'job'}_", dir=self.scratch_root))
+                try:
+                    result = await self._attempt(job, directory)
+                except asyncio.CancelledError:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    raise
+                except Exception as e:
+                    result = JVLResult(job, directory, job.cases)
+                    result.error = f"{type(e).__name__}: {e}"
+                result.attempts = attempt
+                if not self.keep_scratch:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    result.directory = None
+                if result.ok:
+                    break
+            return result
+
+    async def _attempt(self, job, directory):
+        start = time.perf_counter()
+        geometry_file, mass_file, run_file = await asyncio.to_thread(job.prepare, directory)
+        cases = job.case_numbers(directory, run_file)
+        result = JVLResult(job, directory, cases)
+
+        key = None
+        if self.cache is not None and job.use_cache:
+            key = self.cache.key(directory, extra=[cases, job.outputs, self.avl_command])
+            hit = self.cache.get(key)
+            if hit is not None:
+                result.outputs, result.stdout = hit
+                result.cached = True
+                result.elapsed = time.perf_counter() - start
+                return result
+
+        proc = await asyncio.create_subprocess_exec(
+            *self.avl_command, geometry_file,
+            cwd=directory,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        stdout = []
+        output = asyncio.Event()
+        # Drain stdout continuously so JVL never blocks on a full pipe
+        reader = asyncio.create_task(self._read_stdout(proc, stdout, output))
+        texts = {kind: [] for kind in job.outputs}
+        try:
+            proc.stdin.write(("\n".join(job.setup_keystrokes(mass_file, run_file)) + "\n").encode())
+            for case in cases:
+                # A final dump after the requested ones: once it exists, every file before it is complete
+                sync = directory / f"sync_{case}.txt"
+                proc.stdin.write(("\n".join(job.case_keystrokes(case) + [f"ft {sync.name}"]) + "\n").encode())
+                await proc.stdin.drain()
+                try:
+                    async with asyncio.timeout(self.case_timeout):
+                        await self._wait_for_dump(sync, reader, output)
+                except TimeoutError:
+                    result.error = f"JVL timed out after {self.case_timeout} s on case {case}"
+                    return result
+
+                for kind in job.outputs:
+                    path = directory / f"{kind}_{case}.txt"
+                    if not path.exists():
+                        result.error = f"JVL did not write {path.name} (exit code {proc.returncode})"
+                        return result
+                    texts[kind].append(path.read_text())
+                if self.on_case is not None:
+                    self.on_case(job, case, {kind: OUTPUT_PARSERS[kind](texts[kind][-1]) for kind in job.outputs})
+
+            proc.stdin.write(b"\nquit\n")
+            await proc.stdin.drain()
+            proc.stdin.close()
+            await proc.wait()
+        except (BrokenPipeError, ConnectionResetError):
+            await proc.wait()
+            result.error = f"JVL exited early (exit code {proc.returncode})"
+            return result
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            await reader
+            result.stdout = b"".join(stdout).decode(errors="replace")
+            result.returncode = proc.returncode
+            result.elapsed = time.perf_counter() - start
+
+        for kind, kind_texts in texts.items():
+            result.raw[kind] = "".join(kind_texts)
+            result.outputs[kind] = OUTPUT_PARSERS[kind](result.raw[kind])
+
+        if key is not None:
+            self.cache.put(key, result.outputs, result.stdout)
+        return result
+
+    @staticmethod
+    async def _read_stdout(proc, into, output):
+        while True:
+            chunk = await proc.stdout.read(65536)
+            if not chunk:
+                break
+            into.append(chunk)
+            output.set()
+        output.set()
+
+    @staticmethod
+    async def _wait_for_dump(path, reader, output):
+        """
+        Waits until JVL has written `path` or closed its stdout. JVL prints its next prompt once a dump is written,
+        so the file is checked whenever new output arrives; the backoff timeout only covers a solver that writes it
+        without printing anything afterwards.
+        """
+        delay = 0.001
+        while True:
+            output.clear()
+            if path.exists() or reader.done():
+                return
+            try:
+                async with asyncio.timeout(delay):
+                    await output.wait()
+            except TimeoutError:
+                delay = min(2 * delay, 0.1)
@@ -0,0 +1,227 @@
+import copy
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from J import JWing
+from runner import JVLJob
+
+SECTION_FIELDS = ("chord", "xyz_le", "twist", "hinge_point")
+JET_PARAM_FIELDS = ("hdisk", "fh", "djet0", "djet1", "djet3")
+
+# Finite-difference steps per field. JETPARAM values are written with 3 decimals (djet3 with 6), so their steps are
+# multiples of that resolution; a smaller step would round back to the baseline file.
+DEFAULT_STEPS = {
+    "chord": 1e-3,
+    "xyz_le": 1e-3,
+    "twist": 0.05,
+    "hinge_point": 2e-3,
+    "hdisk": 5e-3,
+    "fh": 1e-2,
+    "djet0": 1e-2,
+    "djet1": 1e-2,
+    "djet3": 1e-5,
+}
+
+DEFAULT_OUTPUTS = ("CLtot", "CDtot", "Cmtot")
+
+
+def design_variables(jvl, fields=SECTION_FIELDS + JET_PARAM_FIELDS, wings=None):
+    """
+    Every design variable of the given fields, as tuples:
+
+        (wing name, section index, "chord" | "twist")
+        (wing name, section index, "xyz_le", component 0 | 1 | 2)
+        (wing name, section index, "hinge_point", control surface name)
+        (wing name, None, JetParam field)       for JWings with a JetParam
+
+    Hinge points of controls on a wing's last section are left out, since the writer does not emit them.
+
+    Args:
+        jvl: The `JVL` object.
+        fields: Fields to include, from SECTION_FIELDS and JET_PARAM_FIELDS.
+        wings: Wing names to include. Defaults to every wing.
+    """
+    variables = []
+    for wing in jvl.airplane.wings:
+        name = wing.name.strip()
+        if wings is not None and name not in wings:
+            continue
+        for i, xsec in enumerate(wing.xsecs):
+            for field in SECTION_FIELDS:
+                if field not in fields:
+                    continue
+                if field == "xyz_le":
+                    variables += [(name, i, field, k) for k in range(3)]
+                elif field == "hinge_point":
+                    if i < len(wing.xsecs) - 1:
+                        variables += [(name, i, field, surf.name.strip()) for surf in xsec.control_surfaces]
+                else:
+                    variables.append((name, i, field))
+        if isinstance(wing, JWing) and wing.JetParam is not None:
+            variables += [(name, None, field) for field in JET_PARAM_FIELDS if field in fields]
+    return variables
+
+
+def _locate(jvl, variable):
+    """(object, attribute, component) holding a design variable."""
+    wing_name, index, field, *component = variable
+    wings = [wing for wing in jvl.airplane.wings if wing.name.strip() == wing_name]
+    if not wings:
+        raise ValueError(f"No wing named '{wing_name}'. Wings are: {[wing.name.strip() for wing in jvl.airplane.wings]}")
+    wing = wings[0]
+    if field in JET_PARAM_FIELDS:
+        if getattr(wing, "JetParam", None) is None:
+            raise ValueError(f"Wing '{wing_name}' has no JetParam.")
+        return wing.JetParam, field, None
+    if field not in SECTION_FIELDS:
+        raise ValueError(f"Unknown design field '{field}'. Valid fields are: {list(SECTION_FIELDS + JET_PARAM_FIELDS)}")
+    xsec = wing.xsecs[index]
+    if field == "hinge_point":
+        surfaces = [surf for surf in xsec.control_surfaces if surf.name.strip() == component[0]]
+        if not surfaces:
+            raise ValueError(f"Section {index} of '{wing_name}' has no control surface '{component[0]}'.")
+        return surfaces[0], field, None
+    return xsec, field, component[0] if component else None
+
+
+def get_value(jvl, variable):
+    obj, field, component = _locate(jvl, variable)
+    value = getattr(obj, field)
+    return float(value if component is None else value[component])
+
+
+def set_value(jvl, variable, value):
+    obj, field, component = _locate(jvl, variable)
+    if component is None:
+        setattr(obj, field, value)
+    else:
+        vector = np.array(getattr(obj, field), dtype=float)
+        vector[component] = value
+        setattr(obj, field, vector)
+
+
+def _bundle_key(bundle):
+    h = hashlib.blake2b(digest_size=20)
+    for name, data in bundle.items():
+        h.update(name.encode() + b"\0" + data + b"\0")
+    return h.hexdigest()
+
+
+def sensitivities(
+        jvl,
+        runner,
+        variables=None,
+        steps=None,
+        central=False,
+        run=None,
+        mass_file=None,
+        outputs=DEFAULT_OUTPUTS,
+        baseline=None,
+        CLAF=True,
+        j=True,
+):
+    """
+    Finite-difference Jacobian of total-force outputs with respect to geometry and JetParam design variables.
+
+    Every perturbed geometry is generated up front with `JVL.write_jvl_bundle` (in memory), and the files are
+    compared by content: perturbations that produce the baseline files (e.g. a step below the written precision)
+    are not run and get a NaN derivative (they are listed in "unchanged"), and perturbations that produce identical files share one run. The
+    remaining jobs, plus the baseline unless given, run concurrently on `runner`.
+
+    Args:
+        jvl: The `JVL` object. It is not modified.
+        runner: A `runner.JVLRunner`.
+        variables: Design variables, see `design_variables`. Defaults to all of them.
+        steps: {variable or field: step} overrides for DEFAULT_STEPS.
+        central: Central differences (two runs per variable) instead of forward differences.
+        run: `JVL.write_run` keyword arguments for the run cases, shared by every geometry. Defaults to a single
+            case at the op_point.
+        mass_file: Optional .mass file path or asb.MassProperties, for trimmed cases.
+        outputs: Total-force fields to differentiate.
+        baseline: A `JVLResult` of the unperturbed geometry with the same run cases (e.g. from the optimizer's
+            function evaluation), reused instead of running the baseline again.
+        CLAF: Passed to `JVL.write_jvl_bundle`.
+        j: Passed to `JVL.write_jvl_bundle`.
+
+    Returns: dict with "variables", "steps", "values": baseline outputs (n_cases, n_outputs), "jacobian":
+        (n_cases, n_outputs, n_variables), NaN where a run failed or the step did not change the files,
+        "unchanged": variables whose perturbed files equal the baseline, "runs": number of JVL jobs launched, "errors": {variable: error}, "cases" and "outputs".
+    """
+    variables = design_variables(jvl) if variables is None else [tuple(variable) for variable in variables]
+    steps = steps or {}
+    signs = (1, -1) if central else (1,)
+    outputs = list(outputs)
+
+    base_bundle = jvl.write_jvl_bundle(CLAF=CLAF, j=j)
+    base_key = _bundle_key(base_bundle)
+    bundles = {base_key: base_bundle}
+    keys = {}
+    step_sizes = []
+    for variable in variables:
+        step = steps.get(variable, steps.get(variable[2], DEFAULT_STEPS[variable[2]]))
+        step_sizes.append(step)
+        value = get_value(jvl, variable)
+        for sign in signs:
+            perturbed = copy.deepcopy(jvl)
+            set_value(perturbed, variable, value + sign * step)
+            bundle = perturbed.write_jvl_bundle(CLAF=CLAF, j=j)
+            key = _bundle_key(bundle)
+            bundles.setdefault(key, bundle)
+            keys[variable, sign] = key
+
+    directory = Path(tempfile.mkdtemp(prefix="jvl_sensitivity_"))
+    try:
+        run_file = directory / "airplane.run"
+        jvl.write_run(run_file, **(run or {}))
+        needed = set(keys.values())
+        if baseline is None:
+            needed.add(base_key)
+        needed = [key for key in bundles if key in needed]
+        jobs = [
+            JVLJob(bundles[key], run_file=run_file, mass_file=mass_file, outputs=("ft",), name=f"fd{i}")
+            for i, key in enumerate(needed)
+        ]
+        results = dict(zip(needed, runner.run(jobs)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if baseline is not None:
+        results.setdefault(base_key, baseline)
+
+    def values(key):
+        result = results[key]
+        if not (result.ok and result.converged):
+            return None
+        return np.stack([result.totals[name] for name in outputs], axis=-1)
+
+    base = values(base_key)
+    if base is None:
+        raise RuntimeError(f"The baseline geometry failed: {results[base_key].error or 'trim did not converge'}")
+
+    jacobian = np.full(base.shape + (len(variables),), np.nan)
+    errors = {}
+    for k, (variable, step) in enumerate(zip(variables, step_sizes)):
+        if all(keys[variable, sign] == base_key for sign in signs):
+            continue  # The files do not see the step, so the derivative is unknown rather than zero
+        plus = values(keys[variable, 1])
+        minus = values(keys[variable, -1]) if central else base
+        if plus is None or minus is None:
+            failed = results[keys[variable, 1]] if plus is None else results[keys[variable, -1]]
+            errors[variable] = failed.error or "trim did not converge"
+            continue
+        jacobian[..., k] = (plus - minus) / (len(signs) * step)
+
+    return {
+        "variables": variables,
+        "steps": step_sizes,
+        "values": base,
+        "jacobian": jacobian,
+        "unchanged": [variable for variable in variables if all(keys[variable, sign] == base_key for sign in signs)],
+        "runs": len(jobs),
+        "errors": errors,
+        "cases": [str(case) for case in results[base_key].totals["case"]],
+        "outputs": outputs,
+    }
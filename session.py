@@ -0,0 +1,257 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from runner import JVLResult, OUTPUT_PARSERS
+
+
+class JVLSession:
+    # OPER-menu keys for the flight-state variables and the force/moment constraints
+    variable_keys = {"alpha": "a", "beta": "b", "pb/2V": "r", "qc/2V": "p", "rb/2V": "y"}
+    constraint_keys = {"CL": "c", "CY": "s", "Cl": "rm", "Cm": "pm", "Cn": "ym"}
+    # Control n is variable "d<n>", jet n is "j<n>" (both numbered in .jvl order)
+    control_key = "d"
+    jet_key = "j"
+    # Keys of the M (parameter) menu
+    parameter_keys = {
+        "velocity": "v",
+        "density": "d",
+        "Mach": "mn",
+        "grav.acc.": "g",
+        "bank": "b",
+        "mass": "m",
+        "X_cg": "x",
+        "Y_cg": "y",
+        "Z_cg": "z",
+        "Ixx": "ix",
+        "Iyy": "iy",
+        "Izz": "iz",
+    }
+
+    def __init__(self, jvl, avl_command=None, mass_file=None, directory=None, timeout=30, retries=1, j=True):
+        """
+        Long-lived JVL process with the geometry loaded once; each `run` streams only the new operating point,
+        control and jet settings through stdin.
+
+        :param jvl: The `JVL` object whose geometry is written (from `write_jvl_bundle`) and loaded at start
+        :param avl_command: JVL executable, as a path or an argument list. Defaults to jvl.avl_command
+        :param mass_file: Path to a .mass file, or an asb.MassProperties to export, loaded at start
+        :param directory: Working directory for the geometry and output files. Defaults to a temporary directory
+            that is removed on close
+        :param timeout: Seconds to wait for a case before the process is considered hung and restarted
+        :param retries: Number of automatic restarts (and re-runs) for a case whose process died or hung
+        :param j: Include jet variables
+        """
+        if avl_command is None:
+            avl_command = jvl.avl_command
+        self.jvl = jvl
+        self.avl_command = [str(avl_command)] if isinstance(avl_command, (str, Path)) else [str(c) for c in avl_command]
+        self.mass_file = mass_file
+        self.timeout = timeout
+        self.retries = retries
+        self.j = j
+        self._own_directory = directory is None
+        self.directory = Path(tempfile.mkdtemp(prefix="jvl_session_") if directory is None else directory)
+        self.restarts = 0
+        self.proc = None
+        self._stdout = []
+        self._stdout_lock = threading.Lock()
+        self._counter = 0
+
+        self.variables = self.jvl.run_variables(j=j)
+        self._keys = dict(self.variable_keys)
+        self._keys.update({name: f"{self.control_key}{i + 1}" for i, name in enumerate(self.jvl.control_names())})
+        self._keys.update({name: f"{self.jet_key}{i + 1}" for i, name in enumerate(self.jvl.jet_names(j=j))})
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """
+        Writes the input files (first start only) and launches JVL with the geometry loaded, sitting in OPER.
+        """
+        geometry_file = self.directory / "airplane.jvl"
+        if not geometry_file.exists():
+            # Bare sidecar names, since JVL runs with cwd=directory and `directory` may be relative
+            self.jvl.materialize(self.jvl.write_jvl_bundle(filename=geometry_file.name, j=self.j), self.directory)
+            if self.mass_file is not None and not isinstance(self.mass_file, (str, Path)):
+                self.mass_file.export_AVL_mass_file(str(self.directory / "airplane.mass"))
+            elif self.mass_file is not None:
+                shutil.copy2(self.mass_file, self.directory / "airplane.mass")
+
+        self.proc = subprocess.Popen(
+            self.avl_command + [geometry_file.name],
+            cwd=self.directory,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        # Drain stdout continuously so JVL never blocks on a full pipe
+        threading.Thread(target=self._read_stdout, args=(self.proc,), daemon=True).start()
+
+        lines = ["plop", "g", ""]
+        if self.mass_file is not None:
+            lines += ["mass airplane.mass", "mset", "0"]
+        lines += ["oper"]
+        self._send(lines)
+
+    def _read_stdout(self, proc):
+        fd = proc.stdout.fileno()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            with self._stdout_lock:
+                self._stdout.append(chunk)
+
+    def _take_stdout(self):
+        with self._stdout_lock:
+            text = b"".join(self._stdout).decode(errors="replace")
+            self._stdout.clear()
+        return text
+
+    def _send(self, lines):
+        self.proc.stdin.write(("\n".join(lines) + "\n").encode())
+        self.proc.stdin.flush()
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def healthy(self, timeout=None):
+        """
+        True if the process is running and answers a round trip (a total-forces dump) within `timeout` seconds.
+        """
+        if not self.alive():
+            return False
+        self._counter += 1
+        sync = self.directory / f"ping_{self._counter}.txt"
+        try:
+            self._send([f"ft {sync.name}"])
+            return self._wait_for(sync, self.timeout if timeout is None else timeout)
+        except OSError:
+            return False
+        finally:
+            sync.unlink(missing_ok=True)
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def stop(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self._send(["", "quit"])
+                self.proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+    def close(self):
+        self.stop()
+        if self._own_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _wait_for(self, path, timeout):
+        deadline = time.monotonic() + timeout
+        while not path.exists():
+            if not self.alive() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def case_commands(self, variables=None, constraints=None, parameters=None):
+        """
+        OPER-menu keystrokes setting up one case. Every variable is sent (unset ones at their defaults), so no
+        constraint from a previous case leaks into this one.
+        """
+        variables = dict(variables or {})
+        constraints = dict(constraints or {})
+        for name in list(variables) + list(constraints):
+            if name not in self._keys:
+                raise ValueError(f"Unknown run variable '{name}'. Valid variables are: {list(self._keys)}")
+
+        lines = []
+        for name, default in self.variables.items():
+            key = self._keys[name]
+            if name in constraints:
+                constraint, value = constraints[name]
+                constraint_key = self.constraint_keys.get(constraint) or self._keys.get(constraint)
+                if constraint_key is None:
+                    raise ValueError(f"Unknown constraint '{constraint}' for '{name}'.")
+                lines.append(f"{key} {constraint_key} {float(value):.10g}")
+            else:
+                lines.append(f"{key} {key} {float(variables.get(name, default)):.10g}")
+
+        if parameters:
+            lines.append("m")
+            for name, value in parameters.items():
+                if name not in self.parameter_keys:
+                    raise ValueError(f"Unknown parameter '{name}'. Valid parameters are: {list(self.parameter_keys)}")
+                lines.append(f"{self.parameter_keys[name]} {float(value):.10g}")
+            lines.append("")
+        return lines
+
+    def run(self, variables=None, constraints=None, parameters=None, outputs=("ft",)):
+        """
+        Solves one case on the loaded geometry and returns a `JVLResult` with the parsed outputs.
+
+        Args:
+            variables: {variable: value}, as in `JVL.write_run`.
+            constraints: {variable: (constraint, value)}, as in `JVL.write_run`.
+            parameters: {parameter: value} for the M menu (velocity, density, mass, X_cg, ...).
+            outputs: Dumps to collect, any of "ft", "st", "fs", "fe".
+
+        Returns: JVLResult. If the process dies or hangs it is restarted (up to `retries` times) and the case re-run;
+            if it still fails, `result.error` is set.
+        """
+        unknown = set(outputs) - set(OUTPUT_PARSERS)
+        if unknown:
+            raise ValueError(f"Unknown outputs {sorted(unknown)}. Valid outputs are: {list(OUTPUT_PARSERS)}")
+        commands = self.case_commands(variables, constraints, parameters)
+
+        result = JVLResult(None, self.directory, [1])
+        for attempt in range(1, self.retries + 2):
+            result.attempts = attempt
+            if self.proc is None:
+                self.start()
+            elif not self.alive():
+                self.restart()
+            start = time.perf_counter()
+            self._counter += 1
+            files = {kind: self.directory / f"{kind}_{self._counter}.txt" for kind in outputs}
+            # A final dump after the requested ones: once it exists, every file before it is complete
+            sync = self.directory / f"sync_{self._counter}.txt"
+            self._take_stdout()
+            try:
+                self._send(commands + ["x"] + [f"{kind} {path.name}" for kind, path in files.items()] + [f"ft {sync.name}"])
+                done = self._wait_for(sync, self.timeout)
+            except OSError:
+                done = False
+            result.elapsed = time.perf_counter() - start
+            result.stdout = self._take_stdout()
+
+            if done:
+                result.error = None
+                for kind, path in files.items():
+                    result.raw[kind] = path.read_text()
+                    result.outputs[kind] = OUTPUT_PARSERS[kind](result.raw[kind])
+                    path.unlink()
+                sync.unlink()
+                return result
+
+            result.error = "JVL session died" if not self.alive() else f"JVL session hung for {self.timeout} s"
+            self.restart()
+        return result
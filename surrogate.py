@@ -0,0 +1,236 @@
+import itertools
+
+import numpy as np
+
+from runner import JVLJob
+
+DEFAULT_OUTPUTS = ("CLtot", "CDtot", "Cmtot")
+
+
+def latin_hypercube(n, low, high, rng):
+    """n points stratified along every axis of the box [low, high]."""
+    d = len(low)
+    strata = np.stack([rng.permutation(n) for _ in range(d)], axis=1)
+    unit = (strata + rng.random((n, d))) / n
+    return low + unit * (high - low)
+
+
+def polynomial_exponents(d, degree):
+    """Exponents (n_terms, d) of every monomial of total degree <= degree in d variables."""
+    return np.array([e for e in itertools.product(range(degree + 1), repeat=d) if sum(e) <= degree], dtype=int).reshape(-1, d)
+
+
+class Surrogate:
+    def __init__(
+            self,
+            jvl,
+            runner,
+            bounds,
+            outputs=DEFAULT_OUTPUTS,
+            kind="polynomial",
+            degree=2,
+            n_samples=None,
+            constraints=None,
+            parameters=None,
+            margin=0.25,
+            seed=0,
+            j=True,
+    ):
+        """
+        Fast stand-in for JVL over the operating variables of a fixed geometry (alpha, control deflections and jet
+        levels), fit to sampled JVL runs.
+
+        The variables listed in `bounds` are sampled across the box (the trusted region) with a Latin hypercube,
+        every sample is one run case, and the chosen outputs of the total-force dump are fit with a polynomial or a
+        radial basis function (RBF) model. Evaluations inside the region come from the fit; a query outside it
+        grows the region, samples the new part and refits.
+
+        :param jvl: The `JVL` object. Its geometry must not change while the surrogate is in use
+        :param runner: A `runner.JVLRunner`. Sample cases are split into one job per worker
+        :param bounds: {variable: (low, high)} for the sampled variables: alpha, beta, the rates, control names
+            (`JVL.control_names`) and jet names (`JVL.jet_names`). Other variables keep their defaults
+        :param outputs: Total-force fields to model
+        :param kind: "polynomial" (least squares, total degree `degree`) or "rbf" (cubic RBF with a linear tail,
+            interpolating the samples)
+        :param degree: Polynomial degree
+        :param n_samples: Samples per fit. Defaults to twice the number of polynomial terms
+        :param constraints: {variable: (constraint, value)} trimmed in every sample, as in `JVL.write_run`
+            (e.g. {"Elevator": ("Cm", 0)})
+        :param parameters: Run case parameters for every sample (velocity, X_cg, ...), as in `JVL.write_run`
+        :param margin: Fraction of the queried span by which the region grows past an out-of-region query
+        :param seed: Seed for the sampling
+        :param j: Include jet variables
+        """
+        if kind not in ("polynomial", "rbf"):
+            raise ValueError(f"Unknown surrogate kind '{kind}'. Valid kinds are: ['polynomial', 'rbf']")
+        defaults = jvl.run_variables(j=j)
+        for name in bounds:
+            if name not in defaults:
+                raise ValueError(f"Unknown run variable '{name}'. Valid variables are: {list(defaults)}")
+        self.jvl = jvl
+        self.runner = runner
+        self.variables = list(bounds)
+        self.low = np.array([min(bounds[name]) for name in self.variables], dtype=float)
+        self.high = np.array([max(bounds[name]) for name in self.variables], dtype=float)
+        self.outputs = list(outputs)
+        self.kind = kind
+        self.degree = degree
+        self.exponents = polynomial_exponents(len(self.variables), degree if kind == "polynomial" else 1)
+        self.n_samples = n_samples or 2 * len(polynomial_exponents(len(self.variables), degree))
+        self.constraints = constraints
+        self.parameters = parameters
+        self.margin = margin
+        self.rng = np.random.default_rng(seed)
+        self.j = j
+
+        self.X = np.empty((0, len(self.variables)))
+        self.Y = np.empty((0, len(self.outputs)))
+        self.failed = 0
+        self.refits = 0
+        self.errors = {}
+        self._coefficients = None
+        self._weights = None
+        self._centers = None
+
+        self.sample(self.n_samples)
+        self.fit()
+
+    ### Sampling
+    def run(self, X):
+        """
+        Runs JVL at the points X (n, n_variables). Returns (the points that ran, their outputs (n_ok, n_outputs)).
+        """
+        chunks = np.array_split(X, min(len(X), self.runner.max_workers))
+        jobs = [
+            JVLJob(
+                self.jvl,
+                run_file=dict(
+                    variables={name: chunk[:, k] for k, name in enumerate(self.variables)},
+                    constraints=self.constraints,
+                    parameters=self.parameters,
+                    j=self.j,
+                ),
+                outputs=("ft",),
+                name=f"surrogate{i}",
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+        points, values = [], []
+        for chunk, result in zip(chunks, self.runner.run(jobs)):
+            if not (result.ok and result.converged):
+                self.failed += len(chunk)
+                continue
+            points.append(chunk)
+            values.append(np.stack([result.totals[name] for name in self.outputs], axis=-1))
+        if not points:
+            return np.empty((0, len(self.variables))), np.empty((0, len(self.outputs)))
+        return np.concatenate(points), np.concatenate(values)
+
+    def sample(self, n, low=None, high=None, inside=None):
+        """
+        Adds n JVL samples, drawn across [low, high] (defaults to the trusted region). With `inside` (a previous
+        region as (low, high)), points falling in it are redrawn, so only the new part of a grown region is sampled.
+        """
+        low = self.low if low is None else low
+        high = self.high if high is None else high
+        X = latin_hypercube(n, low, high, self.rng)
+        if inside is not None:
+            old = np.all((X >= inside[0]) & (X <= inside[1]), axis=1)
+            # Push redrawn points onto the new part of the box along one random grown axis
+            grown = np.flatnonzero((low < inside[0]) | (high > inside[1]))
+            for i in np.flatnonzero(old):
+                axis = self.rng.choice(grown)
+                below = low[axis] < inside[0][axis] and (high[axis] <= inside[1][axis] or self.rng.random() < 0.5)
+                X[i, axis] = self.rng.uniform(low[axis], inside[0][axis]) if below else self.rng.uniform(inside[1][axis], high[axis])
+        X, Y = self.run(X)
+        self.X = np.concatenate([self.X, X])
+        self.Y = np.concatenate([self.Y, Y])
+
+    ### Model
+    def _scale(self, X):
+        return 2 * (X - self.low) / np.where(self.high > self.low, self.high - self.low, 1) - 1
+
+    def _features(self, U):
+        return np.prod(U[:, None, :] ** self.exponents, axis=-1)
+
+    def fit(self):
+        """
+        Fits the model to every sample so far and updates `errors`: {output: RMS leave-one-out error}.
+        """
+        n_terms = len(self.exponents)
+        if len(self.X) < n_terms + (self.kind == "polynomial"):
+            raise RuntimeError(
+                f"{len(self.X)} successful samples ({self.failed} failed) are too few for a {n_terms}-term {self.kind} fit."
+            )
+        U = self._scale(self.X)
+        P = self._features(U)
+
+        if self.kind == "polynomial":
+            Q, R = np.linalg.qr(P)
+            self._coefficients = np.linalg.solve(R, Q.T @ self.Y)
+            leverage = np.sum(Q ** 2, axis=1)
+            loo = (self.Y - P @ self._coefficients) / np.maximum(1 - leverage, 1e-12)[:, None]
+        else:
+            n = len(U)
+            A = np.zeros((n + n_terms, n + n_terms))
+            A[:n, :n] = np.linalg.norm(U[:, None] - U[None], axis=-1) ** 3
+            A[:n, n:] = P
+            A[n:, :n] = P.T
+            inverse = np.linalg.pinv(A)
+            solution = inverse @ np.concatenate([self.Y, np.zeros((n_terms, len(self.outputs)))])
+            self._centers = U
+            self._weights, self._coefficients = solution[:n], solution[n:]
+            # Rippa's closed-form leave-one-out residuals
+            loo = self._weights / np.diag(inverse)[:n, None]
+
+        self.errors = dict(zip(self.outputs, np.sqrt(np.mean(loo ** 2, axis=0))))
+        self.refits += 1
+
+    def contains(self, X):
+        """Per-point bool: inside the trusted region."""
+        return np.all((X >= self.low) & (X <= self.high), axis=-1)
+
+    def _as_points(self, points):
+        if isinstance(points, dict):
+            unknown = set(points) - set(self.variables)
+            if unknown:
+                raise ValueError(f"Unknown surrogate variables {sorted(unknown)}. Variables are: {self.variables}")
+            columns = np.broadcast_arrays(*[np.asarray(points[name], dtype=float) for name in self.variables])
+            return np.stack([c.ravel() for c in columns], axis=-1), columns[0].shape
+        X = np.atleast_2d(np.asarray(points, dtype=float))
+        return X.reshape(-1, len(self.variables)), X.shape[:-1]
+
+    def __call__(self, points, refit=True):
+        """
+        Evaluates the model.
+
+        Args:
+            points: {variable: array} (every variable of the surrogate, broadcast together) or an array
+                (..., n_variables) in `variables` order.
+            refit: If any point lies outside the trusted region, grow the region to cover it (plus `margin`),
+                sample the new part with JVL and refit first. If False, such points are extrapolated.
+
+        Returns: {output: array of the broadcast point shape}.
+        """
+        X, shape = self._as_points(points)
+        outside = ~self.contains(X)
+        if refit and outside.any():
+            low = np.minimum(self.low, X.min(axis=0))
+            high = np.maximum(self.high, X.max(axis=0))
+            span = high - low
+            low = np.where(low < self.low, low - self.margin * span, low)
+            high = np.where(high > self.high, high + self.margin * span, high)
+            inside = (self.low, self.high)
+            grown_fraction = 1 - np.prod((inside[1] - inside[0]) / np.where(span > 0, high - low, 1))
+            self.low, self.high = low, high
+            self.sample(max(int(np.ceil(self.n_samples * grown_fraction)), len(self.exponents)), inside=inside)
+            self.fit()
+
+        U = self._scale(X)
+        Y = self._features(U) @ self._coefficients
+        if self.kind == "rbf":
+            # Chunked so the (queries x samples) distance matrix stays small for large batches
+            for start in range(0, len(U), 4096):
+                r = np.linalg.norm(U[start:start + 4096, None] - self._centers[None], axis=-1)
+                Y[start:start + 4096] += r ** 3 @ self._weights
+        return {name: Y[:, k].reshape(shape) for k, name in enumerate(self.outputs)}
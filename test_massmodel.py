@@ -0,0 +1,16 @@
+import numpy as np
+
+import geom
+from massmodel import airplane_mass_model
+
+
+def test_zero_motor_batch_entry():
+    plane = geom.build_airplane()
+    totals = airplane_mass_model(plane, num_motors=[0, 12]).totals()
+    for value in totals.values():
+        assert np.all(np.isfinite(value))
+
+    # Without motors, the entry is the single configuration minus its motors and fans
+    bare = airplane_mass_model(plane, num_motors=12, motor_mass=0, fan_mass=0).totals()
+    assert np.isclose(totals["mass"][0], bare["mass"])
+    assert np.isclose(totals["mass"][1], airplane_mass_model(plane, num_motors=12).totals()["mass"])
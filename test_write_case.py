@@ -0,0 +1,52 @@
+import copy
+
+import geom
+
+
+def test_write_case_regenerates_after_plain_write(tmp_path):
+    # A is written incrementally, B replaces it with a plain write: A's next case must rewrite the geometry
+    filepath = tmp_path / "airplane.jvl"
+    a = geom.build_avl_plane(geom.build_airplane())
+    b = copy.deepcopy(a)
+    b.airplane.wings[0].xsecs[1].chord = 0.2
+
+    assert a.write_case(filepath, variables={"alpha": 3}) == "geometry"
+    a_text = filepath.read_text()
+    assert a.change_level(filepath) == "run"
+
+    b.write_jvl(filepath)
+    assert filepath.read_text() != a_text
+    assert a.change_level(filepath) == "geometry"
+    assert a.write_case(filepath, variables={"alpha": 3}) == "geometry"
+    assert filepath.read_text() == a_text
+    assert a.change_level(filepath) == "run"
+
+
+def test_change_level_detects_edited_jvl(tmp_path):
+    filepath = tmp_path / "airplane.jvl"
+    a = geom.build_avl_plane(geom.build_airplane())
+    a.write_jvl(filepath, incremental=True)
+    a_text = filepath.read_text()
+
+    filepath.write_text(a_text + "\n# edited")
+    assert a.change_level(filepath) == "geometry"
+    a.write_jvl(filepath, incremental=True)
+    assert filepath.read_text() == a_text
+
+
+def test_incremental_write_drops_unreferenced_sidecars(tmp_path):
+    filepath = tmp_path / "a.jvl"
+    a = geom.build_avl_plane(geom.build_airplane())
+    a.write_jvl(filepath, incremental=True)
+    assert (tmp_path / "a.jvl.af1").exists()
+
+    # The tails take the main wing's airfoil, so the second airfoil sidecar is no longer written
+    for wing in a.airplane.wings[1:]:
+        for xsec in wing.xsecs:
+            xsec.airfoil = a.airplane.wings[0].xsecs[0].airfoil
+    a.write_jvl(filepath, incremental=True)
+    assert not (tmp_path / "a.jvl.af1").exists()
+    assert a.change_level(filepath) == "run"
+
+    a.airplane.wings[0].xsecs[0].control_surfaces[0].deflection = 5
+    assert a.change_level(filepath) == "run"
@@ -0,0 +1,184 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from session import JVLSession
+
+# Total-force fields holding the solved flight variables (controls and jets appear under their own names)
+SOLUTION_FIELDS = {"alpha": "Alpha", "beta": "Beta", "pb/2V": "pb/2V", "qc/2V": "qc/2V", "rb/2V": "rb/2V"}
+
+# One line per Newton iteration of the X command: the iteration number followed by the variable updates
+_ITERATION = re.compile(r"^\s*\d+(\s+[-+]?\d*\.\d+(E[-+]?\d+)?)+\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def snake_order(shape):
+    """
+    Flat indices of a grid of the given shape, ordered so consecutive points differ in a single axis by one step
+    (a boustrophedon path: every axis reverses direction whenever a slower axis advances).
+    """
+    if not all(shape):
+        return np.arange(0)
+    order = np.arange(1)
+    for n in reversed(shape):
+        order = np.concatenate([(order if i % 2 == 0 else order[::-1]) + i * len(order) for i in range(n)])
+    return order
+
+
+def iteration_count(stdout):
+    """Number of trim iterations JVL printed."""
+    return len(_ITERATION.findall(stdout))
+
+
+def _trim_path(session, points, constraints, initial, retry_cold):
+    """
+    Solves the points in order on one session. Each case starts from the state JVL is left in by the previous
+    converged case; the first case, and any case after a failure, is first seeded with a direct solve at the
+    last converged solution (or `initial`).
+    """
+    guess = dict(initial)
+    seeded = False
+    solved = []
+    for variables, parameters, targets in points:
+        case_constraints = {name: (constraint, targets.get(constraint, value)) for name, (constraint, value) in constraints.items()}
+        if not seeded:
+            session.run(variables={**variables, **guess}, parameters=parameters)
+        result = session.run(variables=variables, constraints=case_constraints, parameters=parameters)
+        cold = False
+        if retry_cold and seeded and not (result.ok and result.converged):
+            session.run(variables={**variables, **initial}, parameters=parameters)
+            result = session.run(variables=variables, constraints=case_constraints, parameters=parameters)
+            cold = True
+
+        seeded = result.ok and result.converged
+        if seeded:
+            totals = result.totals[0]
+            guess = {name: float(totals[SOLUTION_FIELDS.get(name, name)]) for name in constraints}
+        solved.append((result, cold))
+    return solved
+
+
+def trim_grid(
+        jvl,
+        grid,
+        constraints,
+        avl_command=None,
+        mass_file=None,
+        initial=None,
+        n_sessions=1,
+        retry_cold=True,
+        timeout=30,
+        j=True,
+):
+    """
+    Trims every point of a full-factorial grid, warm-starting each case from the converged solution of its
+    neighbor.
+
+    The grid is walked in `snake_order`, so consecutive cases differ by one step along one axis, and solved on
+    long-lived `JVLSession`s. JVL iterates from its current state, so each trim starts from the previous solution
+    (e.g. neighboring alpha and elevator) instead of from zero:
+
+        grid = trim_grid(
+            avl_plane,
+            grid={"velocity": np.linspace(4.5, 8, 8), "CL": [3, 3.5, 4], "Flap1": [30, 45], "FlapJet1": [0, 2.35, 4.7]},
+            constraints={"alpha": ("CL", 4.0), "Elevator": ("Cm", 0)},
+            mass_file="821p1.mass",
+        )
+
+    Args:
+        jvl: The `JVL` object.
+        grid: {name: 1D values}, one axis per entry. A name is a run variable (set directly, e.g. a flap or jet),
+            a session parameter (velocity, density, X_cg, ...), or the target of a constraint (e.g. "CL" sets the
+            value of the constraint targeting CL).
+        constraints: {variable: (constraint, value)} for the trimmed variables, as in `JVL.write_run`. Values are
+            overridden by grid axes named after the constraint.
+        avl_command: JVL executable, as a path or an argument list. Defaults to jvl.avl_command.
+        mass_file: Path to a .mass file, or an asb.MassProperties, loaded by every session.
+        initial: {variable: value} initial guess for the trimmed variables of the first case and of cold restarts.
+            Defaults to the op_point / control deflections (`JVL.run_variables`), as in a .run file.
+        n_sessions: Number of JVL processes. The solve path is split into this many contiguous pieces, which run
+            concurrently, so warm starts are only lost at the piece boundaries.
+        retry_cold: Re-solve a case that fails to converge from a warm start once more from `initial`.
+        timeout: Seconds before a hung session is restarted, see `JVLSession`.
+        j: Include jet variables.
+
+    Returns: dict with
+        "values": structured array of the grid shape with the grid values, the total-force fields (Alpha,
+        CLtot, CDtot, Cmtot, control and jet settings, ...), "converged", "iterations" and "cold" (re-solved from
+        `initial`); cases whose run errored hold NaN,
+        "order": flat grid indices in solve order,
+        "failures": list of {"index": grid index, "point": {name: value}, "error": error or None if the case ran
+        but did not converge}.
+    """
+    defaults = jvl.run_variables(j=j)
+    for name in constraints:
+        if name not in defaults:
+            raise ValueError(f"Unknown run variable '{name}'. Valid variables are: {list(defaults)}")
+    targets = {constraint for constraint, _ in constraints.values()}
+    for name in grid:
+        if name in constraints:
+            raise ValueError(f"'{name}' is both a grid axis and trimmed.")
+        if name not in defaults and name not in JVLSession.parameter_keys and name not in targets:
+            raise ValueError(
+                f"Unknown grid axis '{name}'. Axes are run variables {list(defaults)}, parameters "
+                f"{list(JVLSession.parameter_keys)}, or constraint targets {sorted(targets)}."
+            )
+    initial = {name: (initial or {}).get(name, defaults[name]) for name in constraints}
+
+    names = list(grid)
+    axes = [np.asarray(grid[name], dtype=float).ravel() for name in names]
+    shape = tuple(len(axis) for axis in axes)
+    order = snake_order(shape)
+
+    points = []
+    for index in order:
+        point = {name: float(axis[i]) for name, axis, i in zip(names, axes, np.unravel_index(index, shape))}
+        variables = {name: value for name, value in point.items() if name in defaults and name not in targets}
+        parameters = {name: value for name, value in point.items() if name in JVLSession.parameter_keys and name not in defaults}
+        case_targets = {name: value for name, value in point.items() if name in targets}
+        points.append((variables, parameters, case_targets))
+
+    def solve(piece):
+        with JVLSession(jvl, avl_command=avl_command, mass_file=mass_file, timeout=timeout, j=j) as session:
+            return _trim_path(session, piece, constraints, initial, retry_cold)
+
+    n_sessions = max(1, min(n_sessions, len(points)))
+    bounds = np.linspace(0, len(points), n_sessions + 1).astype(int)
+    pieces = [points[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    if n_sessions == 1:
+        solved = solve(pieces[0]) if points else []
+    else:
+        with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+            solved = [case for piece in pool.map(solve, pieces) for case in piece]
+
+    fields = list(dict.fromkeys(
+        name for result, _ in solved if result.ok for name in result.totals.dtype.names if name != "case"
+    ))
+    dtype = [(name, float) for name in names] + [(name, float) for name in fields if name not in names]
+    dtype += [("converged", bool), ("iterations", int), ("cold", bool)]
+    values = np.zeros(shape, dtype=dtype)
+    for field in fields:
+        values[field] = np.nan
+
+    failures = []
+    flat = values.reshape(-1)
+    for index, (result, cold) in zip(order, solved):
+        row = flat[index]
+        for name, axis, i in zip(names, axes, np.unravel_index(index, shape)):
+            row[name] = axis[i]
+        row["converged"] = result.ok and result.converged
+        row["iterations"] = iteration_count(result.stdout)
+        row["cold"] = cold
+        if result.ok:
+            totals = result.totals[0]
+            for field in fields:
+                if field in totals.dtype.names and field not in names:
+                    row[field] = totals[field]
+        if not row["converged"]:
+            failures.append({
+                "index": tuple(int(i) for i in np.unravel_index(index, shape)),
+                "point": {name: float(row[name]) for name in names},
+                "error": result.error,
+            })
+
+    return {"values": values, "order": order, "failures": failures}